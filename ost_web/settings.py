@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # Trigram/full-text lookups (inactive on SQLite)
     'rest_framework',  # Django REST Framework
     'django_filters',  # For API filtering
     'corsheaders',  # For CORS support
@@ -50,10 +51,12 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # For serving static files in production
+    'tracker.middleware.SnapshotFilesMiddleware',  # Dataset snapshots, before any DB/session work
     'corsheaders.middleware.CorsMiddleware',  # Must be before CommonMiddleware
-    'django.middleware.cache.UpdateCacheMiddleware',  # Must be first cache middleware
+    'tracker.middleware.RequestLoggingMiddleware',  # Request analytics log incl. cache hits (read by the cache warming planner)
+    'tracker.middleware.GenerationUpdateCacheMiddleware',  # Must be first cache middleware
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.cache.FetchFromCacheMiddleware',  # Must be last cache middleware
+    'tracker.middleware.GenerationFetchFromCacheMiddleware',  # Must be last cache middleware
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -201,6 +204,11 @@ WHITENOISE_AUTOREFRESH = DEBUG
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Full-dataset snapshots (python manage.py build_snapshots; see tracker.snapshots)
+OST_SNAPSHOT_URL = '/snapshots/'
+OST_SNAPSHOT_ROOT = Path(os.environ.get('OST_SNAPSHOT_ROOT', BASE_DIR / 'snapshots'))
+OST_SNAPSHOT_KEEP = 3  # Versions kept on disk
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -218,6 +226,7 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 OST_VERSION = '1.0'
 OST_DATA_PATH = BASE_DIR  # Path to CSV data files
 OST_PAGINATION_SIZE = 25
+OST_COUNT_ESTIMATE_THRESHOLD = 10000  # Listings above this many (estimated) rows show "~N" instead of running COUNT(*)
 
 # Caching Configuration - Redis for production, database for development
 CACHES = {
@@ -246,6 +255,20 @@ CACHE_TIMEOUTS = {
     'search_results': 60 * 5,  # 5 minutes for search results
 }
 
+# Per-process LRU in front of the shared cache for hot statistics (see tracker.cache_utils.LocalCache)
+OST_LOCAL_CACHE = {
+    'max_entries': 256,
+    'timeout': 30,  # Seconds a local entry lives at most
+    'generation_check': 2,  # Seconds between checks for a newer dataset generation
+}
+
+# Most identifiers accepted by one POST /api/v1/papers/lookup/ request
+OST_LOOKUP_MAX_IDS = 100000
+
+# Host the cache warmer requests pages at: the public host, since page-cache keys include it
+# (unset: the only non-local ALLOWED_HOSTS entry; see tracker.warming.warm_origin)
+OST_WARM_HOST = os.environ.get('OST_WARM_HOST')
+
 # Logging Configuration - VPS Compatible
 def get_log_file_path():
     """Get appropriate log file path based on environment"""
@@ -294,6 +317,17 @@ if log_file_path:
         'formatter': 'verbose',
     }
     log_handlers.append('file')
+    
+    # One JSON object per request from RequestLoggingMiddleware
+    OST_ANALYTICS_LOG = log_file_path.parent / 'analytics.log'
+    LOGGING_HANDLERS['analytics_file'] = {
+        'level': 'INFO',
+        'class': 'logging.FileHandler',
+        'filename': str(OST_ANALYTICS_LOG),
+        'formatter': 'message',
+    }
+else:
+    OST_ANALYTICS_LOG = None
 
 LOGGING = {
     'version': 1,
@@ -307,6 +341,10 @@ LOGGING = {
             'format': '{levelname} {asctime} {message}',
             'style': '{',
         },
+        'message': {
+            'format': '{message}',
+            'style': '{',
+        },
     },
     'handlers': LOGGING_HANDLERS,
     'loggers': {
@@ -320,6 +358,11 @@ LOGGING = {
             'level': 'WARNING',
             'propagate': True,
         },
+        'analytics': {
+            'handlers': ['analytics_file'] if OST_ANALYTICS_LOG else [],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
     'root': {
         'handlers': ['console'],
@@ -339,7 +382,7 @@ REST_FRAMEWORK = {
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'tracker.renderers.ORJSONRenderer',  # JSONRenderer output, faster encoding
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
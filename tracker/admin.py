@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.db.models import Count, Avg
 from django.utils.html import format_html
-from .models import Journal, Paper, ResearchField, UserProfile, TransparencyTrend
+from .models import Journal, Paper, ResearchField, UserProfile, TransparencyTrend, JournalTrend, StatsCube, JournalStats
+from .rollups import TouchedKeys
 
 @admin.register(Journal)
 class JournalAdmin(admin.ModelAdmin):
@@ -10,10 +11,13 @@ class JournalAdmin(admin.ModelAdmin):
     list_filter = ['country', 'language', 'publication_start_year', 'indexing_status']
     search_fields = ['title_abbreviation', 'title_full', 'publisher', 'nlm_id']
     readonly_fields = ['created_at', 'updated_at']
+    list_select_related = ['stats']
     
     def paper_count(self, obj):
-        return obj.papers.count()
+        stats = getattr(obj, 'stats', None)
+        return stats.total_papers if stats else 0
     paper_count.short_description = 'Papers'
+    paper_count.admin_order_field = 'stats__total_papers'
     
     def is_dental_journal(self, obj):
         return obj.is_dental_journal()
@@ -147,18 +151,54 @@ class TransparencyTrendAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('field')
 
+@admin.register(JournalTrend)
+class JournalTrendAdmin(admin.ModelAdmin):
+    list_display = ['journal', 'year', 'total_papers', 'avg_transparency_score',
+                   'data_sharing_count', 'code_sharing_count', 'open_access_count']
+    list_filter = ['year']
+    search_fields = ['journal__title_abbreviation', 'journal__title_full']
+    readonly_fields = ['updated_at']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('journal')
+
+@admin.register(StatsCube)
+class StatsCubeAdmin(admin.ModelAdmin):
+    list_display = ['pub_year', 'broad_subject_term', 'journal', 'source', 'total_papers',
+                   'open_data_count', 'open_code_count', 'open_access_count']
+    list_filter = ['pub_year', 'source']
+    search_fields = ['broad_subject_term', 'journal__title_abbreviation']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('journal')
+
+@admin.register(JournalStats)
+class JournalStatsAdmin(admin.ModelAdmin):
+    list_display = ['journal', 'total_papers', 'avg_transparency_score', 'first_year', 'last_year',
+                   'open_data_count', 'open_code_count', 'open_access_count', 'updated_at']
+    search_fields = ['journal__title_abbreviation', 'journal__title_full']
+    readonly_fields = ['updated_at']
+    ordering = ['-total_papers']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('journal')
+
 # Customize admin site
 admin.site.site_header = "Open Science Tracker Admin"
 admin.site.site_title = "OST Admin"
 admin.site.index_title = "Welcome to Open Science Tracker Administration"
 
 # Admin actions
-def recalculate_transparency_scores(modeladmin, request, queryset):
-    for paper in queryset:
-        paper.save()  # This will trigger recalculation
-    modeladmin.message_user(request, f"Recalculated transparency scores for {queryset.count()} papers.")
+def refresh_paper_rollups(modeladmin, request, queryset):
+    # Scores are generated columns; what can go stale is the rollups the selection belongs to
+    keys = TouchedKeys()
+    papers = queryset.select_related(None).only('pub_year', 'broad_subject_term', 'journal_id')
+    for paper in papers:
+        keys.add(paper)
+    keys.refresh()
+    modeladmin.message_user(request, f"Refreshed rollups for {len(papers)} papers.")
 
-recalculate_transparency_scores.short_description = "Recalculate transparency scores"
+refresh_paper_rollups.short_description = "Refresh rollups for selected papers"
 
 # Add the action to PaperAdmin
-PaperAdmin.actions = [recalculate_transparency_scores]
+PaperAdmin.actions = [refresh_paper_rollups]
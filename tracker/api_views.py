@@ -5,17 +5,31 @@ These views provide RESTful endpoints for accessing transparency and
 reproducibility data from medical and dental literature.
 """
 
+import json
+
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django_filters import rest_framework as django_filters
-from django.db.models import Count, Avg, Q, Max, Min
+from django.db.models import Count, Avg, Q, Max, F, Sum
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 
 from .models import Paper, Journal, ResearchField
+from .stats import StatsEngine, journal_stats_annotations
+from .cache_utils import generation_cache_page
+from .counts import table_count
+from .exporters import ExportError, NDJSONExporter, export_response
+from .fastpath import RowSerializer
+from .indicators import indicator_filter
+from .lookup import max_identifiers, resolve_identifiers
+from .pagination import PaperPagination
+from .search import SEARCH_MODES, text_search
 from .serializers import (
     PaperSerializer, PaperListSerializer,
     JournalSerializer, JournalListSerializer, JournalBasicSerializer,
@@ -39,12 +53,12 @@ class PaperFilter(django_filters.FilterSet):
     
     # Journal filtering
     journal = django_filters.NumberFilter(field_name='journal__id')
-    journal_name = django_filters.CharFilter(field_name='journal__title_abbreviation', lookup_expr='icontains')
+    journal_name = django_filters.CharFilter(method='filter_text')
     
-    # Transparency filtering
-    transparency_score = django_filters.NumberFilter(method='filter_transparency_score')
-    transparency_score__gte = django_filters.NumberFilter(method='filter_transparency_score_gte')
-    transparency_score__lte = django_filters.NumberFilter(method='filter_transparency_score_lte')
+    # Transparency filtering (transparency_score is a generated, indexed column)
+    transparency_score = django_filters.NumberFilter(field_name='transparency_score')
+    transparency_score__gte = django_filters.NumberFilter(field_name='transparency_score', lookup_expr='gte')
+    transparency_score__lte = django_filters.NumberFilter(field_name='transparency_score', lookup_expr='lte')
     
     # Subject category (broad term)
     broad_subject_term = django_filters.CharFilter(field_name='broad_subject_term', lookup_expr='icontains')
@@ -59,58 +73,54 @@ class PaperFilter(django_filters.FilterSet):
     # has_reporting = django_filters.BooleanFilter(field_name='is_report_pred')  # Field doesn't exist in current model
     # has_sharing = django_filters.BooleanFilter(field_name='is_share_pred')    # Field doesn't exist in current model
     
+    # Indicator combinations (comma-separated names, answered from the indexed indicator_mask)
+    indicators_all = django_filters.CharFilter(method='filter_indicators_all')
+    indicators_any = django_filters.CharFilter(method='filter_indicators_any')
+    
     # Author filtering
-    author = django_filters.CharFilter(field_name='author_string', lookup_expr='icontains')
+    author = django_filters.CharFilter(method='filter_text')
+    
+    # contains (default) or similar (typo-tolerant, ranked) for author/journal_name
+    search_mode = django_filters.ChoiceFilter(choices=SEARCH_MODES, method='filter_search_mode')
+    
+    TEXT_FIELDS = {
+        'author': 'author_string',
+        'journal_name': 'journal__title_abbreviation',
+    }
     
     class Meta:
         model = Paper
         fields = []
     
-    def filter_transparency_score(self, queryset, name, value):
-        """Filter by exact transparency score"""
-        return queryset.extra(
-            where=["(CASE WHEN is_open_data THEN 1 ELSE 0 END + "
-                   "CASE WHEN is_open_code THEN 1 ELSE 0 END + "
-                   "CASE WHEN is_coi_pred THEN 1 ELSE 0 END + "
-                   "CASE WHEN is_fund_pred THEN 1 ELSE 0 END + "
-                   "CASE WHEN is_register_pred THEN 1 ELSE 0 END + "
-                   "CASE WHEN is_open_access THEN 1 ELSE 0 END) = %s"],
-            params=[value]
-        )
+    def filter_text(self, queryset, name, value):
+        """Substring or trigram-similarity match, per search_mode"""
+        mode = self.data.get('search_mode', 'contains')
+        return text_search(queryset, [self.TEXT_FIELDS[name]], value, mode=mode, rank_as=f'{name}_similarity')
     
-    def filter_transparency_score_gte(self, queryset, name, value):
-        """Filter by minimum transparency score"""
-        return queryset.extra(
-            where=["(CASE WHEN is_open_data THEN 1 ELSE 0 END + "
-                   "CASE WHEN is_open_code THEN 1 ELSE 0 END + "
-                   "CASE WHEN is_coi_pred THEN 1 ELSE 0 END + "
-                   "CASE WHEN is_fund_pred THEN 1 ELSE 0 END + "
-                   "CASE WHEN is_register_pred THEN 1 ELSE 0 END + "
-                   "CASE WHEN is_open_access THEN 1 ELSE 0 END) >= %s"],
-            params=[value]
-        )
+    def filter_search_mode(self, queryset, name, value):
+        """Read by filter_text; no filtering of its own"""
+        return queryset
     
-    def filter_transparency_score_lte(self, queryset, name, value):
-        """Filter by maximum transparency score"""
-        return queryset.extra(
-            where=["(CASE WHEN is_open_data THEN 1 ELSE 0 END + "
-                   "CASE WHEN is_open_code THEN 1 ELSE 0 END + "
-                   "CASE WHEN is_coi_pred THEN 1 ELSE 0 END + "
-                   "CASE WHEN is_fund_pred THEN 1 ELSE 0 END + "
-                   "CASE WHEN is_register_pred THEN 1 ELSE 0 END + "
-                   "CASE WHEN is_open_access THEN 1 ELSE 0 END) <= %s"],
-            params=[value]
-        )
+    def filter_indicators_all(self, queryset, name, value):
+        """Papers having every listed indicator"""
+        return queryset.filter(indicator_filter(value.split(','), match='all'))
+    
+    def filter_indicators_any(self, queryset, name, value):
+        """Papers having at least one of the listed indicators"""
+        return queryset.filter(indicator_filter(value.split(','), match='any'))
 
 
 class JournalFilter(django_filters.FilterSet):
     """Advanced filtering for journals"""
     
     # Basic filters
-    country = django_filters.CharFilter(lookup_expr='icontains')
-    publisher = django_filters.CharFilter(lookup_expr='icontains')
+    country = django_filters.CharFilter(method='filter_text')
+    publisher = django_filters.CharFilter(method='filter_text')
     language = django_filters.CharFilter(lookup_expr='icontains')
     
+    # contains (default) or similar (typo-tolerant, ranked) for country/publisher
+    search_mode = django_filters.ChoiceFilter(choices=SEARCH_MODES, method='filter_search_mode')
+    
     # Subject terms
     subject_terms = django_filters.CharFilter(field_name='broad_subject_terms', lookup_expr='icontains')
     
@@ -127,13 +137,116 @@ class JournalFilter(django_filters.FilterSet):
         model = Journal
         fields = []
     
+    def filter_text(self, queryset, name, value):
+        """Substring or trigram-similarity match, per search_mode"""
+        mode = self.data.get('search_mode', 'contains')
+        return text_search(queryset, [name], value, mode=mode, rank_as=f'{name}_similarity')
+    
+    def filter_search_mode(self, queryset, name, value):
+        """Read by filter_text; no filtering of its own"""
+        return queryset
+    
     def filter_min_papers(self, queryset, name, value):
-        """Filter journals with minimum number of papers"""
-        return queryset.annotate(paper_count=Count('papers')).filter(paper_count__gte=value)
+        """Filter journals with minimum number of papers (indexed JournalStats column)"""
+        if value <= 0:
+            return queryset
+        return queryset.filter(stats__total_papers__gte=value)
     
     def filter_max_papers(self, queryset, name, value):
-        """Filter journals with maximum number of papers"""
-        return queryset.annotate(paper_count=Count('papers')).filter(paper_count__lte=value)
+        """Filter journals with maximum number of papers (no statistics row = no papers)"""
+        return queryset.filter(Q(stats__total_papers__lte=value) | Q(stats__isnull=True))
+
+
+class TrigramSearchFilter(filters.SearchFilter):
+    """SearchFilter with ?search_mode=similar for typo-tolerant, similarity-ranked matching"""
+    
+    def filter_queryset(self, request, queryset, view):
+        if request.query_params.get('search_mode') != 'similar':
+            return super().filter_queryset(request, queryset, view)
+        
+        search_fields = self.get_search_fields(view, request)
+        query = request.query_params.get(self.search_param, '')
+        if not search_fields or not query.strip():
+            return queryset
+        return text_search(queryset, search_fields, query, mode='similar', rank_as='search_similarity')
+
+
+# Ordering runs first so similarity ranking from filters and search stays the primary sort
+FILTER_BACKENDS = [filters.OrderingFilter, DjangoFilterBackend, TrigramSearchFilter]
+
+
+class SparseFieldsetMixin:
+    """
+    ``?fields=a,b`` / ``?omit=c`` for list and retrieve: the serializer drops
+    the other fields (serializers.SparseFieldsMixin) and the queryset loads
+    only the columns the remaining ones read, joining only the relations
+    they traverse. Names the serializer doesn't have are a 400.
+    """
+    
+    def _field_list(self, param):
+        value = self.request.query_params.get(param, '') if self.request else ''
+        return [name.strip() for name in value.split(',') if name.strip()]
+    
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action not in ('list', 'retrieve'):
+            return
+        available = self.get_serializer_class()(context={'request': request}).fields
+        errors = {}
+        for param in ('fields', 'omit'):
+            unknown = [name for name in self._field_list(param) if name not in available]
+            if unknown:
+                errors[param] = [
+                    f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(available)}"
+                ]
+        if errors:
+            raise ValidationError(errors)
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self._field_list('fields')
+        context['omit'] = self._field_list('omit')
+        return context
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in ('list', 'retrieve') or not (self._field_list('fields') or self._field_list('omit')):
+            return queryset
+        
+        paths = self.get_serializer().projection()
+        if paths is None:
+            return queryset
+        related = {path.split('__')[0] for path in paths if '__' in path}
+        return queryset.select_related(None).select_related(*related).only(*paths, *related)
+
+
+class FastListMixin:
+    """
+    list() without DRF serialization when every field of the list serializer
+    is a model column: the page is read with values() and turned into the
+    serializer's output by fastpath.RowSerializer. Other serializers (and
+    sparse fieldsets asking for them) take the regular path.
+    """
+    
+    def list(self, request, *args, **kwargs):
+        rows = RowSerializer.compile(self.get_serializer())
+        if rows is None:
+            return super().list(request, *args, **kwargs)
+        return self.row_list_response(self.filter_queryset(self.get_queryset()), rows)
+    
+    def row_list_response(self, queryset, rows):
+        """(Paginated) response of ``queryset`` rendered by RowSerializer ``rows``"""
+        queryset = rows.values(queryset)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(rows.to_representation(page))
+        return Response(rows.to_representation(queryset))
+
+
+SPARSE_FIELD_PARAMETERS = [
+    OpenApiParameter("fields", description="Comma-separated fields to return (others are neither loaded nor serialized)"),
+    OpenApiParameter("omit", description="Comma-separated fields to leave out"),
+]
 
 
 # =============================================================================
@@ -151,14 +264,21 @@ class JournalFilter(django_filters.FilterSet):
             OpenApiParameter("journal_name", description="Filter by journal name (partial match)"),
             OpenApiParameter("transparency_score__gte", description="Minimum transparency score (0-7)"),
             OpenApiParameter("has_open_data", description="Filter papers with open data"),
+            OpenApiParameter("indicators_all", description="Comma-separated indicators a paper must all have (e.g. open_data,open_code)"),
+            OpenApiParameter("indicators_any", description="Comma-separated indicators a paper must have at least one of"),
             OpenApiParameter("author", description="Filter by author name (partial match)"),
+            OpenApiParameter("search_mode", description="'contains' (default) or 'similar' for typo-tolerant, similarity-ranked author/journal_name matching"),
             OpenApiParameter("subject_category", description="Filter by subject category"),
             OpenApiParameter("search", description="Search in title and abstract"),
+            OpenApiParameter("cursor", description="Keyset pagination: pass empty for the first page, then follow next/previous. Page depth doesn't affect speed"),
+            OpenApiParameter("page_size", description="Results per cursor page (max 1000)"),
+            OpenApiParameter("count", description="With cursor: 'true' adds the total count (an extra COUNT query)"),
+            *SPARSE_FIELD_PARAMETERS,
         ]
     ),
-    retrieve=extend_schema(description="Get detailed information about a specific paper"),
+    retrieve=extend_schema(description="Get detailed information about a specific paper", parameters=SPARSE_FIELD_PARAMETERS),
 )
-class PaperViewSet(viewsets.ReadOnlyModelViewSet):
+class PaperViewSet(FastListMixin, SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for research papers with transparency data
     
@@ -170,10 +290,12 @@ class PaperViewSet(viewsets.ReadOnlyModelViewSet):
     """
     
     queryset = Paper.objects.select_related('journal').all()
+    filter_backends = FILTER_BACKENDS
     filterset_class = PaperFilter
     search_fields = ['title', 'abstract', 'author_string']
     ordering_fields = ['pub_year', 'pmid', 'created_at']
     ordering = ['-pub_year', '-id']
+    pagination_class = PaperPagination
     
     def get_serializer_class(self):
         """Use different serializers for list vs detail views"""
@@ -181,12 +303,16 @@ class PaperViewSet(viewsets.ReadOnlyModelViewSet):
             return PaperListSerializer
         return PaperSerializer
     
-    @method_decorator(cache_page(60 * 15))  # Cache for 15 minutes
+    @method_decorator(generation_cache_page(60 * 15))  # Cache for 15 minutes
     @action(detail=False, methods=['get'])
     def transparency_stats(self, request):
         """Get overall transparency statistics for papers"""
-        queryset = self.filter_queryset(self.get_queryset())
-        total = queryset.count()
+        cube_filters = self._cube_filters(request)
+        if cube_filters is not None:
+            totals = StatsEngine(**cube_filters).stats()
+        else:
+            totals = StatsEngine(self.filter_queryset(self.get_queryset())).stats()
+        total = totals['total_papers']
         
         if total == 0:
             return Response({
@@ -194,46 +320,46 @@ class PaperViewSet(viewsets.ReadOnlyModelViewSet):
                 'total_papers': 0
             })
         
+        def indicator(key):
+            return {'count': totals[f'{key}_count'], 'percentage': totals[f'{key}_pct']}
+        
         stats = {
             'total_papers': total,
             'transparency_indicators': {
-                'open_data': {
-                    'count': queryset.filter(is_open_data=True).count(),
-                    'percentage': round((queryset.filter(is_open_data=True).count() / total) * 100, 1)
-                },
-                'open_code': {
-                    'count': queryset.filter(is_open_code=True).count(),
-                    'percentage': round((queryset.filter(is_open_code=True).count() / total) * 100, 1)
-                },
-                'conflict_of_interest': {
-                    'count': queryset.filter(is_coi_pred=True).count(),
-                    'percentage': round((queryset.filter(is_coi_pred=True).count() / total) * 100, 1)
-                },
-                'funding_declaration': {
-                    'count': queryset.filter(is_fund_pred=True).count(),
-                    'percentage': round((queryset.filter(is_fund_pred=True).count() / total) * 100, 1)
-                },
-                'registration': {
-                    'count': queryset.filter(is_register_pred=True).count(),
-                    'percentage': round((queryset.filter(is_register_pred=True).count() / total) * 100, 1)
-                },
-                # 'reporting_guidelines': {
-                #     'count': queryset.filter(is_report_pred=True).count(),
-                #     'percentage': round((queryset.filter(is_report_pred=True).count() / total) * 100, 1)
-                # },
-                # 'data_sharing': {
-                #     'count': queryset.filter(is_share_pred=True).count(),
-                #     'percentage': round((queryset.filter(is_share_pred=True).count() / total) * 100, 1)
-                # }
+                'open_data': indicator('open_data'),
+                'open_code': indicator('open_code'),
+                'conflict_of_interest': indicator('coi_disclosure'),
+                'funding_declaration': indicator('funding'),
+                'registration': indicator('registration'),
+                # 'reporting_guidelines' and 'data_sharing': is_report_pred / is_share_pred don't exist
             },
-            'year_range': {
-                'earliest': queryset.aggregate(min_year=Min('pub_year'))['min_year'],
-                'latest': queryset.aggregate(max_year=Max('pub_year'))['max_year']
-            }
+            'year_range': totals['year_range'],
         }
         
         return Response(stats)
     
+    # Query parameters the StatsCube can answer, mapped to cube lookups
+    CUBE_FILTERS = {
+        'pub_year': 'pub_year',
+        'pub_year__gte': 'pub_year__gte',
+        'pub_year__lte': 'pub_year__lte',
+        'journal': 'journal_id',
+    }
+    
+    def _cube_filters(self, request):
+        """Cube lookups when every filter is a year/journal filter, otherwise None"""
+        lookups = {}
+        for param, value in request.query_params.items():
+            if param == 'format' or value == '':
+                continue
+            if param not in self.CUBE_FILTERS:
+                return None
+            try:
+                lookups[self.CUBE_FILTERS[param]] = int(value)
+            except ValueError:
+                return None
+        return lookups
+    
     @action(detail=False, methods=['get'])
     def by_year(self, request):
         """Get paper counts by publication year"""
@@ -244,6 +370,80 @@ class PaperViewSet(viewsets.ReadOnlyModelViewSet):
         ).order_by('pub_year')
         
         return Response(list(year_stats))
+    
+    @extend_schema(
+        description="Stream the filtered papers as csv, ndjson, parquet or arrows (Arrow IPC stream)",
+        parameters=[
+            OpenApiParameter("compress", description="'gzip' to gzip csv/ndjson on the fly"),
+        ],
+        responses={(200, 'application/octet-stream'): OpenApiTypes.BINARY},
+    )
+    @action(detail=False, methods=['get'], url_path=r'export/(?P<extension>csv|ndjson|parquet|arrows)')
+    def export(self, request, extension):
+        """Export papers matching the list filters in a bulk format"""
+        queryset = self.filter_queryset(self.get_queryset()).select_related(None)
+        try:
+            return export_response(queryset, extension, compress=request.query_params.get('compress') == 'gzip')
+        except ExportError as e:
+            return Response({'error': str(e)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+    
+    @extend_schema(
+        description=(
+            "Stream every paper matching the list filters as NDJSON, in id order, straight from a "
+            "database cursor (no pagination). Each line carries the paper's id: to resume an "
+            "interrupted harvest, repeat the request with after=<last id received>."
+        ),
+        parameters=[
+            OpenApiParameter("after", int, description="Resume token: only papers with a larger id"),
+            OpenApiParameter("limit", int, description="Stop after this many papers"),
+        ],
+        responses={(200, 'application/x-ndjson'): OpenApiTypes.STR},
+    )
+    @action(detail=False, methods=['get'])
+    def stream(self, request):
+        """Full-table harvesting without pagination or per-row serializers"""
+        try:
+            after = int(request.query_params.get('after', 0))
+            limit = int(request.query_params['limit']) if request.query_params.get('limit') else None
+        except ValueError:
+            return Response({'error': 'after and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Keyset on the primary key: the cursor walks the pk index, so any resume point is one seek
+        queryset = self.filter_queryset(self.get_queryset()).select_related(None).filter(id__gt=after).order_by('id')
+        if limit is not None:
+            queryset = queryset[:max(limit, 0)]
+        
+        exporter = NDJSONExporter()
+        return StreamingHttpResponse(
+            exporter.stream(queryset.values_list(*exporter.columns)),
+            content_type=exporter.content_type
+        )
+    
+    @extend_schema(
+        description=(
+            "Resolve a list of PMIDs, PMCIDs and DOIs (mixed) in one request. Body: "
+            "{\"ids\": [...]} or a JSON array. Streams NDJSON, one line per identifier in "
+            "input order: query (the identifier as sent), type, matched and, for matches, "
+            "the paper's identifiers and transparency indicators (one line per paper if an "
+            "identifier matches several)."
+        ),
+        request=OpenApiTypes.OBJECT,
+        responses={(200, 'application/x-ndjson'): OpenApiTypes.STR},
+    )
+    @action(detail=False, methods=['post'])
+    def lookup(self, request):
+        """Batch identifier lookup with chunked IN queries on the identifier indexes"""
+        ids = request.data.get('ids') if isinstance(request.data, dict) else request.data
+        if not isinstance(ids, list) or not ids:
+            return Response({'error': 'Send a non-empty list of identifiers as {"ids": [...]}'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > max_identifiers():
+            return Response(
+                {'error': f'At most {max_identifiers()} identifiers per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        lines = (json.dumps(result, ensure_ascii=False) + '\n' for result in resolve_identifiers(ids))
+        return StreamingHttpResponse(lines, content_type='application/x-ndjson')
 
 
 @extend_schema_view(
@@ -255,11 +455,13 @@ class PaperViewSet(viewsets.ReadOnlyModelViewSet):
             OpenApiParameter("min_papers", description="Minimum number of papers in journal"),
             OpenApiParameter("subject_terms", description="Filter by subject terms"),
             OpenApiParameter("search", description="Search journal names"),
+            OpenApiParameter("search_mode", description="'contains' (default) or 'similar' for typo-tolerant, similarity-ranked search/country/publisher matching"),
+            *SPARSE_FIELD_PARAMETERS,
         ]
     ),
-    retrieve=extend_schema(description="Get detailed journal information with statistics"),
+    retrieve=extend_schema(description="Get detailed journal information with statistics", parameters=SPARSE_FIELD_PARAMETERS),
 )
-class JournalViewSet(viewsets.ReadOnlyModelViewSet):
+class JournalViewSet(FastListMixin, SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for academic journals
     
@@ -270,7 +472,8 @@ class JournalViewSet(viewsets.ReadOnlyModelViewSet):
     - Filter by country, subject terms, etc.
     """
     
-    queryset = Journal.objects.prefetch_related('papers').all()
+    queryset = Journal.objects.all()
+    filter_backends = FILTER_BACKENDS
     filterset_class = JournalFilter
     search_fields = ['title_abbreviation', 'title_full', 'publisher']
     ordering_fields = ['title_abbreviation', 'publication_start_year']
@@ -282,6 +485,19 @@ class JournalViewSet(viewsets.ReadOnlyModelViewSet):
             return JournalListSerializer
         return JournalSerializer
     
+    def get_queryset(self):
+        """Annotate the statistics the (sparse) serializer's fields read, instead of queries per journal"""
+        queryset = super().get_queryset()
+        if self.action not in ('list', 'retrieve'):
+            return queryset
+        serializer = self.get_serializer()
+        names = {
+            annotation
+            for field in serializer.fields
+            for annotation in serializer.field_annotations.get(field, ())
+        }
+        return queryset.annotate(**journal_stats_annotations(*sorted(names))) if names else queryset
+    
     @action(detail=True, methods=['get'])
     def papers(self, request, pk=None):
         """Get all papers from a specific journal"""
@@ -292,21 +508,15 @@ class JournalViewSet(viewsets.ReadOnlyModelViewSet):
         filter_backend = DjangoFilterBackend()
         papers = filter_backend.filter_queryset(request, papers, PaperViewSet)
         
-        # Paginate results
-        page = self.paginate_queryset(papers)
-        if page is not None:
-            serializer = PaperListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = PaperListSerializer(papers, many=True)
-        return Response(serializer.data)
+        # Paginated, serialized from values() rows like the paper list
+        return self.row_list_response(papers, RowSerializer.compile(PaperListSerializer()))
     
     @action(detail=False, methods=['get'])
     def top_publishers(self, request):
         """Get top publishers by journal count"""
         publishers = Journal.objects.values('publisher').annotate(
             journal_count=Count('id'),
-            total_papers=Count('papers')
+            total_papers=Coalesce(Sum('stats__total_papers'), 0)
         ).filter(
             publisher__isnull=False
         ).order_by('-journal_count')[:20]
@@ -315,10 +525,10 @@ class JournalViewSet(viewsets.ReadOnlyModelViewSet):
 
 
 @extend_schema_view(
-    list=extend_schema(description="List all research fields with statistics"),
-    retrieve=extend_schema(description="Get detailed research field information"),
+    list=extend_schema(description="List all research fields with statistics", parameters=SPARSE_FIELD_PARAMETERS),
+    retrieve=extend_schema(description="Get detailed research field information", parameters=SPARSE_FIELD_PARAMETERS),
 )
-class ResearchFieldViewSet(viewsets.ReadOnlyModelViewSet):
+class ResearchFieldViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for research fields (broad subject categories)
     
@@ -346,36 +556,34 @@ class APIOverviewView(APIView):
     API Overview with general statistics and available endpoints
     """
     
-    @method_decorator(cache_page(60 * 30))  # Cache for 30 minutes
+    @method_decorator(generation_cache_page(60 * 30))  # Cache for 30 minutes
     def get(self, request):
         """Get overall API statistics and information"""
         
         # Basic counts
-        total_papers = Paper.objects.count()
-        total_journals = Journal.objects.count()
-        total_research_fields = ResearchField.objects.count()
+        totals = StatsEngine().stats()
+        total_papers = totals['total_papers']
+        total_journals = table_count(Journal)
+        total_research_fields = table_count(ResearchField)
         
         # Transparency statistics
         transparency_stats = {
-            'open_data': Paper.objects.filter(is_open_data=True).count(),
-            'open_code': Paper.objects.filter(is_open_code=True).count(),
-            'conflict_of_interest': Paper.objects.filter(is_coi_pred=True).count(),
-            'funding_declaration': Paper.objects.filter(is_fund_pred=True).count(),
-            'registration': Paper.objects.filter(is_register_pred=True).count(),
+            'open_data': totals['open_data_count'],
+            'open_code': totals['open_code_count'],
+            'conflict_of_interest': totals['coi_disclosure_count'],
+            'funding_declaration': totals['funding_count'],
+            'registration': totals['registration_count'],
             # 'reporting_guidelines': Paper.objects.filter(is_report_pred=True).count(),  # Field doesn't exist
             # 'data_sharing': Paper.objects.filter(is_share_pred=True).count()  # Field doesn't exist
         }
         
         # Year range
-        year_range = Paper.objects.aggregate(
-            earliest=Min('pub_year'),
-            latest=Max('pub_year')
-        )
+        year_range = totals['year_range']
         
         # Top journals by paper count
-        top_journals = Journal.objects.annotate(
-            paper_count=Count('papers')
-        ).filter(paper_count__gt=0).order_by('-paper_count')[:10]
+        top_journals = Journal.objects.filter(stats__total_papers__gt=0).annotate(
+            paper_count=F('stats__total_papers')
+        ).order_by('-stats__total_papers')[:10]
         
         # Recent activity
         recent_papers = Paper.objects.order_by('-created_at')[:5]
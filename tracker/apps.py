@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class TrackerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "tracker"
+
+    def ready(self):
+        from . import signals  # noqa: F401 - registers the model signal receivers
+        from .search import ensure_fts_triggers
+
+        post_migrate.connect(ensure_fts_triggers, sender=self)
@@ -1,14 +1,199 @@
 """
 Caching utilities for the Open Science Tracker
 Provides high-level caching functions for expensive database operations
+
+Cached statistics, counts, search results and responses are stored under
+the current *dataset generation* (Django cache key versioning). Any data
+change bumps the generation once its transaction commits, which makes every
+older entry unreachable at once - one cache write on any backend, instead
+of pattern deletes (Redis only) or cache.clear(). Stale entries age out
+through their normal timeouts.
+
+Hot statistics also sit in a small per-process LRU (local_cache) in front
+of the shared cache, keyed by generation, so repeat reads skip the network
+round trip and deserialization entirely.
 """
 
-from django.core.cache import cache
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
 from django.conf import settings
-from django.db.models import Count, Avg, Q
+from django.db import connections, transaction
+from django.db.models import F
 from functools import wraps
+from collections import OrderedDict
 import hashlib
 import json
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = 'ost_dataset_generation'
+
+
+def _seed_generation(backend):
+    """
+    (Re)create the generation counter after a flush or eviction. It starts
+    from the clock in nanoseconds, above any generation handed out before,
+    so entries stored under earlier generations are never served again.
+    """
+    seed = time.time_ns()
+    backend.add(GENERATION_KEY, seed, None)
+    return backend.get(GENERATION_KEY, seed)
+
+
+def get_generation(backend=None):
+    """Current dataset generation"""
+    backend = backend or cache
+    generation = backend.get(GENERATION_KEY)
+    if generation is None:
+        generation = _seed_generation(backend)
+    return generation
+
+
+def bump_generation(backend=None):
+    """Start a new dataset generation; every generation-scoped entry is invalidated"""
+    backend = backend or cache
+    try:
+        generation = backend.incr(GENERATION_KEY)
+    except ValueError:
+        _seed_generation(backend)
+        generation = backend.incr(GENERATION_KEY)
+    local_cache.set_generation(generation)
+    return generation
+
+
+class LocalCache:
+    """
+    Per-process LRU for hot, read-only values (bounded by entry count and TTL).
+    
+    Entries belong to a dataset generation. The shared generation is re-read
+    at most every ``generation_check`` seconds; when it has moved on, every
+    local entry is dropped, so an import reaches all workers within that window.
+    Callers must not mutate returned values - they are shared across requests.
+    """
+    
+    def __init__(self, max_entries=256, timeout=30, generation_check=2):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.generation_check = generation_check
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = None
+        self._generation_checked = 0.0
+    
+    def _sync_generation(self):
+        if time.monotonic() - self._generation_checked > self.generation_check:
+            self.set_generation(get_generation())
+    
+    def set_generation(self, generation):
+        with self._lock:
+            if generation != self._generation:
+                self._data.clear()
+                self._generation = generation
+            self._generation_checked = time.monotonic()
+    
+    def generation(self):
+        """The shared generation as last read (re-read at most every ``generation_check`` seconds)"""
+        self._sync_generation()
+        return self._generation
+    
+    def get(self, key, default=None):
+        self._sync_generation()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[1] < time.monotonic():
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+    
+    def set(self, key, value, timeout=None):
+        timeout = min(timeout or self.timeout, self.timeout)
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + timeout)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+    
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._data),
+            'max_entries': self.max_entries,
+            'generation': self._generation,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0.0,
+        }
+
+
+local_cache = LocalCache(**getattr(settings, 'OST_LOCAL_CACHE', {}))
+
+
+class GenerationCache:
+    """
+    Cache proxy that reads and writes under the current dataset generation.
+    
+    On the default cache the generation comes from local_cache, which
+    re-reads it at most every ``generation_check`` seconds, so a cached read
+    is one round trip instead of two.
+    """
+
+    def __init__(self, alias=DEFAULT_CACHE_ALIAS):
+        self.alias = alias
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def _version(self):
+        if self.alias == DEFAULT_CACHE_ALIAS:
+            return local_cache.generation()
+        return get_generation(self.backend)
+
+    def get(self, key, default=None):
+        return self.backend.get(key, default, version=self._version())
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        self.backend.set(key, value, timeout, version=self._version())
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT):
+        return self.backend.add(key, value, timeout, version=self._version())
+
+    def delete(self, key):
+        return self.backend.delete(key, version=self._version())
+
+    def get_many(self, keys):
+        return self.backend.get_many(keys, version=self._version())
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT):
+        return self.backend.set_many(data, timeout, version=self._version())
+
+
+dataset_cache = GenerationCache()
+
+
+def generation_cache_page(timeout, *, key_prefix=None):
+    """cache_page() whose entries belong to the current dataset generation"""
+    from django.utils.decorators import decorator_from_middleware_with_args
+    from .middleware import GenerationCacheMiddleware
+
+    return decorator_from_middleware_with_args(GenerationCacheMiddleware)(
+        page_timeout=timeout,
+        key_prefix=key_prefix,
+    )
 
 def make_cache_key(*args, **kwargs):
     """Generate a consistent cache key from arguments"""
@@ -20,10 +205,84 @@ def make_cache_key(*args, **kwargs):
     hash_object = hashlib.md5(key_string.encode())
     return f"ost_{hash_object.hexdigest()}"
 
-def cached_query(timeout=None, key_prefix='query'):
+# Stampede protection for get_or_compute()
+STALE_FACTOR = 0.5   # Entries stay servable (stale) for this fraction of the timeout after going soft-expired
+JITTER = 0.1         # +/- spread on the soft expiry so entries set together don't expire together
+LOCK_TIMEOUT = 60    # Seconds a recompute lock is held at most (a crashed worker can't block forever)
+LOCK_WAIT = 5        # Seconds a worker waits for another worker's fresh value on a cold miss
+LOCK_POLL = 0.05
+
+_MISSING = object()
+
+
+def _store(cache_key, value, timeout):
+    soft = timeout * random.uniform(1 - JITTER, 1 + JITTER)
+    envelope = {'value': value, 'fresh_until': time.time() + soft}
+    dataset_cache.set(cache_key, envelope, int(soft + timeout * STALE_FACTOR) + 1)
+
+
+def _compute_and_store(cache_key, compute, timeout, lock_key):
+    try:
+        value = compute()
+        _store(cache_key, value, timeout)
+        return value
+    finally:
+        dataset_cache.delete(lock_key)
+
+
+def get_or_compute(cache_key, compute, timeout, local=False):
+    """
+    Cached value of ``compute()`` with stampede protection.
+    
+    With ``local=True`` the per-process LRU is checked first and filled from
+    the shared cache (for small, hot, read-only values).
+    
+    - Any stored value is a hit, including None, 0 and empty lists.
+    - Only the worker that wins the per-key ``add()`` lock recomputes.
+    - Past its (jittered) soft expiry an entry is still served while that one
+      worker refreshes it; on a cold miss the other workers wait briefly for it.
+    """
+    if local:
+        value = local_cache.get(cache_key, _MISSING)
+        if value is _MISSING:
+            value = get_or_compute(cache_key, compute, timeout)
+            local_cache.set(cache_key, value)
+        return value
+    
+    lock_key = f"{cache_key}_lock"
+    envelope = dataset_cache.get(cache_key, _MISSING)
+    
+    if envelope is not _MISSING:
+        if time.time() < envelope['fresh_until']:
+            return envelope['value']
+        if dataset_cache.add(lock_key, 1, LOCK_TIMEOUT):
+            return _compute_and_store(cache_key, compute, timeout, lock_key)
+        return envelope['value']  # Stale while another worker revalidates
+    
+    if dataset_cache.add(lock_key, 1, LOCK_TIMEOUT):
+        return _compute_and_store(cache_key, compute, timeout, lock_key)
+    
+    # Someone else is computing: wait for their result rather than piling on
+    deadline = time.time() + LOCK_WAIT
+    while time.time() < deadline:
+        time.sleep(LOCK_POLL)
+        envelope = dataset_cache.get(cache_key, _MISSING)
+        if envelope is not _MISSING:
+            return envelope['value']
+    logger.warning(f"Timed out waiting for {cache_key}; computing it here")
+    value = compute()
+    _store(cache_key, value, timeout)
+    return value
+
+
+def cached_query(timeout=None, key_prefix='query', local=False):
     """
     Decorator for caching expensive database queries
     
+    Results are stored in the current dataset generation through
+    get_or_compute(), so expiry under load triggers one recompute, not one
+    per worker. ``local=True`` adds the per-process LRU tier in front.
+    
     Usage:
     @cached_query(timeout=300, key_prefix='home_stats')
     def get_home_statistics():
@@ -34,55 +293,36 @@ def cached_query(timeout=None, key_prefix='query'):
         def wrapper(*args, **kwargs):
             # Generate cache key
             cache_key = f"{key_prefix}_{make_cache_key(func.__name__, *args, **kwargs)}"
-            
-            # Try to get from cache
-            result = cache.get(cache_key)
-            if result is not None:
-                return result
-            
-            # Execute function and cache result
-            result = func(*args, **kwargs)
             cache_timeout = timeout or getattr(settings, 'CACHE_TIMEOUTS', {}).get('default', 900)
-            cache.set(cache_key, result, cache_timeout)
-            
-            return result
+            return get_or_compute(cache_key, lambda: func(*args, **kwargs), cache_timeout, local=local)
         return wrapper
     return decorator
 
-@cached_query(timeout=900, key_prefix='home_stats')  # 15 minutes
 def get_home_page_statistics(year_filter='2000'):
-    """Get cached statistics for home page"""
-    from .models import Paper
-    
-    papers_queryset = Paper.objects.all()
-    if year_filter == '2000':
-        papers_queryset = papers_queryset.filter(pub_year__gte=2000)
-    
-    stats = papers_queryset.aggregate(
-        total_papers=Count('id'),
-        avg_transparency_score=Avg('transparency_score'),
-        open_data_count=Count('id', filter=Q(is_open_data=True)),
-        open_code_count=Count('id', filter=Q(is_open_code=True)),
-        coi_count=Count('id', filter=Q(is_coi_pred=True)),
-        funding_count=Count('id', filter=Q(is_fund_pred=True)),
-        registration_count=Count('id', filter=Q(is_register_pred=True)),
-        open_access_count=Count('id', filter=Q(is_open_access=True))
-    )
+    """Get cached statistics for home page (StatsEngine caches the underlying totals)"""
+    from .stats import StatsEngine
     
-    # Calculate percentages
-    total_papers = max(stats['total_papers'], 1)
-    stats.update({
-        'open_data_pct': round((stats['open_data_count'] / total_papers) * 100, 1),
-        'open_code_pct': round((stats['open_code_count'] / total_papers) * 100, 1),
-        'coi_pct': round((stats['coi_count'] / total_papers) * 100, 1),
-        'funding_pct': round((stats['funding_count'] / total_papers) * 100, 1),
-        'registration_pct': round((stats['registration_count'] / total_papers) * 100, 1),
-        'open_access_pct': round((stats['open_access_count'] / total_papers) * 100, 1),
-    })
+    filters = {'pub_year__gte': 2000} if year_filter == '2000' else {}
+    totals = StatsEngine(**filters).stats()
     
-    return stats
+    return {
+        'total_papers': totals['total_papers'],
+        'avg_transparency_score': totals['avg_transparency_score'] if totals['total_papers'] else None,
+        'open_data_count': totals['open_data_count'],
+        'open_code_count': totals['open_code_count'],
+        'coi_count': totals['coi_disclosure_count'],
+        'funding_count': totals['funding_count'],
+        'registration_count': totals['registration_count'],
+        'open_access_count': totals['open_access_count'],
+        'open_data_pct': totals['open_data_pct'],
+        'open_code_pct': totals['open_code_pct'],
+        'coi_pct': totals['coi_disclosure_pct'],
+        'funding_pct': totals['funding_pct'],
+        'registration_pct': totals['registration_pct'],
+        'open_access_pct': totals['open_access_pct'],
+    }
 
-@cached_query(timeout=1800, key_prefix='field_stats')  # 30 minutes
+@cached_query(timeout=1800, key_prefix='field_stats', local=True)  # 30 minutes
 def get_field_statistics():
     """Get cached statistics for research fields"""
     from .models import ResearchField
@@ -97,39 +337,38 @@ def get_journal_statistics():
     from .models import Journal
     
     # Convert QuerySet to list for caching
-    journals = Journal.objects.annotate(
-        paper_count=Count('papers'),
-        avg_transparency=Avg('papers__transparency_score')
-    ).filter(paper_count__gt=0).order_by('-paper_count')
+    journals = Journal.objects.filter(stats__total_papers__gt=0).annotate(
+        paper_count=F('stats__total_papers'),
+        avg_transparency=F('stats__avg_transparency_score')
+    ).order_by('-stats__total_papers')
     return list(journals)
 
 @cached_query(timeout=3600, key_prefix='transparency_trends')  # 1 hour
 def get_transparency_trends():
-    """Get transparency trends over time"""
-    from .models import Paper
-    
-    # Get yearly transparency trends
-    trends = Paper.objects.filter(
-        pub_year__gte=2000,
-        pub_year__lte=2023
-    ).values('pub_year').annotate(
-        total_papers=Count('id'),
-        avg_transparency=Avg('transparency_score'),
-        open_data_pct=Count('id', filter=Q(is_open_data=True)) * 100.0 / Count('id'),
-        open_code_pct=Count('id', filter=Q(is_open_code=True)) * 100.0 / Count('id'),
-        coi_pct=Count('id', filter=Q(is_coi_pred=True)) * 100.0 / Count('id'),
-    ).order_by('pub_year')
-    
-    return list(trends)
-
-@cached_query(timeout=600, key_prefix='search_counts')  # 10 minutes
+    """Get transparency trends over time (read from the TransparencyTrend rollup)"""
+    from .rollups import yearly_trends
+    
+    return [
+        {
+            'pub_year': trend['year'],
+            'total_papers': trend['total_papers'],
+            'avg_transparency': trend['avg_transparency_score'],
+            'open_data_pct': trend['data_sharing_pct'],
+            'open_code_pct': trend['code_sharing_pct'],
+            'coi_pct': trend['coi_disclosure_pct'],
+        }
+        for trend in yearly_trends(start_year=2000, end_year=2023)
+    ]
+
+@cached_query(timeout=600, key_prefix='search_counts', local=True)  # 10 minutes
 def get_search_filter_counts():
     """Get counts for search filters"""
+    from .counts import table_count
     from .models import Paper, Journal
     
     return {
-        'total_papers': Paper.objects.count(),
-        'total_journals': Journal.objects.count(),
+        'total_papers': table_count(Paper),
+        'total_journals': table_count(Journal),
         'years_available': list(
             Paper.objects.values_list('pub_year', flat=True)
             .distinct().order_by('-pub_year')[:20]
@@ -144,38 +383,59 @@ def get_search_filter_counts():
 
 def invalidate_cache_pattern(pattern):
     """Invalidate cache keys matching a pattern"""
-    # Note: This requires Redis backend for pattern-based deletion
+    # Pattern deletion needs Redis; generation-scoped keys are covered by a bump everywhere
     if hasattr(cache, 'delete_pattern'):
         cache.delete_pattern(f"*{pattern}*")
     else:
-        # Fallback: clear entire cache
-        cache.clear()
+        invalidate_stats_cache()
 
-def invalidate_stats_cache():
-    """Invalidate all statistics caches when data changes"""
-    patterns = ['home_stats', 'field_stats', 'journal_stats', 'transparency_trends', 'search_counts']
-    for pattern in patterns:
-        invalidate_cache_pattern(pattern)
+def invalidate_stats_cache(using='default'):
+    """
+    Invalidate all statistics, count, search and response caches when data changes.
+    
+    The generation is bumped when the current transaction commits (right away
+    outside one), once per transaction however many rows changed.
+    """
+    connection = connections[using]
+    if connection.in_atomic_block:
+        pending = getattr(connection, 'run_on_commit', [])
+        if any(callback[1] is bump_generation for callback in pending):
+            return
+    transaction.on_commit(bump_generation, using=using)
 
 # Cache warming functions (run these periodically)
 def warm_cache():
-    """Warm up the cache with commonly accessed data"""
-    # Warm home page stats for both year filters
-    get_home_page_statistics('2000')
-    get_home_page_statistics('all')
+    """
+    Warm up the cache with commonly accessed data
     
-    # Warm field and journal stats
-    get_field_statistics()
-    get_journal_statistics()
+    Returns {name: seconds}; tracker.warming.WarmingPlanner adds the most
+    requested pages on top of these keys.
+    """
+    from .stats import StatsEngine
     
-    # Warm search filters
-    get_search_filter_counts()
+    warmers = [
+        # Home page stats for both year filters
+        ('home_stats:2000', lambda: get_home_page_statistics('2000')),
+        ('home_stats:all', lambda: get_home_page_statistics('all')),
+        # Statistics page totals and score distribution
+        ('paper_stats:distribution', lambda: StatsEngine().stats(distribution=True)),
+        # Field and journal stats
+        ('field_stats', get_field_statistics),
+        ('journal_stats', get_journal_statistics),
+        # Search filters
+        ('search_counts', get_search_filter_counts),
+    ]
+    timings = {}
+    for name, warm in warmers:
+        started = time.monotonic()
+        warm()
+        timings[name] = round(time.monotonic() - started, 3)
     
-    print("✅ Cache warmed successfully")
+    logger.info(f"✅ Cache warmed: {', '.join(f'{name} {seconds}s' for name, seconds in timings.items())}")
+    return timings
 
 # Performance monitoring
 def get_cache_stats():
-    """Get cache performance statistics"""
-    if hasattr(cache, 'get_stats'):
-        return cache.get_stats()
-    return {'status': 'Cache stats not available'} 
\ No newline at end of file
+    """Get cache performance statistics (shared backend where supported, plus the local LRU tier)"""
+    shared = cache.get_stats() if hasattr(cache, 'get_stats') else {'status': 'Cache stats not available'}
+    return {'shared': shared, 'local': local_cache.stats()}
@@ -0,0 +1,193 @@
+"""
+Row counts for Open Science Tracker
+
+COUNT(*) is a full scan on PostgreSQL, and listings, health checks and
+overview pages run one on every request. This module answers "how many?"
+without that scan when an exact number isn't needed:
+
+- estimate_count(): the planner's estimate - pg_class.reltuples for a whole
+  table, EXPLAIN row estimates for a filtered queryset. Other engines count
+  exactly.
+- exact_count(): a cached exact count, refreshed by refresh_table_counts()
+  after every import (see rollups.refresh_rollups).
+- fast_count(): the estimate, or the exact count when the estimate is small
+  enough that counting is cheap.
+
+All three return a RowCount: an int that knows whether it is an estimate, so
+templates can show "~N results" (see the ``result_count`` filter) and
+EstimatedCountPaginator can page without counting.
+"""
+
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from .cache_utils import dataset_cache
+
+logger = logging.getLogger(__name__)
+
+# Below this many (estimated) rows an exact count is cheap enough to run
+ESTIMATE_THRESHOLD = getattr(settings, 'OST_COUNT_ESTIMATE_THRESHOLD', 10000)
+
+COUNT_CACHE_PREFIX = 'row_counts'
+
+
+def _timeout():
+    return getattr(settings, 'CACHE_TIMEOUTS', {}).get('paper_count', 600)
+
+
+class RowCount(int):
+    """An int that remembers whether it is a planner estimate"""
+
+    def __new__(cls, value, estimated=False):
+        count = super().__new__(cls, max(int(value), 0))
+        count.estimated = estimated
+        return count
+
+    def display(self):
+        return f'~{int(self):,}' if self.estimated else f'{int(self):,}'
+
+
+def _is_unfiltered(queryset):
+    query = queryset.query
+    return (
+        not query.where and not query.distinct and query.combinator is None
+        and query.low_mark == 0 and query.high_mark is None
+    )
+
+
+def _cache_key(queryset):
+    if _is_unfiltered(queryset):
+        return f'{COUNT_CACHE_PREFIX}_{queryset.model._meta.db_table}'
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.md5(json.dumps([sql, params], default=str).encode()).hexdigest()
+    return f'{COUNT_CACHE_PREFIX}_{digest}'
+
+
+def exact_count(queryset, refresh=False):
+    """Exact count, cached until the next import refreshes or drops it"""
+    key = _cache_key(queryset)
+    if not refresh:
+        count = dataset_cache.get(key)
+        if count is not None:
+            return RowCount(count)
+    count = queryset.count()
+    dataset_cache.set(key, count, _timeout())
+    return RowCount(count)
+
+
+def _planner_estimate(queryset):
+    """PostgreSQL's row estimate for ``queryset`` (None if unavailable)"""
+    connection = connections[queryset.db]
+    with connection.cursor() as cursor:
+        if _is_unfiltered(queryset):
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            # reltuples is -1 (or 0) until the table has been vacuumed/analyzed
+            return row[0] if row and row[0] > 0 else None
+
+        sql, params = queryset.order_by().select_related(None).query.sql_with_params()
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]['Plan']['Plan Rows']
+
+
+def estimate_count(queryset):
+    """Planner estimate on PostgreSQL (a cached exact count wins when present); exact elsewhere"""
+    if connections[queryset.db].vendor != 'postgresql':
+        return exact_count(queryset)
+
+    cached = dataset_cache.get(_cache_key(queryset))
+    if cached is not None:
+        return RowCount(cached)
+    try:
+        estimate = _planner_estimate(queryset)
+    except Exception as e:
+        logger.warning(f"Count estimate failed, counting exactly: {e}")
+        estimate = None
+    if estimate is None:
+        return exact_count(queryset)
+    return RowCount(estimate, estimated=True)
+
+
+def fast_count(queryset, threshold=ESTIMATE_THRESHOLD):
+    """Estimate for large results, exact (cached) count when the estimate is small"""
+    count = estimate_count(queryset)
+    if count.estimated and count < threshold:
+        return exact_count(queryset)
+    return count
+
+
+def table_count(model, exact=True):
+    """Rows in ``model``'s table: cached exact count, or the planner estimate"""
+    queryset = model._default_manager.all()
+    return exact_count(queryset) if exact else estimate_count(queryset)
+
+
+def refresh_table_counts():
+    """Recount the main tables (run after imports so cached counts stay exact)"""
+    from .models import Journal, Paper, ResearchField
+
+    return {
+        model._meta.model_name: exact_count(model._default_manager.all(), refresh=True)
+        for model in (Paper, Journal, ResearchField)
+    }
+
+
+class EstimatedPage(Page):
+    """Page that knows from a look-ahead row whether another page follows"""
+
+    def __init__(self, object_list, number, paginator, has_next=None):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return super().has_next() if self._has_next is None else self._has_next
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator whose count comes from fast_count(), so large listings never
+    run COUNT(*). Page numbers beyond an over-estimated last page render empty
+    instead of raising; when the count is an estimate, each page reads one
+    row ahead, so an under-estimate can't end the ``next`` links early.
+    """
+
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, 'query'):
+            return fast_count(self.object_list)
+        return RowCount(len(self.object_list))
+
+    @property
+    def estimated(self):
+        return getattr(self.count, 'estimated', False)
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if self.estimated and int(number) > 1:
+                return int(number)
+            raise
+
+    def page(self, number):
+        if not self.estimated:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return self._get_page(rows[:self.per_page], number, self, has_next=len(rows) > self.per_page)
+
+    def _get_page(self, *args, **kwargs):
+        return EstimatedPage(*args, **kwargs)
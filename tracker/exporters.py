@@ -0,0 +1,270 @@
+"""
+Paper export formats for Open Science Tracker
+
+Every exporter turns a ``values_list`` queryset into a stream of bytes,
+reading it in batches from a server-side cursor so a full export runs in
+flat memory:
+
+- csv: the original spreadsheet-friendly columns and headers
+- ndjson: one JSON object per line
+- parquet: one row group per batch, zstd-compressed, journal and subject
+  columns dictionary-encoded (they load as categoricals in pandas)
+- arrows: Arrow IPC stream, record batches with the same schema (each
+  batch carries its own dictionaries, which the IPC file format forbids)
+
+Parquet and Arrow load an order of magnitude faster than CSV and are
+several times smaller; both need pyarrow. csv and ndjson can be gzipped
+on the fly.
+"""
+
+import csv
+import io
+import json
+import zlib
+
+from django.http import StreamingHttpResponse
+
+# Columnar/JSON exports: field, Arrow type ('category' = dictionary-encoded string)
+EXPORT_FIELDS = [
+    ('id', 'int64'),
+    ('epmc_id', 'string'),
+    ('pmid', 'string'),
+    ('pmcid', 'string'),
+    ('doi', 'string'),
+    ('title', 'string'),
+    ('author_string', 'string'),
+    ('journal_id', 'int64'),
+    ('journal_title', 'category'),
+    ('pub_year', 'int32'),
+    ('pub_type', 'category'),
+    ('broad_subject_term', 'category'),
+    ('is_open_data', 'bool'),
+    ('is_open_code', 'bool'),
+    ('is_coi_pred', 'bool'),
+    ('is_fund_pred', 'bool'),
+    ('is_register_pred', 'bool'),
+    ('is_open_access', 'bool'),
+    ('transparency_score', 'int8'),
+]
+
+
+class ExportError(Exception):
+    """The export format can't be produced (unknown format or missing dependency)"""
+
+
+def batches(queryset, size):
+    """Lists of up to ``size`` rows, fetched ``size`` at a time"""
+    batch = []
+    for row in queryset.iterator(chunk_size=size):
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def gzip_stream(chunks):
+    """Gzip-compress a stream of byte chunks on the fly"""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain()"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class Exporter:
+    """Base class: ``columns`` to fetch and ``stream(queryset)`` yielding bytes"""
+
+    extension = None
+    content_type = 'application/octet-stream'
+    compressible = False  # Worth gzipping (text formats)
+    batch_size = 2000
+
+    columns = [field for field, _ in EXPORT_FIELDS]
+
+    @classmethod
+    def available(cls):
+        """Whether the libraries this format needs are installed"""
+        return True
+
+    def stream(self, queryset):
+        raise NotImplementedError
+
+
+class CSVExporter(Exporter):
+    extension = 'csv'
+    content_type = 'text/csv'
+    compressible = True
+
+    header = [
+        'PMID', 'Title', 'Authors', 'Journal', 'Year', 'DOI',
+        'Data Sharing', 'Code Sharing', 'COI Disclosure',
+        'Funding Disclosure', 'Protocol Registration',
+        'Transparency Score'
+    ]
+    columns = [
+        'pmid', 'title', 'author_string', 'journal_title', 'pub_year', 'doi',
+        'is_open_data', 'is_open_code', 'is_coi_pred',
+        'is_fund_pred', 'is_register_pred',
+        'transparency_score'
+    ]
+
+    def stream(self, queryset):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.header)
+        for batch in batches(queryset, self.batch_size):
+            writer.writerows(batch)
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue().encode('utf-8')
+
+
+class NDJSONExporter(Exporter):
+    extension = 'ndjson'
+    content_type = 'application/x-ndjson'
+    compressible = True
+
+    def stream(self, queryset):
+        for batch in batches(queryset, self.batch_size):
+            yield ''.join(
+                json.dumps(dict(zip(self.columns, row)), ensure_ascii=False) + '\n' for row in batch
+            ).encode('utf-8')
+
+
+class ArrowExporter(Exporter):
+    """Arrow IPC stream; subclasses change the writer"""
+
+    extension = 'arrows'
+    content_type = 'application/vnd.apache.arrow.stream'
+    batch_size = 50000  # Rows per record batch / Parquet row group
+
+    def schema(self):
+        import pyarrow as pa
+
+        types = {
+            'string': pa.string(),
+            'category': pa.dictionary(pa.int32(), pa.string()),
+            'int64': pa.int64(),
+            'int32': pa.int32(),
+            'int8': pa.int8(),
+            'bool': pa.bool_(),
+        }
+        return pa.schema([(field, types[kind]) for field, kind in EXPORT_FIELDS])
+
+    def record_batch(self, schema, rows):
+        import pyarrow as pa
+
+        columns = list(zip(*rows))
+        return pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+            schema=schema,
+        )
+
+    def open_writer(self, sink, schema):
+        import pyarrow as pa
+        return pa.ipc.new_stream(sink, schema)
+
+    def write(self, writer, batch):
+        writer.write_batch(batch)
+
+    @classmethod
+    def available(cls):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def stream(self, queryset):
+        if not self.available():
+            raise ExportError(f"{self.extension} export needs pyarrow")
+
+        return self._stream(queryset)
+
+    def _stream(self, queryset):
+        schema = self.schema()
+        sink = _ChunkSink()
+        writer = self.open_writer(sink, schema)
+        for rows in batches(queryset, self.batch_size):
+            self.write(writer, self.record_batch(schema, rows))
+            yield sink.drain()
+        writer.close()
+        yield sink.drain()
+
+
+class ParquetExporter(ArrowExporter):
+    extension = 'parquet'
+    content_type = 'application/vnd.apache.parquet'
+
+    def open_writer(self, sink, schema):
+        import pyarrow.parquet as pq
+
+        categorical = [field for field, kind in EXPORT_FIELDS if kind == 'category']
+        return pq.ParquetWriter(sink, schema, compression='zstd', use_dictionary=categorical)
+
+    def write(self, writer, batch):
+        # One row group per batch, so each is written (and sent) as soon as it is read
+        writer.write_batch(batch, row_group_size=len(batch))
+
+
+EXPORTERS = {exporter.extension: exporter for exporter in (CSVExporter, NDJSONExporter, ParquetExporter, ArrowExporter)}
+
+EXPORT_FORMATS = [
+    ('csv', 'CSV'),
+    ('ndjson', 'JSON Lines'),
+    ('parquet', 'Parquet'),
+    ('arrows', 'Arrow IPC stream'),
+]
+
+
+def export_response(queryset, extension, compress=False, filename='ost_papers'):
+    """
+    StreamingHttpResponse exporting Paper ``queryset`` as ``extension``;
+    ``compress`` gzips text formats. Raises ExportError for unknown formats.
+    """
+    if extension not in EXPORTERS:
+        raise ExportError(f"Unknown export format: {extension}")
+    exporter = EXPORTERS[extension]()
+
+    # No ORDER BY: rows stream in table order instead of waiting for a full sort
+    content = exporter.stream(queryset.order_by().values_list(*exporter.columns))
+    filename = f'{filename}.{exporter.extension}'
+    content_type = exporter.content_type
+    if compress and exporter.compressible:
+        content = gzip_stream(content)
+        filename += '.gz'
+        content_type = 'application/gzip'
+
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,131 @@
+"""
+Serializer-free list rendering for Open Science Tracker
+
+A ModelSerializer walks every field of every object through get_attribute()
+and to_representation(), which dominates the CPU time of a 50-row list page.
+When all of a serializer's fields are plain model columns (possibly across
+forward foreign keys, like PaperListSerializer's journal_name), RowSerializer
+compiles it once into (output name, values() path, converter) columns. Rows
+then come straight from ``queryset.values()`` and are mapped to dicts with
+the same keys, order and values the serializer would produce; converters are
+only kept for fields whose representation isn't the database value itself.
+
+Serializers with method fields or nested serializers don't compile
+(RowSerializer.compile returns None) and keep using DRF.
+"""
+
+from django.db import models
+from django.utils.encoding import is_protected_type
+from rest_framework import serializers
+
+# Serializer fields whose representation of a value of these model field types is the value itself
+IDENTITY_FIELDS = {
+    serializers.CharField: {'CharField', 'TextField', 'SlugField'},
+    serializers.IntegerField: {
+        'IntegerField', 'BigIntegerField', 'SmallIntegerField', 'PositiveIntegerField',
+        'PositiveBigIntegerField', 'PositiveSmallIntegerField', 'AutoField', 'BigAutoField',
+    },
+    serializers.BooleanField: {'BooleanField'},
+}
+
+
+def _model_value(value):
+    """serializers.ModelField.to_representation() of a default value_to_string() field"""
+    return value if is_protected_type(value) else str(value)
+
+
+class RowSerializer:
+    """
+    ``serializer``'s fields as values() columns; build with compile(), which
+    returns None when a field can't be read from a values() row.
+    """
+
+    def __init__(self, model, columns):
+        self.model = model
+        self.columns = columns  # (name, path, convert or None, FK paths that must be set)
+
+    @classmethod
+    def compile(cls, serializer):
+        model = serializer.Meta.model
+        columns = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            column = cls._column(model, name, field)
+            if column is None:
+                return None
+            columns.append(column)
+        return cls(model, columns)
+
+    @staticmethod
+    def _column(model, name, field):
+        if isinstance(field, (serializers.SerializerMethodField, serializers.BaseSerializer)) or field.source == '*':
+            return None
+
+        # Walk forward foreign keys; DRF omits the field when one of them is NULL
+        parts = field.source.split('.')
+        guards = []
+        for depth, part in enumerate(parts[:-1]):
+            try:
+                relation = model._meta.get_field(part)
+            except Exception:
+                return None
+            if not (relation.many_to_one or relation.one_to_one) or not relation.concrete:
+                return None
+            guards.append('__'.join(parts[:depth + 1]))
+            model = relation.related_model
+        try:
+            model_field = model._meta.get_field(parts[-1])
+        except Exception:
+            return None  # A property or other non-column source
+        if model_field.is_relation or not model_field.concrete:
+            return None
+
+        if isinstance(field, serializers.ReadOnlyField):
+            convert = None
+        elif isinstance(field, serializers.ModelField):
+            if type(model_field).value_to_string is not models.Field.value_to_string:
+                return None
+            convert = _model_value
+        elif model_field.get_internal_type() in IDENTITY_FIELDS.get(type(field), ()):
+            convert = None
+        else:
+            convert = field.to_representation
+        return name, '__'.join(parts), convert, guards
+
+    def paths(self, queryset):
+        """
+        values() paths: every column and relation guard, plus the primary key
+        and ordering columns (pagination cursors read them from the rows)
+        """
+        paths = {self.model._meta.pk.attname}
+        for _, path, _, guards in self.columns:
+            paths.add(path)
+            paths.update(guards)
+        for name in queryset.query.order_by or self.model._meta.ordering:
+            if not isinstance(name, str):
+                continue
+            name = name.lstrip('-')
+            try:
+                field = self.model._meta.get_field(self.model._meta.pk.name if name == 'pk' else name)
+            except Exception:
+                continue
+            if field.concrete and not field.is_relation:
+                paths.add(field.attname)
+        return sorted(paths)
+
+    def values(self, queryset):
+        return queryset.values(*self.paths(queryset))
+
+    def to_representation(self, rows):
+        """Serializer output for values() ``rows``"""
+        data = []
+        for row in rows:
+            item = {}
+            for name, path, convert, guards in self.columns:
+                if guards and any(row[guard] is None for guard in guards):
+                    continue
+                value = row[path]
+                item[name] = value if convert is None or value is None else convert(value)
+            data.append(item)
+        return data
@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth.models import User
 from .models import UserProfile, ResearchField, Paper, Journal
+from .exporters import EXPORT_FORMATS
 
 class UserProfileForm(forms.ModelForm):
     """Form for editing user profiles"""
@@ -291,11 +292,7 @@ class ContactForm(forms.Form):
 class DataExportForm(forms.Form):
     """Form for customizing data exports"""
     
-    EXPORT_FORMATS = [
-        ('csv', 'CSV'),
-        ('json', 'JSON'),
-        ('xlsx', 'Excel'),
-    ]
+    EXPORT_FORMATS = EXPORT_FORMATS  # See tracker.exporters
     
     format = forms.ChoiceField(
         choices=EXPORT_FORMATS,
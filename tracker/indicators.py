@@ -0,0 +1,155 @@
+"""
+Transparency indicator definitions for Open Science Tracker
+
+The six rtransparent indicators are stored as individual boolean columns on
+Paper and packed into ``Paper.indicator_mask`` (one bit per indicator), so
+combination filters and combination statistics can run against a single
+indexed small-integer column.
+
+``transparency_score``, ``transparency_score_pct`` and ``indicator_mask`` are
+database-generated columns built from the expressions below, so they can
+never drift from the booleans, whichever write path touched the row.
+"""
+
+import operator
+from functools import reduce
+
+from django.db.models import Case, DecimalField, FloatField, IntegerField, Q, Value, When
+from django.db.models.functions import Cast, Round
+
+# (key, model field, bit, label) - the bit assignments are stored in the
+# database and must never be reordered
+INDICATORS = [
+    ('coi_disclosure', 'is_coi_pred', 1, 'COI Disclosure'),
+    ('funding', 'is_fund_pred', 2, 'Funding Disclosure'),
+    ('registration', 'is_register_pred', 4, 'Protocol Registration'),
+    ('open_data', 'is_open_data', 8, 'Data Sharing'),
+    ('open_code', 'is_open_code', 16, 'Code Sharing'),
+    ('open_access', 'is_open_access', 32, 'Open Access'),
+]
+
+INDICATOR_FIELDS = [field for _, field, _, _ in INDICATORS]
+INDICATOR_BITS = {field: bit for _, field, bit, _ in INDICATORS}
+ALL_INDICATORS_MASK = sum(INDICATOR_BITS.values())
+
+# Names accepted by the web and API filters, mapped to model fields
+INDICATOR_ALIASES = {
+    'coi_disclosure': 'is_coi_pred',
+    'conflict_of_interest': 'is_coi_pred',
+    'coi': 'is_coi_pred',
+    'funding': 'is_fund_pred',
+    'funding_declaration': 'is_fund_pred',
+    'funding_disclosure': 'is_fund_pred',
+    'registration': 'is_register_pred',
+    'protocol_registration': 'is_register_pred',
+    'open_data': 'is_open_data',
+    'data_sharing': 'is_open_data',
+    'open_code': 'is_open_code',
+    'code_sharing': 'is_open_code',
+    'open_access': 'is_open_access',
+}
+INDICATOR_ALIASES.update({field: field for field in INDICATOR_FIELDS})
+
+
+def _indicator_sum(weights):
+    """Sum of ``CASE WHEN <field> THEN <weight> ELSE 0 END`` over the indicator fields"""
+    return reduce(operator.add, (
+        Case(When(**{field: True}, then=Value(weight)), default=Value(0), output_field=IntegerField())
+        for field, weight in weights.items()
+    ))
+
+
+def transparency_score_expression():
+    """Database expression for the 0-6 transparency score"""
+    return _indicator_sum({field: 1 for field in INDICATOR_FIELDS})
+
+
+def transparency_score_pct_expression():
+    """
+    Database expression for the score as a percentage rounded to one decimal.
+
+    The intermediate cast to numeric keeps ROUND(x, 1) valid on PostgreSQL,
+    which has no two-argument ROUND for double precision.
+    """
+    pct = Cast(
+        transparency_score_expression() * Value(100.0) / Value(len(INDICATORS)),
+        output_field=DecimalField(max_digits=6, decimal_places=3),
+    )
+    return Cast(Round(pct, 1), output_field=FloatField())
+
+
+def indicator_mask_expression():
+    """Database expression packing the six indicator booleans into a bitmask"""
+    return _indicator_sum(INDICATOR_BITS)
+
+
+def compute_indicator_mask(source):
+    """Pack the six indicator booleans of a Paper (or a dict of field values) into a bitmask"""
+    if isinstance(source, dict):
+        get = source.get
+    else:
+        get = lambda field: getattr(source, field, False)
+
+    mask = 0
+    for field, bit in INDICATOR_BITS.items():
+        if get(field):
+            mask |= bit
+    return mask
+
+
+def mask_for(names):
+    """Convert indicator names (aliases or field names) into a bitmask, ignoring unknown names"""
+    mask = 0
+    for name in names:
+        field = INDICATOR_ALIASES.get(str(name).strip().lower())
+        if field:
+            mask |= INDICATOR_BITS[field]
+    return mask
+
+
+def masks_with_all(required):
+    """All stored mask values that have every bit of ``required`` set"""
+    return [mask for mask in range(ALL_INDICATORS_MASK + 1) if mask & required == required]
+
+
+def masks_with_any(bits):
+    """All stored mask values that have at least one bit of ``bits`` set"""
+    return [mask for mask in range(ALL_INDICATORS_MASK + 1) if mask & bits]
+
+
+def indicator_filter(names, match='all'):
+    """
+    Build a Q object answering "has all of X, Y" or "any of X, Y".
+
+    The matching mask values are enumerated here (at most 64), so the
+    database only sees an IN lookup on the indexed indicator_mask column.
+    """
+    bits = mask_for(names)
+    if not bits:
+        return Q()
+    if match == 'any':
+        return Q(indicator_mask__in=masks_with_any(bits))
+    return Q(indicator_mask__in=masks_with_all(bits))
+
+
+def summarize_mask_counts(mask_counts):
+    """
+    Derive per-indicator counts and the score distribution from
+    ``{indicator_mask: paper_count}`` combination counts.
+    """
+    indicator_counts = {field: 0 for field in INDICATOR_FIELDS}
+    score_distribution = {score: 0 for score in range(len(INDICATORS) + 1)}
+    total = 0
+
+    for mask, count in mask_counts.items():
+        total += count
+        score_distribution[bin(mask).count('1')] += count
+        for field, bit in INDICATOR_BITS.items():
+            if mask & bit:
+                indicator_counts[field] += count
+
+    return {
+        'total': total,
+        'indicator_counts': indicator_counts,
+        'score_distribution': score_distribution,
+    }
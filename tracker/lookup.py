@@ -0,0 +1,107 @@
+"""
+Batch identifier lookup for Open Science Tracker
+
+Resolves long lists of mixed PMIDs, PMCIDs and DOIs (as sent to
+POST /api/v1/papers/lookup/) with a few chunked ``IN`` queries on the
+indexed identifier columns instead of one search request per identifier:
+
+- PMCID (``PMC123``): ``pmcid`` or ``epmc_id``, upper-cased
+- PMID (digits): ``pmid`` or ``epmc_id``
+- DOI (bare, ``doi:`` or doi.org URL): ``lower(doi)``, served by an
+  expression index
+
+resolve_identifiers() yields one result per input identifier in input
+order, chunk by chunk, so callers can stream them as they are resolved.
+"""
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from .exporters import EXPORT_FIELDS
+from .search import DOI_RE, PMCID_RE, PMID_RE
+
+LOOKUP_FIELDS = [field for field, _ in EXPORT_FIELDS]
+
+# Identifiers resolved per round of queries (each kind is one IN list)
+CHUNK_SIZE = 1000
+
+
+def max_identifiers():
+    return getattr(settings, 'OST_LOOKUP_MAX_IDS', 100000)
+
+
+def classify_identifier(value):
+    """(kind, normalized value) for a PMID, PMCID or DOI; (None, None) otherwise"""
+    value = str(value).strip()
+    if PMCID_RE.match(value):
+        return 'pmcid', value.upper()
+    if PMID_RE.match(value):
+        return 'pmid', value
+    match = DOI_RE.match(value)
+    if match:
+        return 'doi', match.group(1).lower()
+    return None, None
+
+
+def _match_queries(queryset, wanted):
+    """(kind, queryset) per identifier kind present in ``wanted``"""
+    if wanted['pmcid']:
+        values = list(wanted['pmcid'])
+        yield 'pmcid', queryset.filter(Q(pmcid__in=values) | Q(epmc_id__in=values))
+    if wanted['pmid']:
+        values = list(wanted['pmid'])
+        yield 'pmid', queryset.filter(Q(pmid__in=values) | Q(epmc_id__in=values))
+    if wanted['doi']:
+        yield 'doi', queryset.alias(doi_lower=Lower('doi')).filter(doi_lower__in=list(wanted['doi']))
+
+
+def _keys(kind, row):
+    """Normalized identifiers of ``kind`` that ``row`` answers to"""
+    if kind == 'pmcid':
+        return {(row['pmcid'] or '').upper(), row['epmc_id'].upper()}
+    if kind == 'pmid':
+        return {row['pmid'], row['epmc_id']}
+    return {(row['doi'] or '').lower()}
+
+
+def _resolve_chunk(queryset, identifiers):
+    wanted = {'pmcid': set(), 'pmid': set(), 'doi': set()}
+    parsed = []
+    for identifier in identifiers:
+        kind, value = classify_identifier(identifier)
+        parsed.append((identifier, kind, value))
+        if kind:
+            wanted[kind].add(value)
+
+    found = defaultdict(list)  # (kind, normalized value) -> rows
+    for kind, matches in _match_queries(queryset, wanted):
+        for values in matches.order_by().values_list(*LOOKUP_FIELDS):
+            row = dict(zip(LOOKUP_FIELDS, values))
+            for key in _keys(kind, row) & wanted[kind]:
+                found[kind, key].append(row)
+
+    for identifier, kind, value in parsed:
+        if kind is None:
+            yield {'query': identifier, 'matched': False, 'error': 'not a PMID, PMCID or DOI'}
+        elif (kind, value) not in found:
+            yield {'query': identifier, 'type': kind, 'matched': False}
+        else:
+            for row in found[kind, value]:
+                yield {'query': identifier, 'type': kind, 'matched': True, **row}
+
+
+def resolve_identifiers(identifiers, queryset=None, chunk_size=CHUNK_SIZE):
+    """
+    One dict per identifier (several if an identifier matches more than one
+    paper): ``query`` (the identifier as sent), ``type``, ``matched`` and,
+    when matched, the paper's export fields (including its ``id``).
+    """
+    from .models import Paper
+
+    queryset = Paper.objects.all() if queryset is None else queryset
+    identifiers = list(identifiers)
+    for start in range(0, len(identifiers), chunk_size):
+        yield from _resolve_chunk(queryset, identifiers[start:start + chunk_size])
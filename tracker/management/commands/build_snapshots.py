@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from tracker.snapshots import SNAPSHOT_FORMATS, build_snapshot, list_snapshots, snapshot_root
+
+
+class Command(BaseCommand):
+    help = 'Write a versioned full-dataset snapshot (gzipped CSV and Parquet per year) with a checksum manifest'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--root',
+            type=str,
+            help='Snapshot directory (default: settings.OST_SNAPSHOT_ROOT)',
+        )
+        parser.add_argument(
+            '--formats',
+            nargs='+',
+            choices=SNAPSHOT_FORMATS,
+            default=list(SNAPSHOT_FORMATS),
+            help='Formats to write (default: csv parquet)',
+        )
+        parser.add_argument(
+            '--keep',
+            type=int,
+            help='Number of versions to keep (default: settings.OST_SNAPSHOT_KEEP)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('📦 Building dataset snapshot...'))
+
+        manifest = build_snapshot(root=options['root'], formats=options['formats'], keep=options['keep'])
+
+        total_bytes = sum(entry['bytes'] for entry in manifest['files'])
+        self.stdout.write(f"🏷️ Version: {manifest['version']}")
+        self.stdout.write(f"📄 Papers: {manifest['total_rows']:,} in {len(manifest['files'])} files ({total_bytes / 1024 / 1024:.1f} MB)")
+        self.stdout.write(f"🗂️ Versions on disk: {', '.join(list_snapshots(options['root'] or snapshot_root()))}")
+        self.stdout.write(self.style.SUCCESS('✅ Snapshot published'))
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from tracker.models import Paper
+from tracker.signals import batched
 from collections import defaultdict
 
 class Command(BaseCommand):
@@ -35,11 +36,13 @@ class Command(BaseCommand):
         total_duplicates_found = 0
         total_duplicates_removed = 0
         
-        for field_name in fields_to_check:
-            self.stdout.write(f"\n📋 Checking for duplicates in field: {field_name}")
-            duplicates_found, duplicates_removed = self.clean_duplicates_by_field(field_name)
-            total_duplicates_found += duplicates_found
-            total_duplicates_removed += duplicates_removed
+        # Caches and rollups refresh once, for the keys of the merged/removed papers
+        with batched():
+            for field_name in fields_to_check:
+                self.stdout.write(f"\n📋 Checking for duplicates in field: {field_name}")
+                duplicates_found, duplicates_removed = self.clean_duplicates_by_field(field_name)
+                total_duplicates_found += duplicates_found
+                total_duplicates_removed += duplicates_removed
         
         # Summary
         if self.dry_run:
@@ -120,7 +123,7 @@ class Command(BaseCommand):
         merge_fields = [
             'title', 'author_string', 'journal_title', 'journal_issn',
             'pub_year', 'pmid', 'pmcid', 'doi', 'source',
-            'transparency_score', 'assessment_tool'
+            'assessment_tool'
         ]
         
         updated = False
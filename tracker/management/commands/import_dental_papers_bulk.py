@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from tracker.models import Paper, Journal
+from tracker.signals import batched, record_papers
 import pandas as pd
 import os
 from django.utils import timezone
@@ -40,64 +41,65 @@ class Command(BaseCommand):
             papers = []
             batch_size = 1000
             
-            for idx, row in df.iterrows():
-                # Find the correct journal ID
-                journal_id = self.find_journal_id(row, journal_map)
-                
-                # Create Paper instance - Django will apply model defaults
-                paper = Paper(
-                    pmid=self.clean_varchar(row.get('pmid'), 20),
-                    pmcid=self.clean_varchar(row.get('pmcid'), 20),
-                    doi=self.clean_field(row.get('doi')),
-                    title=self.clean_field(row.get('title')) or 'Unknown Title',
-                    author_string=self.clean_field(row.get('authorString')),
-                    journal_title=self.clean_field(row.get('journalTitle')) or 'Unknown Journal',
-                    journal_issn=self.clean_issn(row.get('journalIssn')),
-                    pub_year=self.clean_year(row.get('year_firstpub')) or 2020,
-                    first_publication_date=self.clean_date(row.get('firstPublicationDate')),
-                    year_first_pub=self.clean_year(row.get('year_firstpub')),
-                    month_first_pub=self.clean_number(row.get('month_firstpub')),
-                    journal_volume=self.clean_varchar(row.get('journalVolume'), 20),
-                    page_info=self.clean_varchar(row.get('pageInfo'), 50),
-                    issue=self.clean_varchar(row.get('issue'), 20),
-                    pub_type=self.clean_varchar(row.get('type'), 200),
-                    jif2020=self.clean_float(row.get('jif2020')),
-                    scimago_publisher=self.clean_field(row.get('publisher')),
-                    
-                    # Transparency indicators (Django will handle defaults)
-                    is_coi_pred=self.clean_boolean(row.get('is_coi_pred')),
-                    is_fund_pred=self.clean_boolean(row.get('is_fund_pred')),
-                    is_register_pred=self.clean_boolean(row.get('is_register_pred')),
-                    is_open_data=self.clean_boolean(row.get('is_open_data')),
-                    is_open_code=self.clean_boolean(row.get('is_open_code')),
-                    is_replication=self.clean_boolean(row.get('is_replication')),
-                    is_novelty=self.clean_boolean(row.get('is_novelty')),
+            # Rollups and caches are refreshed once, for the years/subjects/journals this import touched
+            with batched():
+                for idx, row in df.iterrows():
+                    # Find the correct journal ID
+                    journal_id = self.find_journal_id(row, journal_map)
                     
-                    transparency_score=self.clean_number(row.get('transparency_score')) or 0,
-                    transparency_score_pct=self.clean_float(row.get('transparency_score_pct')) or 0.0,
+                    # Create Paper instance - Django will apply model defaults
+                    paper = Paper(
+                        pmid=self.clean_varchar(row.get('pmid'), 20),
+                        pmcid=self.clean_varchar(row.get('pmcid'), 20),
+                        doi=self.clean_field(row.get('doi')),
+                        title=self.clean_field(row.get('title')) or 'Unknown Title',
+                        author_string=self.clean_field(row.get('authorString')),
+                        journal_title=self.clean_field(row.get('journalTitle')) or 'Unknown Journal',
+                        journal_issn=self.clean_issn(row.get('journalIssn')),
+                        pub_year=self.clean_year(row.get('year_firstpub')) or 2020,
+                        first_publication_date=self.clean_date(row.get('firstPublicationDate')),
+                        year_first_pub=self.clean_year(row.get('year_firstpub')),
+                        month_first_pub=self.clean_number(row.get('month_firstpub')),
+                        journal_volume=self.clean_varchar(row.get('journalVolume'), 20),
+                        page_info=self.clean_varchar(row.get('pageInfo'), 50),
+                        issue=self.clean_varchar(row.get('issue'), 20),
+                        pub_type=self.clean_varchar(row.get('type'), 200),
+                        jif2020=self.clean_float(row.get('jif2020')),
+                        scimago_publisher=self.clean_field(row.get('publisher')),
+                        
+                        # Transparency indicators (Django will handle defaults)
+                        is_coi_pred=self.clean_boolean(row.get('is_coi_pred')),
+                        is_fund_pred=self.clean_boolean(row.get('is_fund_pred')),
+                        is_register_pred=self.clean_boolean(row.get('is_register_pred')),
+                        is_open_data=self.clean_boolean(row.get('is_open_data')),
+                        is_open_code=self.clean_boolean(row.get('is_open_code')),
+                        is_replication=self.clean_boolean(row.get('is_replication')),
+                        is_novelty=self.clean_boolean(row.get('is_novelty')),
+                        
+                        # Assessment metadata
+                        assessment_tool=self.clean_field(row.get('assessment_tool')) or 'rtransparent',
+                        ost_version=self.clean_field(row.get('ost_version')) or '1.0',
+                        assessment_date=self.clean_date_tz(row.get('assessment_date')),
+                        
+                        # Journal reference (properly mapped)
+                        journal_id=journal_id,
+                    )
+                    papers.append(paper)
                     
-                    # Assessment metadata
-                    assessment_tool=self.clean_field(row.get('assessment_tool')) or 'rtransparent',
-                    ost_version=self.clean_field(row.get('ost_version')) or '1.0',
-                    assessment_date=self.clean_date_tz(row.get('assessment_date')),
-                    
-                    # Journal reference (properly mapped)
-                    journal_id=journal_id,
-                )
-                papers.append(paper)
+                    # Batch insert every 1000 records
+                    if len(papers) >= batch_size:
+                        with transaction.atomic():
+                            Paper.objects.bulk_create(papers, ignore_conflicts=True)
+                        record_papers(papers)
+                        self.stdout.write(f'  ✅ Imported batch of {len(papers)} papers...')
+                        papers = []
                 
-                # Batch insert every 1000 records
-                if len(papers) >= batch_size:
+                # Insert remaining papers
+                if papers:
                     with transaction.atomic():
                         Paper.objects.bulk_create(papers, ignore_conflicts=True)
-                    self.stdout.write(f'  ✅ Imported batch of {len(papers)} papers...')
-                    papers = []
-            
-            # Insert remaining papers
-            if papers:
-                with transaction.atomic():
-                    Paper.objects.bulk_create(papers, ignore_conflicts=True)
-                self.stdout.write(f'  ✅ Imported final batch of {len(papers)} papers')
+                    record_papers(papers)
+                    self.stdout.write(f'  ✅ Imported final batch of {len(papers)} papers')
             
             # Report results
             total_papers = Paper.objects.count()
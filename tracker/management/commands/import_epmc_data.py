@@ -4,6 +4,7 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.utils.dateparse import parse_date
 from tracker.models import Paper, Journal
+from tracker.signals import batched
 from datetime import datetime
 
 class Command(BaseCommand):
@@ -42,10 +43,12 @@ class Command(BaseCommand):
         self.update_existing = options['update_existing']
         self.batch_size = options['batch_size']
         
-        if options['folder']:
-            self.import_folder(options['folder'])
-        else:
-            self.import_file(options['csv_file'])
+        # Caches and rollups refresh once, for the years/subjects/journals imported
+        with batched():
+            if options['folder']:
+                self.import_folder(options['folder'])
+            else:
+                self.import_file(options['csv_file'])
 
     def import_folder(self, folder_path):
         """Import all EPMC CSV files from a folder"""
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from tracker.models import Paper, Journal
+from tracker.signals import batched, record_papers
 import pandas as pd
 import os
 from django.utils import timezone
@@ -106,37 +107,39 @@ class Command(BaseCommand):
             # Process CSV in chunks
             progress_bar = tqdm(total=total_rows, desc="Processing medical papers", unit="rows")
             
-            for chunk_df in pd.read_csv(
-                csv_file, 
-                chunksize=chunk_size,
-                low_memory=False,
-                skiprows=range(1, skip_rows + 1) if skip_rows > 0 else None
-            ):
-                chunk_num += 1
-                
-                # Apply max_records limit
-                if max_records and total_processed + len(chunk_df) > max_records:
-                    chunk_df = chunk_df.head(max_records - total_processed)
-                
-                # Process this chunk
-                imported_count = self.process_chunk(
-                    chunk_df, journal_map, batch_size, chunk_num, progress_bar
-                )
-                
-                total_imported += imported_count
-                total_processed += len(chunk_df)
-                
-                # Memory cleanup
-                del chunk_df
-                gc.collect()
-                
-                # Memory monitoring
-                memory_usage = psutil.Process().memory_info().rss / 1024 / 1024  # MB
-                self.stdout.write(f"  💾 Memory usage: {memory_usage:.1f} MB")
-                
-                # Break if we've reached max_records
-                if max_records and total_processed >= max_records:
-                    break
+            # Rollups and caches are refreshed once, for the years/subjects/journals this import touched
+            with batched():
+                for chunk_df in pd.read_csv(
+                    csv_file, 
+                    chunksize=chunk_size,
+                    low_memory=False,
+                    skiprows=range(1, skip_rows + 1) if skip_rows > 0 else None
+                ):
+                    chunk_num += 1
+                    
+                    # Apply max_records limit
+                    if max_records and total_processed + len(chunk_df) > max_records:
+                        chunk_df = chunk_df.head(max_records - total_processed)
+                    
+                    # Process this chunk
+                    imported_count = self.process_chunk(
+                        chunk_df, journal_map, batch_size, chunk_num, progress_bar
+                    )
+                    
+                    total_imported += imported_count
+                    total_processed += len(chunk_df)
+                    
+                    # Memory cleanup
+                    del chunk_df
+                    gc.collect()
+                    
+                    # Memory monitoring
+                    memory_usage = psutil.Process().memory_info().rss / 1024 / 1024  # MB
+                    self.stdout.write(f"  💾 Memory usage: {memory_usage:.1f} MB")
+                    
+                    # Break if we've reached max_records
+                    if max_records and total_processed >= max_records:
+                        break
             
             progress_bar.close()
             
@@ -220,9 +223,6 @@ class Command(BaseCommand):
                     is_replication=self.clean_boolean(row.get('is_replication')),
                     is_novelty=self.clean_boolean(row.get('is_novelty')),
                     
-                    transparency_score=self.clean_number(row.get('transparency_score')) or 0,
-                    transparency_score_pct=self.clean_float(row.get('transparency_score_pct')) or 0.0,
-                    
                     # Assessment metadata
                     assessment_tool=self.clean_field(row.get('assessment_tool')) or 'rtransparent',
                     ost_version=self.clean_field(row.get('ost_version')) or '1.0',
@@ -240,6 +240,7 @@ class Command(BaseCommand):
                 if len(papers) >= batch_size:
                     with transaction.atomic():
                         Paper.objects.bulk_create(papers, ignore_conflicts=True)
+                    record_papers(papers)
                     imported_count += len(papers)
                     papers = []
                     
@@ -255,6 +256,7 @@ class Command(BaseCommand):
         if papers:
             with transaction.atomic():
                 Paper.objects.bulk_create(papers, ignore_conflicts=True)
+            record_papers(papers)
             imported_count += len(papers)
         
         chunk_progress.close()
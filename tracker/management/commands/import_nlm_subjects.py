@@ -2,6 +2,7 @@ import pandas as pd
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from tracker.models import Paper
+from tracker.signals import batched
 from collections import defaultdict
 
 class Command(BaseCommand):
@@ -41,8 +42,9 @@ class Command(BaseCommand):
             # Build ISSN-to-subject mapping
             issn_subject_map = self.build_issn_subject_mapping(nlm_df)
             
-            # Match papers to subject terms
-            self.match_papers_to_subjects(issn_subject_map)
+            # Match papers to subject terms (caches and rollups refresh once, at the end)
+            with batched():
+                self.match_papers_to_subjects(issn_subject_map)
             
         except FileNotFoundError:
             raise CommandError(f'CSV file not found: {csv_file}')
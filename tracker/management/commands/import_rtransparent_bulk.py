@@ -11,6 +11,7 @@ from django.db import transaction, connection
 from django.utils import timezone
 from django.utils.dateparse import parse_date
 from tracker.models import Paper, Journal
+from tracker.signals import batched, record_papers
 from datetime import datetime
 import logging
 from tqdm import tqdm
@@ -101,7 +102,9 @@ class Command(BaseCommand):
         
         # Start import process
         start_time = time.time()
-        self.import_rtransparent_data()
+        # Rollups and caches are refreshed once, for the years/subjects/journals this import touched
+        with batched():
+            self.import_rtransparent_data()
         end_time = time.time()
         
         self.stdout.write(self.style.SUCCESS(f'✅ Import completed in {end_time - start_time:.2f} seconds'))
@@ -261,6 +264,7 @@ class Command(BaseCommand):
             if len(papers_to_create) >= self.batch_size:
                 if not self.dry_run:
                     Paper.objects.bulk_create(papers_to_create, ignore_conflicts=True)
+                    record_papers(papers_to_create)
                 created += len(papers_to_create)
                 papers_to_create = []
                 
@@ -273,6 +277,7 @@ class Command(BaseCommand):
         # Save remaining papers
         if papers_to_create and not self.dry_run:
             Paper.objects.bulk_create(papers_to_create, ignore_conflicts=True)
+            record_papers(papers_to_create)
             created += len(papers_to_create)
             
         if papers_to_update and not self.dry_run:
@@ -328,16 +333,12 @@ class Command(BaseCommand):
             # Update existing paper
             for field, value in paper_data.items():
                 setattr(existing_paper, field, value)
-            existing_paper.transparency_score = existing_paper.calculate_transparency_score()
-            existing_paper.transparency_score_pct = existing_paper.get_transparency_percentage()
             existing_paper.transparency_processed = True
             existing_paper.processing_date = timezone.now()
             return {'action': 'update', 'paper': existing_paper}
         else:
             # Create new paper
             paper = Paper(**paper_data)
-            paper.transparency_score = paper.calculate_transparency_score()
-            paper.transparency_score_pct = paper.get_transparency_percentage()
             paper.transparency_processed = True
             paper.processing_date = timezone.now()
             return {'action': 'create', 'paper': paper}
@@ -438,9 +439,9 @@ class Command(BaseCommand):
             'page_info', 'issue', 'pub_type', 'broad_subject_term', 'cited_by_count',
             'is_coi_pred', 'coi_text', 'is_fund_pred', 'fund_text', 'is_register_pred',
             'register_text', 'is_open_data', 'open_data_category', 'open_data_statements',
-            'is_open_code', 'open_code_statements', 'transparency_score',
-            'transparency_score_pct', 'transparency_processed', 'processing_date'
+            'is_open_code', 'open_code_statements', 'transparency_processed', 'processing_date'
         ])
+        record_papers(papers)
 
     # Utility methods
     def get_total_rows(self):
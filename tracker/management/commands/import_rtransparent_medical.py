@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.db import models
 from tracker.models import Paper, Journal
+from tracker.signals import batched, record_papers
 import pandas as pd
 import os
 from django.utils import timezone
@@ -81,38 +82,40 @@ class Command(BaseCommand):
             # Read CSV in chunks
             chunk_reader = pd.read_csv(csv_file, chunksize=chunk_size, dtype=str, na_filter=False)
             
-            for chunk_num, chunk_df in enumerate(chunk_reader, 1):
-                if limit and total_processed >= limit:
-                    break
+            # Rollups and caches are refreshed once, for the years/subjects/journals this import touched
+            with batched():
+                for chunk_num, chunk_df in enumerate(chunk_reader, 1):
+                    if limit and total_processed >= limit:
+                        break
 
-                # Limit chunk if needed
-                if limit:
-                    remaining = limit - total_processed
-                    if remaining < len(chunk_df):
-                        chunk_df = chunk_df.head(remaining)
+                    # Limit chunk if needed
+                    if limit:
+                        remaining = limit - total_processed
+                        if remaining < len(chunk_df):
+                            chunk_df = chunk_df.head(remaining)
 
-                self.stdout.write(f'📦 Processing chunk {chunk_num} ({len(chunk_df):,} rows)')
-                
-                chunk_imported, chunk_errors = self.process_chunk(
-                    chunk_df, journal_map, batch_size, chunk_num, dry_run, update_existing
-                )
-                
-                total_processed += len(chunk_df)
-                total_imported += chunk_imported
-                total_errors += chunk_errors
+                    self.stdout.write(f'📦 Processing chunk {chunk_num} ({len(chunk_df):,} rows)')
+                    
+                    chunk_imported, chunk_errors = self.process_chunk(
+                        chunk_df, journal_map, batch_size, chunk_num, dry_run, update_existing
+                    )
+                    
+                    total_processed += len(chunk_df)
+                    total_imported += chunk_imported
+                    total_errors += chunk_errors
 
-                # Memory management
-                del chunk_df
-                gc.collect()
+                    # Memory management
+                    del chunk_df
+                    gc.collect()
 
-                # Show progress
-                memory_mb = psutil.Process().memory_info().rss / 1024 / 1024
-                self.stdout.write(
-                    f'Progress: {total_processed:,} processed, '
-                    f'{total_imported:,} imported, '
-                    f'{total_errors:,} errors, '
-                    f'{memory_mb:.1f} MB memory'
-                )
+                    # Show progress
+                    memory_mb = psutil.Process().memory_info().rss / 1024 / 1024
+                    self.stdout.write(
+                        f'Progress: {total_processed:,} processed, '
+                        f'{total_imported:,} imported, '
+                        f'{total_errors:,} errors, '
+                        f'{memory_mb:.1f} MB memory'
+                    )
 
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'❌ Import failed: {e}'))
@@ -232,9 +235,6 @@ class Command(BaseCommand):
                     'is_open_code': self.clean_boolean(row.get('is_open_code')),
                     'open_code_statements': self.clean_field(row.get('open_code_statements')),
                     
-                    # Calculate transparency score
-                    'transparency_score': self.calculate_transparency_score(row),
-                    
                     # Assessment metadata
                     'assessment_tool': 'rtransparent',
                     'transparency_processed': True,
@@ -264,6 +264,7 @@ class Command(BaseCommand):
                 if not dry_run and not update_existing and len(papers) >= batch_size:
                     with transaction.atomic():
                         Paper.objects.bulk_create(papers, ignore_conflicts=True)
+                    record_papers(papers)
                     imported_count += len(papers)
                     papers = []
                 
@@ -276,6 +277,7 @@ class Command(BaseCommand):
         if not dry_run and not update_existing and papers:
             with transaction.atomic():
                 Paper.objects.bulk_create(papers, ignore_conflicts=True)
+            record_papers(papers)
             imported_count += len(papers)
         
         return imported_count, error_count
@@ -329,22 +331,6 @@ class Command(BaseCommand):
         
         return None
 
-    def calculate_transparency_score(self, row):
-        """Calculate transparency score from rtransparent indicators"""
-        score = 0
-        
-        # Count transparency indicators (0-6 scale)
-        indicators = [
-            'is_coi_pred', 'is_fund_pred', 'is_register_pred',
-            'is_open_data', 'is_open_code'
-        ]
-        
-        for indicator in indicators:
-            if self.clean_boolean(row.get(indicator)):
-                score += 1
-        
-        return score
-
     # Utility methods for data cleaning
     def clean_field(self, value):
         """Clean a general field"""
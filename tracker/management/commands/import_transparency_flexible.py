@@ -3,6 +3,7 @@ import pandas as pd
 from django.core.management.base import BaseCommand
 from django.db import transaction, IntegrityError
 from tracker.models import Journal, Paper
+from tracker.signals import batched
 from datetime import datetime
 import logging
 
@@ -79,7 +80,9 @@ class Command(BaseCommand):
         # Process the full file
         self.stdout.write(f"Processing {file_path} as {format_type} format...")
         processor = processors[format_type]
-        processor(file_path, batch_size, update_existing)
+        # Rollups and caches are refreshed once, for the years/subjects/journals this import touched
+        with batched():
+            processor(file_path, batch_size, update_existing)
 
     def detect_format(self, columns):
         """Auto-detect CSV format based on column names"""
@@ -225,38 +228,25 @@ class Command(BaseCommand):
                     )
                 
                 # Extract transparency indicators with rt_all_ prefix
-                transparency_score = 0
                 transparency_fields = {}
                 
                 if pd.notna(row.get('rt_all_is_coi_pred')):
                     transparency_fields['is_coi_pred'] = bool(row.get('rt_all_is_coi_pred'))
-                    if transparency_fields['is_coi_pred']:
-                        transparency_score += 1
                 
                 if pd.notna(row.get('rt_all_is_fund_pred')):
                     transparency_fields['is_fund_pred'] = bool(row.get('rt_all_is_fund_pred'))
-                    if transparency_fields['is_fund_pred']:
-                        transparency_score += 1
                 
                 if pd.notna(row.get('rt_all_is_register_pred')):
                     transparency_fields['is_register_pred'] = bool(row.get('rt_all_is_register_pred'))
-                    if transparency_fields['is_register_pred']:
-                        transparency_score += 1
                 
                 if pd.notna(row.get('rt_data_is_open_data')):
                     transparency_fields['is_open_data'] = bool(row.get('rt_data_is_open_data'))
-                    if transparency_fields['is_open_data']:
-                        transparency_score += 1
                 
                 if pd.notna(row.get('rt_data_is_open_code')):
                     transparency_fields['is_open_code'] = bool(row.get('rt_data_is_open_code'))
-                    if transparency_fields['is_open_code']:
-                        transparency_score += 1
                 
                 if pd.notna(row.get('isOpenAccess')):
                     transparency_fields['is_open_access'] = str(row.get('isOpenAccess', 'N')).upper() == 'Y'
-                    if transparency_fields['is_open_access']:
-                        transparency_score += 1
 
                 paper_data = {
                     'source': str(row.get('source', 'PMC'))[:20],
@@ -269,7 +259,6 @@ class Command(BaseCommand):
                     'pmid': str(row.get('pmid', ''))[:20] or None,
                     'pmcid': str(row.get('pmcid', ''))[:20] or None,
                     'doi': str(row.get('doi', ''))[:100] or None,
-                    'transparency_score': transparency_score,
                     'transparency_processed': True,
                     'assessment_tool': 'rtransparent',
                     'in_epmc': str(row.get('inEPMC', 'N')).upper() == 'Y',
@@ -312,16 +301,13 @@ class Command(BaseCommand):
                         row.get('journalIssn')
                     )
                 
-                # Calculate transparency score
-                transparency_score = 0
+                # Extract transparency indicators
                 transparency_fields = {}
                 
                 for field in ['is_coi_pred', 'is_fund_pred', 'is_register_pred', 'is_open_data', 'is_open_code']:
                     if pd.notna(row.get(field)):
                         value = bool(row.get(field))
                         transparency_fields[field] = value
-                        if value:
-                            transparency_score += 1
 
                 paper_data = {
                     'title': str(row.get('title', ''))[:500],
@@ -333,7 +319,6 @@ class Command(BaseCommand):
                     'pmid': str(row.get('pmid', ''))[:20] or None,
                     'pmcid': str(row.get('pmcid', ''))[:20] or None,
                     'doi': str(row.get('doi', ''))[:100] or None,
-                    'transparency_score': transparency_score,
                     'transparency_processed': True,
                     'assessment_tool': 'rtransparent',
                     **transparency_fields
@@ -379,8 +364,7 @@ class Command(BaseCommand):
                         None  # No ISSN in this format
                     )
                 
-                # Calculate transparency score from comprehensive indicators
-                transparency_score = 0
+                # Extract comprehensive transparency indicators
                 transparency_fields = {}
                 
                 # Main transparency indicators
@@ -394,9 +378,6 @@ class Command(BaseCommand):
                             transparency_fields['is_open_code'] = value
                         else:
                             transparency_fields[field] = value
-                        
-                        if value:
-                            transparency_score += 1
 
                 paper_data = {
                     'source': 'rtransparent',
@@ -408,7 +389,6 @@ class Command(BaseCommand):
                     'pmid': self.safe_extract_string(row, ['pmid', 'PMID'], None, 20),
                     'pmcid': self.safe_extract_string(row, ['pmcid_pmc', 'pmcid', 'PMCID'], None, 20),
                     'doi': self.safe_extract_string(row, ['doi', 'DOI'], None, 100),
-                    'transparency_score': transparency_score,
                     'transparency_processed': True,
                     'assessment_tool': 'rtransparent',
                     'pub_type': self.safe_extract_string(row, ['type', 'Type', 'pubType'], None, 100),
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from tracker.models import Paper, Journal
+from tracker.signals import batched, record_papers
 from django.db.models import Q
 
 class Command(BaseCommand):
@@ -51,18 +52,20 @@ class Command(BaseCommand):
         no_match_count = 0
         batch_count = 0
         
-        for i in range(0, total_papers, batch_size):
-            batch_count += 1
-            batch_papers = papers_to_match[i:i + batch_size]
-            
-            self.stdout.write(f"🔄 Processing batch {batch_count} ({len(batch_papers)} papers)...")
-            
-            batch_matched, batch_no_match = self.process_batch(
-                batch_papers, journal_map, dry_run
-            )
-            
-            matched_count += batch_matched
-            no_match_count += batch_no_match
+        # Rollups and caches are refreshed once, for the journals papers moved between
+        with batched():
+            for i in range(0, total_papers, batch_size):
+                batch_count += 1
+                batch_papers = papers_to_match[i:i + batch_size]
+                
+                self.stdout.write(f"🔄 Processing batch {batch_count} ({len(batch_papers)} papers)...")
+                
+                batch_matched, batch_no_match = self.process_batch(
+                    batch_papers, journal_map, dry_run
+                )
+                
+                matched_count += batch_matched
+                no_match_count += batch_no_match
         
         # Report results
         self.stdout.write(self.style.SUCCESS('✅ Journal matching completed!'))
@@ -143,6 +146,7 @@ class Command(BaseCommand):
         if not dry_run and updates:
             with transaction.atomic():
                 Paper.objects.bulk_update(updates, ['journal'])
+            record_papers(updates)
         
         return matched_count, no_match_count
     
@@ -2,6 +2,7 @@ import pandas as pd
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from tracker.models import Paper, Journal
+from tracker.signals import batched
 from collections import defaultdict
 
 class Command(BaseCommand):
@@ -38,11 +39,13 @@ class Command(BaseCommand):
             nlm_df = pd.read_csv(csv_file)
             self.stdout.write(f"📄 Loaded {len(nlm_df):,} journal records from NLM data")
             
-            # Step 1: Populate Journal table with NLM data
-            journals_created, journals_updated = self.populate_journal_table(nlm_df)
-            
-            # Step 2: Link Papers to Journals via ISSN matching
-            papers_linked = self.link_papers_to_journals()
+            # Rollups and caches are refreshed once, for the journals papers were linked to
+            with batched():
+                # Step 1: Populate Journal table with NLM data
+                journals_created, journals_updated = self.populate_journal_table(nlm_df)
+                
+                # Step 2: Link Papers to Journals via ISSN matching
+                papers_linked = self.link_papers_to_journals()
             
             # Step 3: Show summary
             self.show_summary(journals_created, journals_updated, papers_linked)
@@ -4,6 +4,9 @@ import pandas as pd
 from django.core.management.base import BaseCommand
 from django.conf import settings
 from tracker.models import Paper
+from tracker.signals import batched
+from tracker.snapshots import snapshot_after_import
+from tracker.warming import warm_after_import
 from django.db import transaction
 from datetime import datetime
 
@@ -29,6 +32,16 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be processed without making changes',
         )
+        parser.add_argument(
+            '--no-warm',
+            action='store_true',
+            help='Skip warming the cache after the import',
+        )
+        parser.add_argument(
+            '--no-snapshot',
+            action='store_true',
+            help='Skip writing the full-dataset snapshot after the import',
+        )
 
     def handle(self, *args, **options):
         directory = options['directory']
@@ -50,22 +63,47 @@ class Command(BaseCommand):
             self.style.SUCCESS(f"Found {len(files_to_process)} file(s) to process")
         )
         
-        for file_path in files_to_process:
-            try:
-                self.stdout.write(f"Processing: {file_path}")
+        # Cache invalidation and the trend rollups run once, for the keys this run touched
+        with batched() as batch:
+            for file_path in files_to_process:
+                try:
+                    self.stdout.write(f"Processing: {file_path}")
                 
-                if dry_run:
-                    self.dry_run_file(file_path)
-                else:
-                    self.process_transparency_file(file_path)
-                    self.mark_file_as_processed(file_path)
+                    if dry_run:
+                        self.dry_run_file(file_path)
+                    else:
+                        self.process_transparency_file(file_path)
+                        self.mark_file_as_processed(file_path)
                     
-                logger.info(f"Successfully processed: {file_path}")
+                    logger.info(f"Successfully processed: {file_path}")
                 
-            except Exception as e:
-                logger.error(f"Error processing {file_path}: {str(e)}")
+                except Exception as e:
+                    logger.error(f"Error processing {file_path}: {str(e)}")
+                    self.stdout.write(
+                        self.style.ERROR(f"Failed to process {file_path}: {str(e)}")
+                    )
+            
+            if batch:
+                self.stdout.write("Updating transparency trend rollups...")
+        
+        # The batch has flushed: rollups are rebuilt and the caches are cold
+        if (batch or batch.dirty) and not dry_run and not options['no_warm']:
+            self.stdout.write("Warming cache from request log...")
+            report = warm_after_import()
+            if report:
                 self.stdout.write(
-                    self.style.ERROR(f"Failed to process {file_path}: {str(e)}")
+                    self.style.SUCCESS(
+                        f"Cache warmed: {len(report['stats'])} statistics keys, "
+                        f"{report['warmed']} pages in {report['seconds']}s"
+                    )
+                )
+        
+        if (batch or batch.dirty) and not dry_run and not options['no_snapshot']:
+            self.stdout.write("Writing dataset snapshot...")
+            manifest = snapshot_after_import()
+            if manifest:
+                self.stdout.write(
+                    self.style.SUCCESS(f"Snapshot {manifest['version']}: {manifest['total_rows']} papers")
                 )
 
     def find_unprocessed_files(self, directory):
@@ -236,16 +274,7 @@ class Command(BaseCommand):
                         updated = True
                     
                     if updated:
-                        # Calculate transparency score (out of 6)
-                        score = 0
-                        score += 1 if paper.is_open_data else 0
-                        score += 1 if paper.is_open_code else 0
-                        score += 1 if paper.is_coi_pred else 0
-                        score += 1 if paper.is_fund_pred else 0
-                        score += 1 if paper.is_register_pred else 0
-                        score += 1 if paper.is_open_access else 0
-                        
-                        paper.transparency_score = score
+                        # transparency_score and its percentage are generated by the database
                         paper.transparency_processed = True
                         paper.processing_date = datetime.now().date()
                         paper.save()
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the paper full-text search index (SQLite FTS5 table or PostgreSQL search_vector column)'
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        self.stdout.write(self.style.SUCCESS(f'🔄 Rebuilding paper search index ({vendor})...'))
+
+        with connection.cursor() as cursor:
+            if vendor == 'sqlite':
+                cursor.execute("INSERT INTO tracker_paper_fts(tracker_paper_fts) VALUES ('rebuild')")
+                cursor.execute("INSERT INTO tracker_paper_fts(tracker_paper_fts) VALUES ('optimize')")
+            elif vendor == 'postgresql':
+                # The trigger recomputes search_vector whenever a searched column is written
+                cursor.execute("UPDATE tracker_paper SET title = title")
+            else:
+                self.stdout.write(self.style.WARNING(f'⚠️ No search index for {vendor}; search uses substring matching'))
+                return
+
+        self.stdout.write(self.style.SUCCESS('✅ Search index rebuilt'))
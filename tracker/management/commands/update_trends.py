@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from tracker.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the TransparencyTrend, JournalTrend, StatsCube and JournalStats rollup tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--years',
+            type=int,
+            nargs='+',
+            help='Only rebuild these publication years (default: all years)',
+        )
+        parser.add_argument(
+            '--subjects',
+            type=str,
+            nargs='+',
+            help='Only rebuild these broad subject terms (default: all subjects)',
+        )
+        parser.add_argument(
+            '--journals',
+            type=int,
+            nargs='+',
+            help='Only rebuild these journal ids (default: all journals)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('🔄 Rebuilding transparency rollups...'))
+
+        trend_rows, journal_rows, cube_rows, stats_rows = refresh_rollups(
+            years=options['years'],
+            subjects=options['subjects'],
+            journals=options['journals'],
+        )
+
+        self.stdout.write(f"📈 Field/month trend rows: {trend_rows}")
+        self.stdout.write(f"📚 Journal/year trend rows: {journal_rows}")
+        self.stdout.write(f"🧊 Statistics cube cells: {cube_rows}")
+        self.stdout.write(f"📊 Journal statistics rows: {stats_rows}")
+        self.stdout.write(self.style.SUCCESS('✅ Rollups updated'))
@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand
+from tracker.warming import WarmingPlanner
+
+
+class Command(BaseCommand):
+    help = 'Warm the statistics caches and the most requested pages from the request analytics log'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--log',
+            type=str,
+            help='Analytics log to plan from (default: settings.OST_ANALYTICS_LOG)',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=50,
+            help='Number of most requested URLs to warm (default: 50)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Maximum requests in flight (default: 4)',
+        )
+        parser.add_argument(
+            '--host',
+            type=str,
+            help='Host header for the rendered requests (default: settings.OST_WARM_HOST)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show the warming plan without requesting anything',
+        )
+
+    def handle(self, *args, **options):
+        planner = WarmingPlanner(
+            log_path=options['log'],
+            top=options['top'],
+            concurrency=options['concurrency'],
+            host=options['host'],
+        )
+        plan = planner.plan()
+
+        if not planner.log_path:
+            self.stdout.write(self.style.WARNING('⚠️ No analytics log configured, warming statistics only'))
+        self.stdout.write(f"📋 Planned {len(plan)} URL(s) from {planner.log_path or 'no log'}")
+
+        if options['dry_run']:
+            for url, hits in plan:
+                self.stdout.write(f"  {hits:>6}  {url}")
+            return
+
+        self.stdout.write(self.style.SUCCESS('🔥 Warming cache...'))
+        report = planner.warm(plan)
+
+        for name, seconds in report['stats'].items():
+            self.stdout.write(f"📊 {name}: {seconds}s")
+        for page in report['pages']:
+            marker = '✅' if page['status'] == 200 else '❌'
+            self.stdout.write(f"{marker} {page['url']} ({page['status']}, {page['seconds']}s)")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Warmed {len(report['stats'])} statistics keys and {report['warmed']} pages "
+                f"({report['failed']} failed) in {report['seconds']}s"
+            )
+        )
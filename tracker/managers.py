@@ -6,27 +6,49 @@ and improve database performance for common operations.
 """
 
 from django.db import models
-from django.db.models import Count, Avg, Q, Prefetch
-from django.core.cache import cache
+from django.db.models import Count, Avg, Q, Prefetch, Sum, Min, Max
 from django.conf import settings
 
-class OptimizedPaperManager(models.Manager):
+class PaperQuerySet(models.QuerySet):
+    """Chainable Paper queries that also work on already-filtered querysets"""
+    
+    def with_indicators(self, names, match='all'):
+        """Papers having all (or any) of the named transparency indicators"""
+        from .indicators import indicator_filter
+        return self.filter(indicator_filter(names, match=match))
+    
+    def search(self, query):
+        """Ranked search using the backend for the current database (lazy, so only the requested page is fetched)"""
+        from .search import get_search_backend
+        query = (query or '').strip()
+        if not query:
+            return self.none()
+        return get_search_backend(self.db).search(self, query)
+    
+    def indicator_combination_counts(self):
+        """Counts for every indicator combination from a single GROUP BY indicator_mask"""
+        rows = self.values('indicator_mask').annotate(count=Count('id')).order_by()
+        return {row['indicator_mask']: row['count'] for row in rows}
+
+class OptimizedPaperManager(models.Manager.from_queryset(PaperQuerySet)):
     """Optimized manager for Paper model with intelligent query optimization"""
     
     def get_queryset(self):
         """Base queryset with common optimizations"""
-        return super().get_queryset().select_related('journal')
+        # search_vector is only read inside the database; loading it would also write it back on save()
+        return super().get_queryset().select_related('journal').defer('search_vector')
     
     def for_list_view(self):
         """Optimized queryset for list views with minimal data"""
         return self.select_related('journal').only(
             # Paper fields needed for list view
-            'epmc_id', 'title', 'author_string', 'pub_year', 'doi',
+            'epmc_id', 'pmcid', 'title', 'author_string', 'pub_year', 'pub_type', 'doi',
             'transparency_score', 'is_open_data', 'is_open_code', 
             'is_coi_pred', 'is_fund_pred', 'is_register_pred', 'is_open_access',
             'journal_title', 'created_at',
             # Journal fields needed
-            'journal__title_abbreviation', 'journal__title_full'
+            'journal__title_abbreviation', 'journal__title_full',
+            'journal__publisher', 'journal__broad_subject_terms'
         )
     
     def for_detail_view(self):
@@ -36,10 +58,8 @@ class OptimizedPaperManager(models.Manager):
         )
     
     def with_transparency_scores(self):
-        """Papers with calculated transparency metrics"""
-        return self.annotate(
-            transparency_score_pct=(models.F('transparency_score') * 100.0 / 6.0)
-        )
+        """Papers with calculated transparency metrics (generated columns, nothing to annotate)"""
+        return self.all()
     
     def high_transparency(self, threshold=4):
         """Papers with high transparency scores"""
@@ -77,35 +97,6 @@ class OptimizedPaperManager(models.Manager):
             Q(is_fund_pred=True)
         ).distinct()
     
-    def search(self, query):
-        """Optimized full-text search"""
-        if not query:
-            return self.none()
-        
-        # Cache search results for common queries
-        cache_key = f"search_{hash(query.lower())}"
-        cached_ids = cache.get(cache_key)
-        
-        if cached_ids is not None:
-            return self.filter(id__in=cached_ids)
-        
-        # Perform search
-        results = self.filter(
-            Q(title__icontains=query) |
-            Q(author_string__icontains=query) |
-            Q(journal_title__icontains=query) |
-            Q(pmid__icontains=query) |
-            Q(doi__icontains=query) |
-            Q(journal__title_abbreviation__icontains=query) |
-            Q(journal__title_full__icontains=query)
-        ).distinct()
-        
-        # Cache the IDs for 5 minutes
-        result_ids = list(results.values_list('id', flat=True))
-        cache.set(cache_key, result_ids, 300)
-        
-        return results
-    
     def statistics_aggregate(self):
         """Get comprehensive statistics in a single query"""
         return self.aggregate(
@@ -119,6 +110,39 @@ class OptimizedPaperManager(models.Manager):
             open_access_count=Count('id', filter=Q(is_open_access=True)),
         )
 
+class StatsCubeQuerySet(models.QuerySet):
+    """Roll-ups over the precomputed StatsCube cells (filter first, then roll up)"""
+    
+    DIMENSIONS = ('pub_year', 'broad_subject_term', 'journal', 'source')
+    
+    def _sums(self):
+        from .rollups import CUBE_SUM_FIELDS
+        return {f'sum_{name}': Sum(name) for name in CUBE_SUM_FIELDS}
+    
+    def rollup(self, *dimensions):
+        """Totals, indicator counts/percentages and average score grouped by any subset of dimensions"""
+        from .rollups import finalize_cube_row
+        unknown = set(dimensions) - set(self.DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown cube dimensions: {', '.join(sorted(unknown))}")
+        rows = self.values(*dimensions).annotate(**self._sums()).order_by(*dimensions)
+        return [
+            {**{dim: row[dim] for dim in dimensions}, **finalize_cube_row(row, prefix='sum_')}
+            for row in rows
+        ]
+    
+    def totals(self):
+        """Grand totals over the selected cells, plus the publication year range"""
+        from .rollups import finalize_cube_row
+        row = self.filter(total_papers__gt=0).aggregate(
+            earliest_year=Min('pub_year'),
+            latest_year=Max('pub_year'),
+            **self._sums()
+        )
+        result = finalize_cube_row(row, prefix='sum_')
+        result['year_range'] = {'earliest': row['earliest_year'], 'latest': row['latest_year']}
+        return result
+
 class OptimizedJournalManager(models.Manager):
     """Optimized manager for Journal model"""
     
@@ -238,34 +262,11 @@ class CacheManager:
     @staticmethod
     def invalidate_journal_caches():
         """Invalidate caches when journals are modified"""
-        cache.delete_many([
-            'journal_stats_*',
-            'home_stats_*',
-            'search_counts_*'
-        ])
+        from .cache_utils import invalidate_stats_cache
+        invalidate_stats_cache()
     
     @staticmethod
     def warm_common_caches():
         """Warm up commonly accessed caches"""
         from .cache_utils import warm_cache
         warm_cache()
-
-# Signal handlers for cache invalidation
-from django.db.models.signals import post_save, post_delete
-from django.dispatch import receiver
-
-@receiver([post_save, post_delete], sender='tracker.Paper')
-def invalidate_paper_cache(sender, **kwargs):
-    """Invalidate paper-related caches when papers change"""
-    CacheManager.invalidate_paper_caches()
-
-@receiver([post_save, post_delete], sender='tracker.Journal') 
-def invalidate_journal_cache(sender, **kwargs):
-    """Invalidate journal-related caches when journals change"""
-    CacheManager.invalidate_journal_caches()
-
-@receiver([post_save, post_delete], sender='tracker.ResearchField')
-def invalidate_field_cache(sender, **kwargs):
-    """Invalidate field-related caches when fields change"""
-    from .cache_utils import invalidate_stats_cache
-    invalidate_stats_cache() 
\ No newline at end of file
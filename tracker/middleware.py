@@ -7,10 +7,12 @@ caching optimization, and database query tracking.
 
 import time
 import logging
+from pathlib import Path
 from django.conf import settings
 from django.core.cache import cache
 from django.db import connection
 from django.http import HttpResponse
+from django.middleware.cache import CacheMiddleware, FetchFromCacheMiddleware, UpdateCacheMiddleware
 import json
 
 # Set up performance logger
@@ -152,6 +154,77 @@ class CacheOptimizationMiddleware:
         return 'middleware_cache:' + ':'.join(key_parts)
 
 
+class GenerationCacheMixin:
+    """Store cached pages under the current dataset generation (see cache_utils)"""
+    
+    @property
+    def cache(self):
+        from .cache_utils import GenerationCache
+        return GenerationCache(self.cache_alias)
+
+
+class GenerationUpdateCacheMiddleware(GenerationCacheMixin, UpdateCacheMiddleware):
+    """Site-wide UpdateCacheMiddleware whose pages are dropped by a generation bump"""
+
+
+class GenerationFetchFromCacheMiddleware(GenerationCacheMixin, FetchFromCacheMiddleware):
+    """Site-wide FetchFromCacheMiddleware that only serves current-generation pages"""
+
+
+class GenerationCacheMiddleware(GenerationCacheMixin, CacheMiddleware):
+    """CacheMiddleware behind cache_utils.generation_cache_page()"""
+
+
+class SnapshotFilesMiddleware:
+    """
+    Serve dataset snapshots (see tracker.snapshots) from OST_SNAPSHOT_ROOT
+    under OST_SNAPSHOT_URL with WhiteNoise: Range requests, ETags, and
+    immutable caching for the versioned files. The directory is indexed
+    once and again whenever latest.json changes (one stat per snapshot
+    request), so versions published after startup are served at once.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = settings.OST_SNAPSHOT_URL
+        self.root = Path(settings.OST_SNAPSHOT_ROOT)
+        self.published = None
+        self.files = self._index()
+    
+    def _latest_mtime(self):
+        from .snapshots import LATEST_NAME
+        
+        try:
+            return (self.root / LATEST_NAME).stat().st_mtime_ns
+        except OSError:
+            return None
+    
+    def _index(self):
+        from whitenoise.base import WhiteNoise
+        
+        # Read the marker first: a snapshot published while indexing triggers another pass
+        self.published = self._latest_mtime()
+        files = WhiteNoise(
+            None,
+            max_age=60,  # latest.json changes with every snapshot
+            immutable_file_test=lambda path, url: not url.endswith('/latest.json'),
+        )
+        if self.root.is_dir():
+            files.add_files(str(self.root), prefix=self.prefix)
+        return files
+    
+    def __call__(self, request):
+        if request.path_info.startswith(self.prefix) and request.method in ('GET', 'HEAD'):
+            from whitenoise.middleware import WhiteNoiseMiddleware
+            
+            if self._latest_mtime() != self.published:
+                self.files = self._index()
+            static_file = self.files.files.get(request.path_info)
+            if static_file is not None:
+                return WhiteNoiseMiddleware.serve(static_file, request)
+        return self.get_response(request)
+
+
 class RequestLoggingMiddleware:
     """
     Middleware for detailed request logging and analytics
@@ -167,6 +240,7 @@ class RequestLoggingMiddleware:
             'timestamp': time.time(),
             'method': request.method,
             'path': request.path,
+            'query_string': request.META.get('QUERY_STRING', ''),
             'user_agent': request.META.get('HTTP_USER_AGENT', ''),
             'ip_address': self._get_client_ip(request),
             'referer': request.META.get('HTTP_REFERER', ''),
@@ -246,14 +320,8 @@ def invalidate_cache_pattern(pattern):
     """
     Invalidate cache keys matching a pattern
     """
-    try:
-        # This would require a cache backend that supports pattern deletion
-        # For Redis: cache.delete_pattern(pattern)
-        # For now, we'll implement a simple approach
-        pass
-    except AttributeError:
-        # Fallback for cache backends that don't support pattern deletion
-        pass
+    from .cache_utils import invalidate_cache_pattern as invalidate
+    invalidate(pattern)
 
 
 class CacheUtils:
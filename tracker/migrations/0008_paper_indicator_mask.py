@@ -0,0 +1,44 @@
+# Generated migration to add the packed transparency indicator bitmask
+
+from django.db import migrations, models
+from django.db.models import Case, IntegerField, Value, When
+
+
+INDICATOR_BITS = {
+    'is_coi_pred': 1,
+    'is_fund_pred': 2,
+    'is_register_pred': 4,
+    'is_open_data': 8,
+    'is_open_code': 16,
+    'is_open_access': 32,
+}
+
+
+def populate_indicator_mask(apps, schema_editor):
+    """Fill indicator_mask for existing papers with a single UPDATE"""
+    Paper = apps.get_model('tracker', 'Paper')
+    mask = sum(
+        Case(When(**{field: True}, then=Value(bit)), default=Value(0), output_field=IntegerField())
+        for field, bit in INDICATOR_BITS.items()
+    )
+    Paper.objects.update(indicator_mask=mask)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0007_increase_paper_field_lengths'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paper',
+            name='indicator_mask',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Bitmask of the six transparency indicators (see tracker.indicators.INDICATORS)'),
+        ),
+        migrations.RunPython(populate_indicator_mask, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='paper',
+            index=models.Index(fields=['indicator_mask'], name='tracker_pap_indicat_4839c1_idx'),
+        ),
+    ]
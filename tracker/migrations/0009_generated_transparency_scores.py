@@ -0,0 +1,88 @@
+# Generated migration turning the transparency score columns into
+# database-generated columns (GENERATED ALWAYS AS ... STORED)
+#
+# A regular column cannot be altered into a generated one, so the columns and
+# the indexes that cover them are dropped and re-created; the database fills
+# the new columns from the indicator booleans.
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+import django.db.models.functions.math
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0008_paper_indicator_mask'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='paper',
+            name='tracker_pap_transpa_b7fdbe_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='paper',
+            name='tracker_pap_indicat_4839c1_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='paper',
+            name='tracker_pap_pub_yea_ed6cf6_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='paper',
+            name='tracker_pap_broad_s_8dfd5f_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='paper',
+            name='tracker_pap_journal_287268_idx',
+        ),
+        migrations.RemoveField(
+            model_name='paper',
+            name='transparency_score',
+        ),
+        migrations.RemoveField(
+            model_name='paper',
+            name='transparency_score_pct',
+        ),
+        migrations.RemoveField(
+            model_name='paper',
+            name='indicator_mask',
+        ),
+        migrations.AddField(
+            model_name='paper',
+            name='transparency_score',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.Case(models.When(is_coi_pred=True, then=models.Value(1)), default=models.Value(0), output_field=models.IntegerField()), '+', models.Case(models.When(is_fund_pred=True, then=models.Value(1)), default=models.Value(0), output_field=models.IntegerField())), '+', models.Case(models.When(is_register_pred=True, then=models.Value(1)), default=models.Value(0), output_field=models.IntegerField())), '+', models.Case(models.When(is_open_data=True, then=models.Value(1)), default=models.Value(0), output_field=models.IntegerField())), '+', models.Case(models.When(is_open_code=True, then=models.Value(1)), default=models.Value(0), output_field=models.IntegerField())), '+', models.Case(models.When(is_open_access=True, then=models.Value(1)), default=models.Value(0), output_field=models.IntegerField())), help_text='Total transparency score (0-6): COI + Funding + Registration + Open Data + Open Code + Open Access', output_field=models.IntegerField()),
+        ),
+        migrations.AddField(
+            model_name='paper',
+            name='transparency_score_pct',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Cast(django.db.models.functions.math.Round(django.db.models.functions.comparison.Cast(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.Case(models.When(is_coi_pred=True, then=models.Value(1)), default=models.Value(0), output_field=models.IntegerField()), '+', models.Case(models.When(is_fund_pred=True, then=models.Value(1)), default=models.Value(0), output_field=models.IntegerField())), '+', models.Case(models.When(is_register_pred=True, then=models.Value(1)), default=models.Value(0), output_field=models.IntegerField())), '+', models.Case(models.When(is_open_data=True, then=models.Value(1)), default=models.Value(0), output_field=models.IntegerField())), '+', models.Case(models.When(is_open_code=True, then=models.Value(1)), default=models.Value(0), output_field=models.IntegerField())), '+', models.Case(models.When(is_open_access=True, then=models.Value(1)), default=models.Value(0), output_field=models.IntegerField())), '*', models.Value(100.0)), '/', models.Value(6)), output_field=models.DecimalField(decimal_places=3, max_digits=6)), 1), output_field=models.FloatField()), help_text='Transparency score as percentage', output_field=models.FloatField()),
+        ),
+        migrations.AddField(
+            model_name='paper',
+            name='indicator_mask',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.Case(models.When(is_coi_pred=True, then=models.Value(1)), default=models.Value(0), output_field=models.IntegerField()), '+', models.Case(models.When(is_fund_pred=True, then=models.Value(2)), default=models.Value(0), output_field=models.IntegerField())), '+', models.Case(models.When(is_register_pred=True, then=models.Value(4)), default=models.Value(0), output_field=models.IntegerField())), '+', models.Case(models.When(is_open_data=True, then=models.Value(8)), default=models.Value(0), output_field=models.IntegerField())), '+', models.Case(models.When(is_open_code=True, then=models.Value(16)), default=models.Value(0), output_field=models.IntegerField())), '+', models.Case(models.When(is_open_access=True, then=models.Value(32)), default=models.Value(0), output_field=models.IntegerField())), help_text='Bitmask of the six transparency indicators (see tracker.indicators.INDICATORS)', output_field=models.PositiveSmallIntegerField()),
+        ),
+        migrations.AddIndex(
+            model_name='paper',
+            index=models.Index(fields=['transparency_score'], name='tracker_pap_transpa_b7fdbe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paper',
+            index=models.Index(fields=['indicator_mask'], name='tracker_pap_indicat_4839c1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paper',
+            index=models.Index(fields=['pub_year', 'transparency_score'], name='tracker_pap_pub_yea_ed6cf6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paper',
+            index=models.Index(fields=['broad_subject_term', 'transparency_score'], name='tracker_pap_broad_s_8dfd5f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paper',
+            index=models.Index(fields=['journal_id', 'transparency_score', 'pub_year'], name='tracker_pap_journal_287268_idx'),
+        ),
+    ]
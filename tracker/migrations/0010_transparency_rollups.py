@@ -0,0 +1,132 @@
+# Generated migration for the transparency trend rollups
+#
+# TransparencyTrend gains open access counts and a score sum (so averages can
+# be re-aggregated across months and fields), and may now hold papers with no
+# matching research field. JournalTrend is the per-journal yearly rollup.
+# Both tables are filled once here; tracker.rollups keeps them current.
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import ExtractMonth
+
+
+INDICATORS = [
+    ('data_sharing', 'is_open_data'),
+    ('code_sharing', 'is_open_code'),
+    ('coi_disclosure', 'is_coi_pred'),
+    ('funding_disclosure', 'is_fund_pred'),
+    ('protocol_registration', 'is_register_pred'),
+    ('open_access', 'is_open_access'),
+]
+
+
+def _aggregate(papers, *group_by):
+    return papers.values(*group_by).annotate(
+        total_papers=Count('id'),
+        transparency_score_sum=Sum('transparency_score'),
+        **{f'{key}_count': Count('id', filter=Q(**{field: True})) for key, field in INDICATORS}
+    ).order_by()
+
+
+def _counts(row):
+    return {
+        'total_papers': row['total_papers'],
+        'transparency_score_sum': row['transparency_score_sum'] or 0,
+        **{f'{key}_count': row[f'{key}_count'] for key, _ in INDICATORS},
+    }
+
+
+def populate_rollups(apps, schema_editor):
+    """Build both rollup tables from the current papers"""
+    Paper = apps.get_model('tracker', 'Paper')
+    ResearchField = apps.get_model('tracker', 'ResearchField')
+    TransparencyTrend = apps.get_model('tracker', 'TransparencyTrend')
+    JournalTrend = apps.get_model('tracker', 'JournalTrend')
+
+    field_ids = dict(ResearchField.objects.values_list('name', 'id'))
+    papers = Paper.objects.filter(pub_year__isnull=False).annotate(
+        pub_month=ExtractMonth('first_publication_date')
+    )
+
+    buckets = {}
+    for row in _aggregate(papers, 'pub_year', 'pub_month', 'broad_subject_term'):
+        key = (row['pub_year'], row['pub_month'], field_ids.get(row['broad_subject_term']))
+        bucket = buckets.setdefault(key, dict.fromkeys(_counts(row), 0))
+        for name, value in _counts(row).items():
+            bucket[name] += value
+
+    trends = []
+    for (year, month, field_id), counts in buckets.items():
+        total = counts['total_papers']
+        trends.append(TransparencyTrend(
+            year=year, month=month, field_id=field_id,
+            avg_transparency_score=round(counts['transparency_score_sum'] / total, 2),
+            **{f'{key}_pct': round(counts[f'{key}_count'] * 100.0 / total, 1) for key, _ in INDICATORS},
+            **counts
+        ))
+    TransparencyTrend.objects.all().delete()
+    TransparencyTrend.objects.bulk_create(trends, batch_size=1000)
+
+    journal_trends = []
+    for row in _aggregate(papers.filter(journal__isnull=False), 'journal_id', 'pub_year'):
+        counts = _counts(row)
+        journal_trends.append(JournalTrend(
+            journal_id=row['journal_id'], year=row['pub_year'],
+            avg_transparency_score=round(counts['transparency_score_sum'] / counts['total_papers'], 2),
+            **counts
+        ))
+    JournalTrend.objects.bulk_create(journal_trends, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0009_generated_transparency_scores'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transparencytrend',
+            name='open_access_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='transparencytrend',
+            name='open_access_pct',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='transparencytrend',
+            name='transparency_score_sum',
+            field=models.IntegerField(default=0, help_text='Sum of paper scores, for re-aggregating averages'),
+        ),
+        migrations.AlterField(
+            model_name='transparencytrend',
+            name='field',
+            field=models.ForeignKey(blank=True, help_text='Research field (empty for papers without a matching field)', null=True, on_delete=django.db.models.deletion.CASCADE, to='tracker.researchfield'),
+        ),
+        migrations.CreateModel(
+            name='JournalTrend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField(db_index=True)),
+                ('total_papers', models.IntegerField(default=0)),
+                ('data_sharing_count', models.IntegerField(default=0)),
+                ('code_sharing_count', models.IntegerField(default=0)),
+                ('coi_disclosure_count', models.IntegerField(default=0)),
+                ('funding_disclosure_count', models.IntegerField(default=0)),
+                ('protocol_registration_count', models.IntegerField(default=0)),
+                ('open_access_count', models.IntegerField(default=0)),
+                ('avg_transparency_score', models.FloatField(default=0.0)),
+                ('transparency_score_sum', models.IntegerField(default=0, help_text='Sum of paper scores, for re-aggregating averages')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('journal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trends', to='tracker.journal')),
+            ],
+            options={
+                'ordering': ['journal', 'year'],
+                'unique_together': {('journal', 'year')},
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
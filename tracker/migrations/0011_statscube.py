@@ -0,0 +1,82 @@
+# Generated migration for the statistics cube
+#
+# StatsCube holds one row per (pub_year, broad_subject_term, journal, source)
+# with totals, indicator counts and the score sum, so statistics pages can
+# roll up any subset of those dimensions without scanning tracker_paper.
+# It is filled once here; tracker.rollups keeps it current.
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+COUNTS = [
+    ('coi_disclosure_count', 'is_coi_pred'),
+    ('funding_count', 'is_fund_pred'),
+    ('registration_count', 'is_register_pred'),
+    ('open_data_count', 'is_open_data'),
+    ('open_code_count', 'is_open_code'),
+    ('open_access_count', 'is_open_access'),
+]
+
+
+def populate_cube(apps, schema_editor):
+    """Build the cube from the current papers"""
+    Paper = apps.get_model('tracker', 'Paper')
+    StatsCube = apps.get_model('tracker', 'StatsCube')
+
+    rows = Paper.objects.values('pub_year', 'broad_subject_term', 'journal_id', 'source').annotate(
+        total_papers=Count('id'),
+        transparency_score_sum=Sum('transparency_score'),
+        transparency_processed_count=Count('id', filter=Q(transparency_processed=True)),
+        **{column: Count('id', filter=Q(**{field: True})) for column, field in COUNTS}
+    ).order_by()
+
+    StatsCube.objects.bulk_create([
+        StatsCube(
+            pub_year=row['pub_year'],
+            broad_subject_term=row['broad_subject_term'],
+            journal_id=row['journal_id'],
+            source=row['source'] or '',
+            total_papers=row['total_papers'],
+            transparency_score_sum=row['transparency_score_sum'] or 0,
+            transparency_processed_count=row['transparency_processed_count'],
+            **{column: row[column] for column, _ in COUNTS}
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0010_transparency_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatsCube',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_year', models.IntegerField(blank=True, null=True)),
+                ('broad_subject_term', models.CharField(blank=True, max_length=200, null=True)),
+                ('source', models.CharField(blank=True, default='', max_length=50)),
+                ('total_papers', models.IntegerField(default=0)),
+                ('transparency_processed_count', models.IntegerField(default=0)),
+                ('coi_disclosure_count', models.IntegerField(default=0)),
+                ('funding_count', models.IntegerField(default=0)),
+                ('registration_count', models.IntegerField(default=0)),
+                ('open_data_count', models.IntegerField(default=0)),
+                ('open_code_count', models.IntegerField(default=0)),
+                ('open_access_count', models.IntegerField(default=0)),
+                ('transparency_score_sum', models.IntegerField(default=0, help_text='Sum of paper scores, for re-aggregating averages')),
+                ('journal', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='stats_cells', to='tracker.journal')),
+            ],
+            options={
+                'verbose_name': 'Statistics Cube Cell',
+                'verbose_name_plural': 'Statistics Cube',
+                'indexes': [models.Index(fields=['pub_year'], name='tracker_sta_pub_yea_7cce35_idx'), models.Index(fields=['broad_subject_term'], name='tracker_sta_broad_s_21fee5_idx'), models.Index(fields=['journal', 'pub_year'], name='tracker_sta_journal_47c647_idx'), models.Index(fields=['pub_year', 'broad_subject_term'], name='tracker_sta_pub_yea_cddcbb_idx')],
+            },
+        ),
+        migrations.RunPython(populate_cube, migrations.RunPython.noop),
+    ]
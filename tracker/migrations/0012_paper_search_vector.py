@@ -0,0 +1,71 @@
+# Generated migration for PostgreSQL full-text search on papers
+#
+# search_vector holds title (weight A), authors (B) and journal title (C).
+# On PostgreSQL a BEFORE INSERT/UPDATE trigger keeps it current for every
+# write path (ORM saves, bulk_create, COPY imports) and a GIN index serves
+# the ranked queries in tracker.search. Other engines only get the column.
+# 0018 narrows the trigger to writes of the three searched columns.
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+SEARCH_VECTOR_SQL = """
+    setweight(to_tsvector('english', coalesce({row}title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce({row}author_string, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce({row}journal_title, '')), 'C')
+"""
+
+CREATE_SQL = [
+    f"""
+    CREATE OR REPLACE FUNCTION tracker_paper_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := {SEARCH_VECTOR_SQL.format(row='NEW.')};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE TRIGGER tracker_paper_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON tracker_paper
+    FOR EACH ROW EXECUTE FUNCTION tracker_paper_search_vector_update();
+    """,
+    f"UPDATE tracker_paper SET search_vector = {SEARCH_VECTOR_SQL.format(row='')};",
+    "CREATE INDEX tracker_paper_search_vector_gin ON tracker_paper USING gin (search_vector);",
+]
+
+DROP_SQL = [
+    "DROP INDEX IF EXISTS tracker_paper_search_vector_gin;",
+    "DROP TRIGGER IF EXISTS tracker_paper_search_vector_trigger ON tracker_paper;",
+    "DROP FUNCTION IF EXISTS tracker_paper_search_vector_update();",
+]
+
+
+def create_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in CREATE_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0011_statscube'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paper',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
@@ -0,0 +1,76 @@
+# Generated migration for SQLite full-text search on papers
+#
+# tracker_paper_fts is an FTS5 index over tracker_paper (external content,
+# so the text is not stored twice). Insert/update/delete triggers keep it in
+# sync for every write path; tracker.search ranks matches with bm25().
+# Only runs on SQLite; PostgreSQL uses the search_vector column from 0012.
+# Later migrations that rebuild tracker_paper drop these triggers; the
+# post_migrate hook tracker.search.ensure_fts_triggers() recreates them.
+
+from django.db import migrations
+
+
+FTS_COLUMNS = 'title, author_string, journal_title'
+
+CREATE_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS tracker_paper_fts USING fts5(
+        {FTS_COLUMNS},
+        content='tracker_paper', content_rowid='id', tokenize='porter unicode61'
+    );
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tracker_paper_fts_insert AFTER INSERT ON tracker_paper BEGIN
+        INSERT INTO tracker_paper_fts(rowid, {FTS_COLUMNS})
+        VALUES (new.id, new.title, new.author_string, new.journal_title);
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tracker_paper_fts_delete AFTER DELETE ON tracker_paper BEGIN
+        INSERT INTO tracker_paper_fts(tracker_paper_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id, old.title, old.author_string, old.journal_title);
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tracker_paper_fts_update
+    AFTER UPDATE OF {FTS_COLUMNS} ON tracker_paper BEGIN
+        INSERT INTO tracker_paper_fts(tracker_paper_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id, old.title, old.author_string, old.journal_title);
+        INSERT INTO tracker_paper_fts(rowid, {FTS_COLUMNS})
+        VALUES (new.id, new.title, new.author_string, new.journal_title);
+    END;
+    """,
+    "INSERT INTO tracker_paper_fts(tracker_paper_fts) VALUES ('rebuild');",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS tracker_paper_fts_insert;",
+    "DROP TRIGGER IF EXISTS tracker_paper_fts_delete;",
+    "DROP TRIGGER IF EXISTS tracker_paper_fts_update;",
+    "DROP TABLE IF EXISTS tracker_paper_fts;",
+]
+
+
+def create_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0012_paper_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
@@ -0,0 +1,64 @@
+# Generated migration for trigram-indexed journal and author search
+#
+# Substring (icontains) and typo-tolerant (trigram similarity) lookups on
+# journal names, publishers, countries and author strings can't use btree
+# indexes. On PostgreSQL this enables pg_trgm and adds GIN trigram indexes
+# for those columns. The btree indexes that served none of these queries
+# (author_string, publisher, and a duplicate on country) are dropped.
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+TRIGRAM_INDEXES = [
+    ('tracker_journal_title_abbreviation_trgm', 'tracker_journal', 'title_abbreviation'),
+    ('tracker_journal_title_full_trgm', 'tracker_journal', 'title_full'),
+    ('tracker_journal_publisher_trgm', 'tracker_journal', 'publisher'),
+    ('tracker_journal_country_trgm', 'tracker_journal', 'country'),
+    ('tracker_paper_author_string_trgm', 'tracker_paper', 'author_string'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops);"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name};")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0013_paper_fts5'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='journal',
+            name='tracker_jou_country_888804_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='journal',
+            name='tracker_jou_publish_665cdf_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='paper',
+            name='tracker_pap_author__7a6515_idx',
+        ),
+        migrations.AlterField(
+            model_name='journal',
+            name='publisher',
+            field=models.CharField(blank=True, max_length=500, null=True),
+        ),
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,25 @@
+# Generated migration for keyset (cursor) pagination
+#
+# Cursor pages seek with a row-value comparison on (pub_year, id) for the
+# API and (pub_year, epmc_id) for the paper list; these composite btrees let
+# every page start at the cursor instead of scanning past earlier rows.
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0014_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='paper',
+            index=models.Index(fields=['pub_year', 'id'], name='tracker_pap_pub_yea_423b62_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paper',
+            index=models.Index(fields=['pub_year', 'epmc_id'], name='tracker_pap_pub_yea_71f36c_idx'),
+        ),
+    ]
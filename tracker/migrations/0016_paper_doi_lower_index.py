@@ -0,0 +1,21 @@
+# Generated migration for batch identifier lookup
+#
+# DOIs are case-insensitive but stored as published; POST /api/v1/papers/lookup/
+# matches lower(doi) IN (...), which this expression index serves.
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0015_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='paper',
+            index=models.Index(django.db.models.functions.text.Lower('doi'), name='tracker_paper_doi_lower_idx'),
+        ),
+    ]
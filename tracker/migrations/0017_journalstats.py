@@ -0,0 +1,92 @@
+# Generated migration for denormalized journal statistics
+#
+# JournalStats holds one row per journal with its paper count, indicator
+# counts, score sum/average and publication year range, so journal lists,
+# rankings and the admin sort and filter on indexed columns instead of
+# counting papers per request. It is filled once here; tracker.rollups
+# keeps it current for the journals each import touches.
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Q, Sum
+
+
+COUNTS = [
+    ('coi_disclosure_count', 'is_coi_pred'),
+    ('funding_count', 'is_fund_pred'),
+    ('registration_count', 'is_register_pred'),
+    ('open_data_count', 'is_open_data'),
+    ('open_code_count', 'is_open_code'),
+    ('open_access_count', 'is_open_access'),
+]
+
+
+def populate_journal_stats(apps, schema_editor):
+    """One row per journal from the current papers"""
+    Journal = apps.get_model('tracker', 'Journal')
+    JournalStats = apps.get_model('tracker', 'JournalStats')
+    Paper = apps.get_model('tracker', 'Paper')
+
+    rows = {
+        row['journal_id']: row
+        for row in Paper.objects.filter(journal__isnull=False).values('journal_id').annotate(
+            total_papers=Count('id'),
+            transparency_score_sum=Sum('transparency_score'),
+            transparency_processed_count=Count('id', filter=Q(transparency_processed=True)),
+            first_year=Min('pub_year'),
+            last_year=Max('pub_year'),
+            **{column: Count('id', filter=Q(**{field: True})) for column, field in COUNTS}
+        ).order_by()
+    }
+
+    objects = []
+    for journal_id in Journal.objects.values_list('id', flat=True):
+        row = rows.get(journal_id, {})
+        total = row.get('total_papers', 0)
+        score_sum = row.get('transparency_score_sum') or 0
+        objects.append(JournalStats(
+            journal_id=journal_id,
+            total_papers=total,
+            transparency_score_sum=score_sum,
+            transparency_processed_count=row.get('transparency_processed_count', 0),
+            avg_transparency_score=round(score_sum / total, 2) if total else 0.0,
+            first_year=row.get('first_year'),
+            last_year=row.get('last_year'),
+            **{column: row.get(column, 0) for column, _ in COUNTS}
+        ))
+    JournalStats.objects.bulk_create(objects, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0016_paper_doi_lower_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JournalStats',
+            fields=[
+                ('journal', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='tracker.journal')),
+                ('total_papers', models.IntegerField(default=0)),
+                ('transparency_processed_count', models.IntegerField(default=0)),
+                ('coi_disclosure_count', models.IntegerField(default=0)),
+                ('funding_count', models.IntegerField(default=0)),
+                ('registration_count', models.IntegerField(default=0)),
+                ('open_data_count', models.IntegerField(default=0)),
+                ('open_code_count', models.IntegerField(default=0)),
+                ('open_access_count', models.IntegerField(default=0)),
+                ('transparency_score_sum', models.IntegerField(default=0, help_text='Sum of paper scores, for re-aggregating averages')),
+                ('avg_transparency_score', models.FloatField(default=0.0)),
+                ('first_year', models.IntegerField(blank=True, null=True)),
+                ('last_year', models.IntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Journal Statistics',
+                'verbose_name_plural': 'Journal Statistics',
+                'indexes': [models.Index(fields=['total_papers'], name='tracker_jou_total_p_ec5af3_idx'), models.Index(fields=['avg_transparency_score', 'total_papers'], name='tracker_jou_avg_tra_194dc8_idx')],
+            },
+        ),
+        migrations.RunPython(populate_journal_stats, migrations.RunPython.noop),
+    ]
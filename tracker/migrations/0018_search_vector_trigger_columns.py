@@ -0,0 +1,39 @@
+# Generated migration narrowing the search_vector trigger
+#
+# 0012's trigger fired on every UPDATE of tracker_paper, so bulk updates of
+# the indicator flags recomputed three to_tsvector() calls and rewrote the
+# GIN entry for each row. It now fires only when a searched column is
+# written, like the FTS5 triggers in 0013. PostgreSQL only.
+
+from django.db import migrations
+
+
+TRIGGER_SQL = """
+    DROP TRIGGER IF EXISTS tracker_paper_search_vector_trigger ON tracker_paper;
+    CREATE TRIGGER tracker_paper_search_vector_trigger
+    BEFORE INSERT OR UPDATE{columns} ON tracker_paper
+    FOR EACH ROW EXECUTE FUNCTION tracker_paper_search_vector_update();
+"""
+
+
+def narrow_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(TRIGGER_SQL.format(columns=' OF title, author_string, journal_title'))
+
+
+def widen_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(TRIGGER_SQL.format(columns=''))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0017_journalstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(narrow_search_trigger, widen_search_trigger),
+    ]
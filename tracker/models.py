@@ -1,8 +1,12 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User
-from django.core.validators import MinValueValidator, MaxValueValidator
+from django.contrib.postgres.search import SearchVectorField
 from postgres_copy import CopyManager
-from .managers import OptimizedPaperManager
+from .managers import OptimizedPaperManager, StatsCubeQuerySet
+from .indicators import (
+    indicator_mask_expression, transparency_score_expression, transparency_score_pct_expression,
+)
 
 class Journal(models.Model):
     """Model representing a scientific journal"""
@@ -16,7 +20,7 @@ class Journal(models.Model):
     publication_end_year = models.IntegerField(null=True, blank=True)
     frequency = models.CharField(max_length=100, null=True, blank=True)
     country = models.CharField(max_length=100, null=True, blank=True, db_index=True)
-    publisher = models.CharField(max_length=500, null=True, blank=True, db_index=True)
+    publisher = models.CharField(max_length=500, null=True, blank=True)
     language = models.CharField(max_length=100, null=True, blank=True)
     
     # ISSN information
@@ -69,8 +73,8 @@ class Journal(models.Model):
     class Meta:
         ordering = ['title_abbreviation']
         indexes = [
-            models.Index(fields=['country']),
-            models.Index(fields=['publisher']),
+            # country keeps its db_index btree; country/publisher/title substring
+            # searches use the pg_trgm GIN indexes from migration 0014 (PostgreSQL)
             models.Index(fields=['publication_start_year']),
         ]
     
@@ -158,17 +162,25 @@ class Paper(models.Model):
     broad_subject_term = models.CharField(max_length=200, null=True, blank=True, db_index=True, 
                                         help_text="NLM broad subject classification for this paper's journal")
     
-    # === Calculated Fields ===
-    transparency_score = models.IntegerField(
-        default=0,
-        validators=[MinValueValidator(0), MaxValueValidator(6)],
+    # === Calculated Fields (generated and stored by the database) ===
+    transparency_score = models.GeneratedField(
+        expression=transparency_score_expression(),
+        output_field=models.IntegerField(),
+        db_persist=True,
         help_text="Total transparency score (0-6): COI + Funding + Registration + Open Data + Open Code + Open Access"
     )
-    transparency_score_pct = models.FloatField(
-        default=0.0,
-        validators=[MinValueValidator(0.0), MaxValueValidator(100.0)],
+    transparency_score_pct = models.GeneratedField(
+        expression=transparency_score_pct_expression(),
+        output_field=models.FloatField(),
+        db_persist=True,
         help_text="Transparency score as percentage"
     )
+    indicator_mask = models.GeneratedField(
+        expression=indicator_mask_expression(),
+        output_field=models.PositiveSmallIntegerField(),
+        db_persist=True,
+        help_text="Bitmask of the six transparency indicators (see tracker.indicators.INDICATORS)"
+    )
     
     # === Metadata ===
     # Processing flags
@@ -177,6 +189,10 @@ class Paper(models.Model):
     assessment_tool = models.CharField(max_length=50, default='rtransparent', db_index=True, 
                                      help_text="Tool used for transparency assessment (e.g., rtransparent, manual)")
     
+    # Full-text search (PostgreSQL): weighted title/authors/journal, filled by a database trigger
+    # (deferred by the default manager)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     # System metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -184,6 +200,8 @@ class Paper(models.Model):
     # Add optimized manager
     objects = OptimizedPaperManager()
     
+    GENERATED_FIELDS = ('transparency_score', 'transparency_score_pct', 'indicator_mask')
+    
     class Meta:
         ordering = ['-pub_year', 'title']
         indexes = [
@@ -208,6 +226,7 @@ class Paper(models.Model):
             models.Index(fields=['is_fund_pred']),
             models.Index(fields=['is_register_pred']),
             models.Index(fields=['transparency_processed']),
+            models.Index(fields=['indicator_mask']),  # Indicator combination filters
             
             # Subject and categorization
             models.Index(fields=['broad_subject_term']),
@@ -217,9 +236,8 @@ class Paper(models.Model):
             models.Index(fields=['journal_id']),
             models.Index(fields=['journal_issn']),
             
-            # Search optimization
-            models.Index(fields=['title']),  # For title searches
-            models.Index(fields=['author_string']),  # For author searches
+            # Sorting by title; title/author searches use the full-text and pg_trgm indexes
+            models.Index(fields=['title']),
             
             # Date and processing
             models.Index(fields=['created_at']),
@@ -234,9 +252,14 @@ class Paper(models.Model):
             models.Index(fields=['transparency_processed', 'assessment_tool']),  # Processing status
             models.Index(fields=['pub_year', 'is_open_data', 'is_open_code']),  # Transparency trends
             models.Index(fields=['journal_id', 'transparency_score', 'pub_year']),  # Journal analysis
+            models.Index(fields=['pub_year', 'id']),  # Keyset pagination (API)
+            models.Index(fields=['pub_year', 'epmc_id']),  # Keyset pagination (paper list)
             
-            # Full-text search support (for PostgreSQL)
-            # models.Index(fields=['title', 'author_string']),  # Enable if using PostgreSQL
+            # Case-insensitive DOI matching (batch identifier lookup)
+            models.Index(Lower('doi'), name='tracker_paper_doi_lower_idx'),
+            
+            # Full-text search: GIN index on search_vector is created by migration 0012 on PostgreSQL only,
+            # the author_string pg_trgm GIN index by migration 0014
         ]
         
         # Database table options for performance
@@ -266,11 +289,23 @@ class Paper(models.Model):
         """Get transparency score as percentage (out of 6 indicators)"""
         return round((self.transparency_score / 6.0) * 100, 1)
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        paper = super().from_db(db, field_names, values)
+        # Rollup keys as loaded (see rollups.TouchedKeys), None when any was deferred
+        loaded = paper.__dict__
+        if all(name in loaded for name in ('pub_year', 'broad_subject_term', 'journal_id')):
+            paper.loaded_rollup_keys = (loaded['pub_year'], loaded['broad_subject_term'], loaded['journal_id'])
+        return paper
+    
     def save(self, *args, **kwargs):
-        """Override save to calculate transparency score"""
-        self.transparency_score = self.calculate_transparency_score()
-        self.transparency_score_pct = self.get_transparency_percentage()
+        """Save, dropping stale generated values so they reload from the database on access"""
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        if not adding:
+            # Inserts return the generated columns; updates leave the old values behind
+            for field in self.GENERATED_FIELDS:
+                self.__dict__.pop(field, None)
     
     def get_identifiers_dict(self):
         """Get all available identifiers as dictionary"""
@@ -332,10 +367,11 @@ class UserProfile(models.Model):
         return f"{self.user.username} - {self.institution}"
 
 class TransparencyTrend(models.Model):
-    """Model to store transparency trends over time"""
+    """Model to store transparency trends over time (rebuilt by tracker.rollups)"""
     year = models.IntegerField(db_index=True)
     month = models.IntegerField(null=True, blank=True)
-    field = models.ForeignKey(ResearchField, on_delete=models.CASCADE)
+    field = models.ForeignKey(ResearchField, on_delete=models.CASCADE, null=True, blank=True,
+                              help_text="Research field (empty for papers without a matching field)")
     
     # Transparency metrics
     total_papers = models.IntegerField(default=0)
@@ -344,6 +380,7 @@ class TransparencyTrend(models.Model):
     coi_disclosure_count = models.IntegerField(default=0)
     funding_disclosure_count = models.IntegerField(default=0)
     protocol_registration_count = models.IntegerField(default=0)
+    open_access_count = models.IntegerField(default=0)
     replication_count = models.IntegerField(default=0)
     novelty_count = models.IntegerField(default=0)
     
@@ -353,10 +390,12 @@ class TransparencyTrend(models.Model):
     coi_disclosure_pct = models.FloatField(default=0.0)
     funding_disclosure_pct = models.FloatField(default=0.0)
     protocol_registration_pct = models.FloatField(default=0.0)
+    open_access_pct = models.FloatField(default=0.0)
     replication_pct = models.FloatField(default=0.0)
     novelty_pct = models.FloatField(default=0.0)
     
     avg_transparency_score = models.FloatField(default=0.0)
+    transparency_score_sum = models.IntegerField(default=0, help_text="Sum of paper scores, for re-aggregating averages")
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -367,4 +406,104 @@ class TransparencyTrend(models.Model):
     
     def __str__(self):
         date_str = f"{self.year}-{self.month:02d}" if self.month else str(self.year)
-        return f"{self.field.name} - {date_str}"
+        field_name = self.field.name if self.field_id else 'Unclassified'
+        return f"{field_name} - {date_str}"
+
+class JournalTrend(models.Model):
+    """Yearly transparency rollup per journal (rebuilt by tracker.rollups)"""
+    journal = models.ForeignKey(Journal, on_delete=models.CASCADE, related_name='trends')
+    year = models.IntegerField(db_index=True)
+    
+    # Transparency metrics
+    total_papers = models.IntegerField(default=0)
+    data_sharing_count = models.IntegerField(default=0)
+    code_sharing_count = models.IntegerField(default=0)
+    coi_disclosure_count = models.IntegerField(default=0)
+    funding_disclosure_count = models.IntegerField(default=0)
+    protocol_registration_count = models.IntegerField(default=0)
+    open_access_count = models.IntegerField(default=0)
+    
+    avg_transparency_score = models.FloatField(default=0.0)
+    transparency_score_sum = models.IntegerField(default=0, help_text="Sum of paper scores, for re-aggregating averages")
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['journal', 'year']
+        ordering = ['journal', 'year']
+    
+    def __str__(self):
+        return f"{self.journal.title_abbreviation} - {self.year}"
+
+class StatsCube(models.Model):
+    """
+    Precomputed paper counts keyed by (pub_year, broad_subject_term, journal, source),
+    rebuilt by tracker.rollups. Aggregate pages roll these cells up instead of
+    scanning tracker_paper.
+    """
+    pub_year = models.IntegerField(null=True, blank=True)
+    broad_subject_term = models.CharField(max_length=200, null=True, blank=True)
+    journal = models.ForeignKey(Journal, on_delete=models.CASCADE, null=True, blank=True, related_name='stats_cells')
+    source = models.CharField(max_length=50, blank=True, default='')
+    
+    # Paper counts
+    total_papers = models.IntegerField(default=0)
+    transparency_processed_count = models.IntegerField(default=0)
+    coi_disclosure_count = models.IntegerField(default=0)
+    funding_count = models.IntegerField(default=0)
+    registration_count = models.IntegerField(default=0)
+    open_data_count = models.IntegerField(default=0)
+    open_code_count = models.IntegerField(default=0)
+    open_access_count = models.IntegerField(default=0)
+    transparency_score_sum = models.IntegerField(default=0, help_text="Sum of paper scores, for re-aggregating averages")
+    
+    objects = StatsCubeQuerySet.as_manager()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['pub_year']),
+            models.Index(fields=['broad_subject_term']),
+            models.Index(fields=['journal', 'pub_year']),
+            models.Index(fields=['pub_year', 'broad_subject_term']),
+        ]
+        verbose_name = 'Statistics Cube Cell'
+        verbose_name_plural = 'Statistics Cube'
+    
+    def __str__(self):
+        return f"{self.pub_year} / {self.broad_subject_term} / {self.journal_id} / {self.source}: {self.total_papers}"
+
+class JournalStats(models.Model):
+    """
+    Denormalized per-journal totals (all years), refreshed by tracker.rollups
+    for the journals each import touches. Journal lists, rankings and the
+    admin sort and filter on these indexed columns instead of counting papers.
+    """
+    journal = models.OneToOneField(Journal, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    
+    # Paper counts
+    total_papers = models.IntegerField(default=0)
+    transparency_processed_count = models.IntegerField(default=0)
+    coi_disclosure_count = models.IntegerField(default=0)
+    funding_count = models.IntegerField(default=0)
+    registration_count = models.IntegerField(default=0)
+    open_data_count = models.IntegerField(default=0)
+    open_code_count = models.IntegerField(default=0)
+    open_access_count = models.IntegerField(default=0)
+    transparency_score_sum = models.IntegerField(default=0, help_text="Sum of paper scores, for re-aggregating averages")
+    
+    avg_transparency_score = models.FloatField(default=0.0)
+    first_year = models.IntegerField(null=True, blank=True)
+    last_year = models.IntegerField(null=True, blank=True)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['total_papers']),
+            models.Index(fields=['avg_transparency_score', 'total_papers']),  # Top journals ranking
+        ]
+        verbose_name = 'Journal Statistics'
+        verbose_name_plural = 'Journal Statistics'
+    
+    def __str__(self):
+        return f"{self.journal.title_abbreviation}: {self.total_papers} papers"
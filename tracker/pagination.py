@@ -0,0 +1,303 @@
+"""
+Keyset (cursor) pagination for Open Science Tracker
+
+OFFSET pagination gets slower with every page and needs a COUNT(*) per
+request. KeysetPaginator instead remembers the sort key of the last row it
+returned and asks for rows strictly after it, so page N costs the same as
+page 1 and rows inserted by a concurrent import never shift or repeat a
+page. Cursors are signed, opaque tokens; total counts are opt-in.
+
+Orderings are ``(sort field, unique tiebreaker)`` on concrete columns, e.g.
+``-pub_year, -id`` (API) or ``-pub_year, -epmc_id`` (paper list). NULL sort
+values come last in either direction.
+"""
+
+import datetime
+import json
+from collections import OrderedDict
+from functools import partial
+
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import BooleanField, F, Q
+from django.db.models.expressions import RawSQL
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .counts import EstimatedCountPaginator
+
+CURSOR_SALT = 'tracker.pagination.cursor'
+
+
+class KeysetUnsupported(Exception):
+    """The queryset's ordering can't be paginated by keyset"""
+
+
+class InvalidCursor(Exception):
+    """The cursor is malformed, tampered with, or belongs to another ordering"""
+
+
+def _jsonable(value):
+    # Full isoformat: DjangoJSONEncoder drops microseconds, which would move the cursor
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return json.loads(json.dumps(value, cls=DjangoJSONEncoder))
+
+
+class KeysetPage:
+    """One page of keyset results (iterable like a list of objects)"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, count=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginate ``queryset`` by its current ordering.
+
+    The ordering must be one concrete field, optionally followed by a unique
+    one; the primary key is appended as tiebreaker when it isn't.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.model = queryset.model
+        self.connection = connections[queryset.db]
+        (self.sort_field, self.sort_desc), (self.key_field, self.key_desc) = self._ordering()
+
+    def _ordering(self):
+        ordering = list(self.queryset.query.order_by or self.model._meta.ordering)
+        if not ordering or len(ordering) > 2 or not all(isinstance(name, str) for name in ordering):
+            raise KeysetUnsupported(f"Can't keyset-paginate ordering {ordering!r}")
+
+        fields = []
+        for name in ordering:
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            try:
+                field = self.model._meta.get_field('id' if name == 'pk' else name)
+            except Exception:
+                raise KeysetUnsupported(f"'{name}' is not a concrete field")
+            if not field.concrete or field.is_relation:
+                raise KeysetUnsupported(f"'{name}' is not a concrete column")
+            fields.append((field, descending))
+
+        if len(fields) == 1 and not (fields[0][0].primary_key or fields[0][0].unique):
+            fields.append((self.model._meta.pk, fields[0][1]))
+        if len(fields) == 1:
+            # Ordered by a unique key alone: it is both sort field and tiebreaker
+            fields.append(fields[0])
+        key_field = fields[1][0]
+        if not (key_field.primary_key or key_field.unique) or key_field.null:
+            raise KeysetUnsupported(f"Tiebreaker '{key_field.name}' must be unique and NOT NULL")
+        return fields
+
+    @property
+    def signature(self):
+        """Identifies the ordering, so cursors from another ordering are rejected"""
+        return [self.sort_field.name, self.sort_desc, self.key_field.name, self.key_desc]
+
+    # --- cursors ---
+
+    def encode_cursor(self, obj, reverse=False):
+        # Rows are model instances or values() dicts (see fastpath.RowSerializer)
+        read = obj.get if isinstance(obj, dict) else partial(getattr, obj)
+        position = [
+            _jsonable(read(self.sort_field.attname)),
+            _jsonable(read(self.key_field.attname)),
+        ]
+        return signing.dumps({'o': self.signature, 'p': position, 'r': reverse}, salt=CURSOR_SALT, compress=True)
+
+    def decode_cursor(self, token):
+        try:
+            data = signing.loads(token, salt=CURSOR_SALT)
+            if data['o'] != self.signature:
+                raise InvalidCursor('Cursor belongs to a different ordering')
+            value, key = data['p']
+            value = None if value is None else self.sort_field.to_python(value)
+            return value, self.key_field.to_python(key), bool(data['r'])
+        except (signing.BadSignature, KeyError, TypeError, ValueError) as exc:
+            raise InvalidCursor(str(exc))
+
+    # --- queries ---
+
+    def _column(self, field):
+        quote = self.connection.ops.quote_name
+        return f'{quote(self.model._meta.db_table)}.{quote(field.column)}'
+
+    def _prep(self, field, value):
+        return field.get_db_prep_value(value, self.connection, prepared=False)
+
+    def _order(self, forward, with_sort=True):
+        def direction(field, descending):
+            return F(field.name).desc() if descending == forward else F(field.name).asc()
+        keys = [direction(self.key_field, self.key_desc)]
+        if with_sort and self.sort_field != self.key_field:
+            keys.insert(0, direction(self.sort_field, self.sort_desc))
+        return keys
+
+    def _after(self, value, key, forward):
+        """Rows with a non-NULL sort value strictly after (value, key) in the walking direction"""
+        if self.sort_field == self.key_field:
+            lookup = 'lt' if self.key_desc == forward else 'gt'
+            return Q(**{f'{self.key_field.name}__{lookup}': key})
+
+        sort_lookup = 'lt' if self.sort_desc == forward else 'gt'
+        key_lookup = 'lt' if self.key_desc == forward else 'gt'
+        if sort_lookup == key_lookup:
+            # Row-value comparison lets the (sort, key) btree seek straight to the cursor
+            operator = '<' if sort_lookup == 'lt' else '>'
+            return RawSQL(
+                f'({self._column(self.sort_field)}, {self._column(self.key_field)}) {operator} (%s, %s)',
+                [self._prep(self.sort_field, value), self._prep(self.key_field, key)],
+                output_field=BooleanField(),
+            )
+        return Q(**{f'{self.sort_field.name}__{sort_lookup}': value}) | Q(
+            **{self.sort_field.name: value, f'{self.key_field.name}__{key_lookup}': key}
+        )
+
+    def _segments(self, forward):
+        """Non-NULL sort values then NULLs when walking forward; the reverse when walking back"""
+        segments = [('values', self.queryset.filter(**{f'{self.sort_field.name}__isnull': False}))]
+        if self.sort_field.null:
+            segments.append(('nulls', self.queryset.filter(**{f'{self.sort_field.name}__isnull': True})))
+        return segments if forward else segments[::-1]
+
+    def _fetch(self, position, forward, limit):
+        """Up to ``limit`` rows after ``position`` (None = from the start) in the walking direction"""
+        rows = []
+        started = position is None
+        value, key = position or (None, None)
+        for name, segment in self._segments(forward):
+            if not started:
+                if (name == 'nulls') != (value is None):
+                    continue  # the cursor sits in the other segment
+                started = True
+                if name == 'nulls':
+                    lookup = 'lt' if self.key_desc == forward else 'gt'
+                    segment = segment.filter(**{f'{self.key_field.name}__{lookup}': key})
+                else:
+                    segment = segment.filter(self._after(value, key, forward))
+            rows.extend(segment.order_by(*self._order(forward, with_sort=name == 'values'))[:limit - len(rows)])
+            if len(rows) >= limit:
+                break
+        return rows
+
+    def page(self, cursor=None, with_count=False):
+        """The page after (or, for a previous-page cursor, before) ``cursor``"""
+        position, reverse = None, False
+        if cursor:
+            value, key, reverse = self.decode_cursor(cursor)
+            position = (value, key)
+
+        rows = self._fetch(position, forward=not reverse, limit=self.per_page + 1)
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+
+        has_next = has_more if not reverse else True
+        has_previous = has_more if reverse else position is not None
+        return KeysetPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1]) if rows and has_next else None,
+            previous_cursor=self.encode_cursor(rows[0], reverse=True) if rows and has_previous else None,
+            count=self.queryset.count() if with_count else None,
+        )
+
+
+class KeysetPagination(BasePagination):
+    """DRF cursor pagination over KeysetPaginator: ?cursor=..., ?page_size=..., ?count=true"""
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def __init__(self, page_size=50):
+        self.page_size = page_size
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        from rest_framework.exceptions import NotFound
+
+        self.request = request
+        with_count = request.query_params.get('count', '').lower() in ('1', 'true', 'yes')
+        try:
+            self.page = KeysetPaginator(queryset, self.get_page_size(request)).page(
+                request.query_params.get(self.cursor_query_param) or None, with_count=with_count
+            )
+        except InvalidCursor:
+            raise NotFound('Invalid cursor')
+        return list(self.page)
+
+    def _link(self, cursor):
+        if cursor is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), 'page')
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        response = OrderedDict()
+        if self.page.count is not None:
+            response['count'] = self.page.count
+        response['next'] = self._link(self.page.next_cursor)
+        response['previous'] = self._link(self.page.previous_cursor)
+        response['results'] = data
+        return Response(response)
+
+
+class PaperPagination(PageNumberPagination):
+    """
+    Page numbers by default, with a planner-estimated ``count`` on large
+    results (``count_is_estimate`` says which); ``?cursor=`` (empty for the
+    first page) switches to keyset pagination for the default/ordering-param
+    orders.
+    """
+
+    django_paginator_class = EstimatedCountPaginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if 'cursor' in request.query_params:
+            try:
+                keyset = KeysetPagination(self.page_size)
+                page = keyset.paginate_queryset(queryset, request, view)
+                self.keyset = keyset
+                return page
+            except KeysetUnsupported:
+                pass
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        response = super().get_paginated_response(data)
+        response.data['count_is_estimate'] = getattr(self.page.paginator.count, 'estimated', False)
+        return response
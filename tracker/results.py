@@ -0,0 +1,95 @@
+"""
+List result cache for Open Science Tracker
+
+Caching a queryset object only pickles its SQL, so every "hit" still runs
+the filters and the search. ResultCachePaginator caches what the query
+produced instead: the total count per normalized filter, and the ordered
+primary keys of each page window. A repeated page then costs one primary
+key lookup for its rows, however expensive the search behind it was.
+
+Entries live under the dataset generation (see cache_utils.dataset_cache),
+so an import makes them unreachable without any explicit invalidation.
+"""
+
+from django.conf import settings
+from django.utils.functional import cached_property
+
+from .cache_utils import get_or_compute, make_cache_key
+from .counts import EstimatedCountPaginator, RowCount
+
+RESULTS_CACHE_PREFIX = 'paper_results'
+
+
+def _timeout():
+    return getattr(settings, 'CACHE_TIMEOUTS', {}).get('search_results', 300)
+
+
+def result_cache_key(params, names):
+    """
+    Key for the filter ``params`` (a QueryDict) restricted to ``names``:
+    blank values dropped, multi-valued parameters sorted, so equivalent
+    URLs share one entry.
+    """
+    spec = []
+    for name in sorted(names):
+        values = sorted(value for value in params.getlist(name) if value != '')
+        if values:
+            spec.append([name, values])
+    return f"{RESULTS_CACHE_PREFIX}_{make_cache_key(spec)}"
+
+
+class ResultCachePaginator(EstimatedCountPaginator):
+    """
+    EstimatedCountPaginator whose count and page windows are cached under
+    ``cache_key``. Page rows are fetched from ``rows`` (default: the model's
+    default manager) by primary key, in the cached order.
+    """
+
+    def __init__(self, object_list, per_page, cache_key=None, rows=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+        self.rows = rows
+
+    @cached_property
+    def count(self):
+        if self.cache_key is None:
+            return super().count
+        count, estimated = get_or_compute(
+            f"{self.cache_key}_count",
+            lambda: self._count_pair(super(ResultCachePaginator, self).count),
+            _timeout(),
+        )
+        return RowCount(count, estimated=estimated)
+
+    @staticmethod
+    def _count_pair(count):
+        return int(count), getattr(count, 'estimated', False)
+
+    def page(self, number):
+        if self.cache_key is None:
+            return super().page(number)
+
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if self.estimated:
+            top += 1  # Look-ahead row: an estimated count can't tell whether another page follows
+        elif top + self.orphans >= self.count:
+            top = self.count
+        window = self.object_list[bottom:top] if top > bottom else self.object_list.none()
+
+        ids = get_or_compute(
+            f"{self.cache_key}_{self.per_page}_{number}",
+            lambda: list(window.values_list('pk', flat=True)),
+            _timeout(),
+        )
+        has_next = len(ids) > self.per_page if self.estimated else None
+        return self._get_page(self._fetch(ids[:self.per_page]), number, self, has_next=has_next)
+
+    def _fetch(self, ids):
+        """Rows for ``ids`` in the same order"""
+        if not ids:
+            return []
+        rows = self.rows if self.rows is not None else self.object_list.model._default_manager.all()
+        by_pk = {row.pk: row for row in rows.filter(pk__in=ids).order_by()}
+        return [by_pk[pk] for pk in ids if pk in by_pk]
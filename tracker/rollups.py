@@ -0,0 +1,413 @@
+"""
+Transparency rollups for Open Science Tracker
+
+TransparencyTrend (year/month/research field), JournalTrend (journal/year),
+StatsCube (year x subject x journal x source) and JournalStats (journal)
+are small precomputed tables that trend charts, statistics pages, journal
+lists and APIs read instead of aggregating the paper table on every
+request. Importers rebuild only the
+keys they touched; ``python manage.py update_trends`` rebuilds everything.
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import ExtractMonth
+
+from .indicators import INDICATORS
+
+logger = logging.getLogger(__name__)
+
+# (rollup column prefix, Paper field)
+TREND_INDICATORS = [
+    ('data_sharing', 'is_open_data'),
+    ('code_sharing', 'is_open_code'),
+    ('coi_disclosure', 'is_coi_pred'),
+    ('funding_disclosure', 'is_fund_pred'),
+    ('protocol_registration', 'is_register_pred'),
+    ('open_access', 'is_open_access'),
+]
+
+COUNT_FIELDS = [f'{key}_count' for key, _ in TREND_INDICATORS]
+
+# StatsCube count columns, named after the indicator keys: (column, Paper field)
+CUBE_COUNTS = [(f'{key}_count', field) for key, field, _, _ in INDICATORS]
+CUBE_SUM_FIELDS = ['total_papers', 'transparency_score_sum', 'transparency_processed_count'] + [
+    column for column, _ in CUBE_COUNTS
+]
+
+
+def _percentage(count, total):
+    return round(count * 100.0 / total, 1) if total else 0.0
+
+
+def _aggregate_papers(papers, *group_by):
+    """One GROUP BY over papers returning totals, indicator counts and the score sum per group"""
+    return papers.values(*group_by).annotate(
+        total_papers=Count('id'),
+        transparency_score_sum=Sum('transparency_score'),
+        **{
+            f'{key}_count': Count('id', filter=Q(**{field: True}))
+            for key, field in TREND_INDICATORS
+        }
+    ).order_by()
+
+
+def _merge_counts(target, row):
+    target['total_papers'] += row['total_papers']
+    target['transparency_score_sum'] += row['transparency_score_sum'] or 0
+    for name in COUNT_FIELDS:
+        target[name] += row[name]
+
+
+def _empty_counts():
+    counts = {'total_papers': 0, 'transparency_score_sum': 0}
+    counts.update({name: 0 for name in COUNT_FIELDS})
+    return counts
+
+
+def _finalize(counts):
+    """Add percentages and the average score to summed counts"""
+    total = counts['total_papers']
+    result = dict(counts)
+    for key, _ in TREND_INDICATORS:
+        result[f'{key}_pct'] = _percentage(counts[f'{key}_count'], total)
+    result['avg_transparency_score'] = (
+        round(counts['transparency_score_sum'] / total, 2) if total else 0.0
+    )
+    return result
+
+
+def _normalize(values):
+    return None if values is None else set(values)
+
+
+def _in_or_null(lookup, values):
+    """``lookup IN values``, also matching NULL when None is one of the values"""
+    condition = Q(**{f'{lookup}__in': [value for value in values if value is not None]})
+    if None in values:
+        condition |= Q(**{f'{lookup}__isnull': True})
+    return condition
+
+
+def refresh_trends(years=None, subjects=None):
+    """
+    Rebuild TransparencyTrend rows for the given publication years and
+    broad subject terms (None means all). Papers whose subject term has no
+    matching ResearchField are rolled up under ``field=None``.
+    """
+    from .models import Paper, ResearchField, TransparencyTrend
+
+    years = _normalize(years)
+    subjects = _normalize(subjects)
+    field_ids = dict(ResearchField.objects.values_list('name', 'id'))
+
+    papers = Paper.objects.filter(pub_year__isnull=False)
+    trends = TransparencyTrend.objects.all()
+    if years is not None:
+        papers = papers.filter(pub_year__in=years - {None})
+        trends = trends.filter(year__in=years - {None})
+    if subjects is not None:
+        matched = [name for name in subjects if name in field_ids]
+        paper_filter = Q(broad_subject_term__in=matched)
+        trend_filter = Q(field_id__in=[field_ids[name] for name in matched])
+        if len(matched) < len(subjects):
+            # An unclassified subject was touched: rebuild the whole unclassified bucket
+            paper_filter |= Q(broad_subject_term__isnull=True) | ~Q(broad_subject_term__in=list(field_ids))
+            trend_filter |= Q(field__isnull=True)
+        papers = papers.filter(paper_filter)
+        trends = trends.filter(trend_filter)
+
+    buckets = {}
+    rows = _aggregate_papers(
+        papers.annotate(pub_month=ExtractMonth('first_publication_date')),
+        'pub_year', 'pub_month', 'broad_subject_term',
+    )
+    for row in rows:
+        key = (row['pub_year'], row['pub_month'], field_ids.get(row['broad_subject_term']))
+        _merge_counts(buckets.setdefault(key, _empty_counts()), row)
+
+    objects = []
+    for (year, month, field_id), counts in buckets.items():
+        values = _finalize(counts)
+        values.pop('transparency_score_sum')
+        objects.append(TransparencyTrend(
+            year=year, month=month, field_id=field_id,
+            transparency_score_sum=counts['transparency_score_sum'], **values
+        ))
+
+    with transaction.atomic():
+        trends.delete()
+        TransparencyTrend.objects.bulk_create(objects, batch_size=1000)
+
+    return len(objects)
+
+
+def refresh_journal_trends(years=None, journals=None):
+    """Rebuild JournalTrend rows for the given publication years and journal ids (None means all)"""
+    from .models import JournalTrend, Paper
+
+    years = _normalize(years)
+    journals = _normalize(journals)
+
+    papers = Paper.objects.filter(pub_year__isnull=False, journal__isnull=False)
+    trends = JournalTrend.objects.all()
+    if years is not None:
+        papers = papers.filter(pub_year__in=years - {None})
+        trends = trends.filter(year__in=years - {None})
+    if journals is not None:
+        papers = papers.filter(journal_id__in=journals - {None})
+        trends = trends.filter(journal_id__in=journals - {None})
+
+    objects = []
+    for row in _aggregate_papers(papers, 'journal_id', 'pub_year'):
+        counts = _empty_counts()
+        _merge_counts(counts, row)
+        objects.append(JournalTrend(
+            journal_id=row['journal_id'],
+            year=row['pub_year'],
+            avg_transparency_score=_finalize(counts)['avg_transparency_score'],
+            **counts
+        ))
+
+    with transaction.atomic():
+        trends.delete()
+        JournalTrend.objects.bulk_create(objects, batch_size=1000)
+
+    return len(objects)
+
+
+def refresh_cube(years=None, subjects=None, journals=None):
+    """
+    Rebuild StatsCube cells for the given years, subject terms and journal
+    ids (None means all; None inside a collection matches NULL keys).
+    """
+    from .models import Paper, StatsCube
+
+    papers = Paper.objects.all()
+    cells = StatsCube.objects.all()
+    for lookup, cell_lookup, values in [
+        ('pub_year', 'pub_year', years),
+        ('broad_subject_term', 'broad_subject_term', subjects),
+        ('journal_id', 'journal_id', journals),
+    ]:
+        values = _normalize(values)
+        if values is not None:
+            papers = papers.filter(_in_or_null(lookup, values))
+            cells = cells.filter(_in_or_null(cell_lookup, values))
+
+    rows = papers.values('pub_year', 'broad_subject_term', 'journal_id', 'source').annotate(
+        total_papers=Count('id'),
+        transparency_score_sum=Sum('transparency_score'),
+        transparency_processed_count=Count('id', filter=Q(transparency_processed=True)),
+        **{column: Count('id', filter=Q(**{field: True})) for column, field in CUBE_COUNTS}
+    ).order_by()
+
+    objects = [
+        StatsCube(
+            pub_year=row['pub_year'],
+            broad_subject_term=row['broad_subject_term'],
+            journal_id=row['journal_id'],
+            source=row['source'] or '',
+            **{name: row[name] or 0 for name in CUBE_SUM_FIELDS}
+        )
+        for row in rows
+    ]
+
+    with transaction.atomic():
+        cells.delete()
+        StatsCube.objects.bulk_create(objects, batch_size=1000)
+
+    return len(objects)
+
+
+def refresh_journal_stats(journals=None):
+    """
+    Rebuild JournalStats rows for the given journal ids (None means all).
+    Every journal in scope gets a row, with zero counts when it has no papers.
+    """
+    from .models import Journal, JournalStats, Paper
+
+    journals = _normalize(journals)
+    targets = Journal.objects.all()
+    papers = Paper.objects.filter(journal__isnull=False)
+    stats = JournalStats.objects.all()
+    if journals is not None:
+        ids = journals - {None}
+        targets = targets.filter(id__in=ids)
+        papers = papers.filter(journal_id__in=ids)
+        stats = stats.filter(journal_id__in=ids)
+
+    rows = {
+        row['journal_id']: row
+        for row in papers.values('journal_id').annotate(
+            total_papers=Count('id'),
+            transparency_score_sum=Sum('transparency_score'),
+            transparency_processed_count=Count('id', filter=Q(transparency_processed=True)),
+            first_year=Min('pub_year'),
+            last_year=Max('pub_year'),
+            **{column: Count('id', filter=Q(**{field: True})) for column, field in CUBE_COUNTS}
+        ).order_by()
+    }
+
+    objects = []
+    for journal_id in targets.values_list('id', flat=True):
+        row = rows.get(journal_id, {})
+        totals = finalize_cube_row(row)
+        objects.append(JournalStats(
+            journal_id=journal_id,
+            avg_transparency_score=totals['avg_transparency_score'],
+            first_year=row.get('first_year'),
+            last_year=row.get('last_year'),
+            **{name: totals[name] for name in CUBE_SUM_FIELDS}
+        ))
+
+    with transaction.atomic():
+        stats.delete()
+        JournalStats.objects.bulk_create(objects, batch_size=1000)
+
+    return len(objects)
+
+
+def finalize_cube_row(row, prefix=''):
+    """Turn summed cube columns into counts, percentages and the average score"""
+    result = {name: row.get(f'{prefix}{name}') or 0 for name in CUBE_SUM_FIELDS}
+    total = result['total_papers']
+    for column, _ in CUBE_COUNTS:
+        result[column.replace('_count', '_pct')] = _percentage(result[column], total)
+    result['avg_transparency_score'] = (
+        round(result['transparency_score_sum'] / total, 2) if total else 0.0
+    )
+    return result
+
+
+def refresh_rollups(years=None, subjects=None, journals=None, recount=True):
+    """
+    Rebuild every rollup for the touched keys and drop the cached statistics.
+    
+    With ``recount`` the table counts are recounted too; without it they are
+    only dropped with the rest of the cache (a COUNT(*) per table is a full
+    scan, too much for a single-row edit), and counted again on next use.
+    """
+    from .cache_utils import invalidate_stats_cache
+    from .counts import refresh_table_counts
+
+    trend_rows = refresh_trends(years=years, subjects=subjects)
+    journal_rows = refresh_journal_trends(years=years, journals=journals)
+    cube_rows = refresh_cube(years=years, subjects=subjects, journals=journals)
+    stats_rows = refresh_journal_stats(journals=journals)
+    invalidate_stats_cache()
+    if recount:
+        refresh_table_counts()
+    logger.info(
+        f"Refreshed rollups: {trend_rows} field rows, {journal_rows} journal rows, {cube_rows} cube cells, "
+        f"{stats_rows} journal statistics"
+    )
+    return trend_rows, journal_rows, cube_rows, stats_rows
+
+
+class TouchedKeys:
+    """Collects the year/subject/journal keys an import touched so only those rollups are rebuilt"""
+
+    def __init__(self):
+        self.years = set()
+        self.subjects = set()
+        self.journals = set()
+
+    def add(self, paper):
+        self.years.add(paper.pub_year)
+        self.subjects.add(paper.broad_subject_term)
+        self.journals.add(paper.journal_id)
+        # Keys the paper was loaded with, so the rollups it moved out of are rebuilt too
+        loaded = getattr(paper, 'loaded_rollup_keys', None)
+        if loaded:
+            year, subject, journal = loaded
+            self.years.add(year)
+            self.subjects.add(subject)
+            self.journals.add(journal)
+
+    def __bool__(self):
+        return bool(self.years)
+
+    def refresh(self):
+        """Rebuild the rollups for the collected keys"""
+        if not self:
+            return 0, 0, 0, 0
+        return refresh_rollups(years=self.years, subjects=self.subjects, journals=self.journals)
+
+
+# === Readers (all trend charts and APIs go through these) ===
+
+def _sum_trends(rows):
+    return rows.annotate(
+        total=Sum('total_papers'),
+        score_sum=Sum('transparency_score_sum'),
+        **{f'{name}_sum': Sum(name) for name in COUNT_FIELDS}
+    ).order_by()
+
+
+def _row_counts(row):
+    counts = {'total_papers': row['total'] or 0, 'transparency_score_sum': row['score_sum'] or 0}
+    counts.update({name: row[f'{name}_sum'] or 0 for name in COUNT_FIELDS})
+    return counts
+
+
+def yearly_trends(start_year=None, end_year=None, field=None):
+    """
+    Per-year totals, indicator counts/percentages and average score from
+    TransparencyTrend. ``field`` restricts to one ResearchField.
+    """
+    from .models import TransparencyTrend
+
+    trends = TransparencyTrend.objects.all()
+    if field is not None:
+        trends = trends.filter(field=field)
+    if start_year is not None:
+        trends = trends.filter(year__gte=start_year)
+    if end_year is not None:
+        trends = trends.filter(year__lte=end_year)
+
+    results = []
+    for row in _sum_trends(trends.values('year')):
+        results.append({'year': row['year'], **_finalize(_row_counts(row))})
+    return sorted(results, key=lambda item: item['year'])
+
+
+def field_summary(field):
+    """
+    Overall totals, percentages and average score for one ResearchField.
+
+    Read from the StatsCube, which (unlike TransparencyTrend) keeps papers
+    without a publication year.
+    """
+    from .stats import StatsEngine
+
+    totals = StatsEngine(broad_subject_term=field.name).stats()
+    cube_columns = {paper_field: column for column, paper_field in CUBE_COUNTS}
+    counts = {name: totals[name] for name in ('total_papers', 'transparency_score_sum')}
+    counts.update({f'{key}_count': totals[cube_columns[paper_field]] for key, paper_field in TREND_INDICATORS})
+    return _finalize(counts)
+
+
+def journal_yearly_trends(journal):
+    """Per-year totals, percentages and average score for one journal"""
+    from .models import JournalTrend
+
+    return [
+        {'year': trend.year, **_finalize({
+            name: getattr(trend, name)
+            for name in ['total_papers', 'transparency_score_sum'] + COUNT_FIELDS
+        })}
+        for trend in JournalTrend.objects.filter(journal=journal).order_by('year')
+    ]
+
+
+def journal_summary(journal):
+    """Overall totals, indicator counts/percentages, average score and year range for one journal"""
+    from .models import JournalStats
+
+    row = JournalStats.objects.filter(journal=journal).values().first() or {}
+    result = finalize_cube_row(row)
+    result['year_range'] = {'earliest': row.get('first_year'), 'latest': row.get('last_year')}
+    return result
@@ -0,0 +1,233 @@
+"""
+Paper search backends for Open Science Tracker
+
+PaperQuerySet.search() hands the query to the backend for the current
+database engine:
+
+- PostgreSQL: ranked full-text search over the weighted ``search_vector``
+  column (title > authors > journal), kept current by a database trigger
+  and served by a GIN index.
+- SQLite: the ``tracker_paper_fts`` FTS5 index (kept in sync by triggers),
+  ranked with bm25() using the same column weighting. SQLite drops a
+  table's triggers whenever a migration rebuilds it, so ensure_fts_triggers()
+  recreates missing ones after every ``migrate``.
+- Anything else: the original ``icontains`` scan.
+
+Queries that are unambiguously an identifier (PMCID, ``pmid:123``, DOI)
+skip text search and become exact lookups on the indexed identifier
+columns. A bare number ("2020") is searched as text first and only looked
+up as a PMID when the text search finds nothing.
+
+text_search() covers the short name-like columns (journal titles,
+publishers, countries, author strings): substring matching that pg_trgm
+GIN indexes serve on PostgreSQL, plus a typo-tolerant "similar" mode
+ranked by trigram word similarity.
+"""
+
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Lower
+from django.db.models.lookups import Exact
+
+SEARCH_CONFIG = 'english'
+
+PMCID_RE = re.compile(r'^PMC\d+$', re.IGNORECASE)
+PMID_RE = re.compile(r'^\d{1,9}$')
+PMID_PREFIX_RE = re.compile(r'^pmid:\s*(\d{1,9})$', re.IGNORECASE)
+DOI_RE = re.compile(r'^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)?(10\.\d{4,9}/\S+)$', re.IGNORECASE)
+
+
+def pmid_filter(pmid):
+    return Q(pmid=pmid) | Q(epmc_id=pmid)
+
+
+def identifier_filter(query):
+    """Exact-match filter when the query is a PMCID, ``pmid:``-prefixed PMID or DOI, otherwise None"""
+    query = query.strip()
+    if PMCID_RE.match(query):
+        pmcid = query.upper()
+        return Q(pmcid=pmcid) | Q(epmc_id=pmcid)
+    match = PMID_PREFIX_RE.match(query)
+    if match:
+        return pmid_filter(match.group(1))
+    match = DOI_RE.match(query)
+    if match:
+        # Same expression as the tracker_paper_doi_lower_idx index
+        return Q(Exact(Lower('doi'), match.group(1).lower()))
+    return None
+
+
+class LikeSearchBackend:
+    """Substring search across titles, authors, identifiers and journal names"""
+
+    def search(self, queryset, query):
+        identifiers = identifier_filter(query)
+        if identifiers is not None:
+            return queryset.filter(identifiers)
+
+        results = self.text_search(queryset, query)
+        query = query.strip()
+        if PMID_RE.match(query) and not results.exists():
+            return queryset.filter(pmid_filter(query))
+        return results
+
+    def text_search(self, queryset, query):
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(author_string__icontains=query) |
+            Q(journal_title__icontains=query) |
+            Q(pmid__icontains=query) |
+            Q(doi__icontains=query) |
+            Q(journal__title_abbreviation__icontains=query) |
+            Q(journal__title_full__icontains=query)
+        )
+
+
+class PostgresSearchBackend(LikeSearchBackend):
+    """Ranked full-text search on the GIN-indexed ``search_vector`` column"""
+
+    def text_search(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+        return queryset.filter(search_vector=search_query).annotate(
+            search_rank=SearchRank(F('search_vector'), search_query)
+        ).order_by('-search_rank', '-pub_year')
+
+
+class SQLiteSearchBackend(LikeSearchBackend):
+    """bm25-ranked search on the ``tracker_paper_fts`` FTS5 index"""
+
+    # bm25 column weights: title, author_string, journal_title
+    WEIGHTS = (10.0, 5.0, 1.0)
+
+    @staticmethod
+    def match_expression(query):
+        """Quote every word so user input can't inject FTS5 syntax; the last word is a prefix"""
+        words = re.findall(r'\w+', query)
+        if not words:
+            return None
+        terms = [f'"{word}"' for word in words]
+        terms[-1] += '*'
+        return ' '.join(terms)
+
+    def text_search(self, queryset, query):
+        match = self.match_expression(query)
+        if match is None:
+            return super().text_search(queryset, query)
+
+        # bm25() is lower for better matches; the rowid lookup seeks within the match's doclist
+        weights = ', '.join(str(weight) for weight in self.WEIGHTS)
+        table = queryset.model._meta.db_table
+        matches = RawSQL('SELECT rowid FROM tracker_paper_fts WHERE tracker_paper_fts MATCH %s', [match])
+        rank = RawSQL(
+            f'SELECT bm25(tracker_paper_fts, {weights}) FROM tracker_paper_fts '
+            f'WHERE tracker_paper_fts MATCH %s AND rowid = "{table}"."id"',
+            [match],
+        )
+        return queryset.filter(id__in=matches).annotate(search_rank=rank).order_by('search_rank', '-pub_year')
+
+
+FTS_COLUMNS = 'title, author_string, journal_title'
+
+# Same triggers as migration 0013, which creates the index
+FTS_TRIGGERS = {
+    'tracker_paper_fts_insert': f"""
+        CREATE TRIGGER IF NOT EXISTS tracker_paper_fts_insert AFTER INSERT ON tracker_paper BEGIN
+            INSERT INTO tracker_paper_fts(rowid, {FTS_COLUMNS})
+            VALUES (new.id, new.title, new.author_string, new.journal_title);
+        END
+    """,
+    'tracker_paper_fts_delete': f"""
+        CREATE TRIGGER IF NOT EXISTS tracker_paper_fts_delete AFTER DELETE ON tracker_paper BEGIN
+            INSERT INTO tracker_paper_fts(tracker_paper_fts, rowid, {FTS_COLUMNS})
+            VALUES ('delete', old.id, old.title, old.author_string, old.journal_title);
+        END
+    """,
+    'tracker_paper_fts_update': f"""
+        CREATE TRIGGER IF NOT EXISTS tracker_paper_fts_update
+        AFTER UPDATE OF {FTS_COLUMNS} ON tracker_paper BEGIN
+            INSERT INTO tracker_paper_fts(tracker_paper_fts, rowid, {FTS_COLUMNS})
+            VALUES ('delete', old.id, old.title, old.author_string, old.journal_title);
+            INSERT INTO tracker_paper_fts(rowid, {FTS_COLUMNS})
+            VALUES (new.id, new.title, new.author_string, new.journal_title);
+        END
+    """,
+}
+
+
+def ensure_fts_triggers(using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    post_migrate receiver: recreate the FTS5 sync triggers on SQLite.
+
+    Altering tracker_paper on SQLite copies it into a new table and drops the
+    old one, triggers included, so any later migration touching Paper would
+    silently stop indexing new writes. Missing triggers are recreated and the
+    index is rebuilt to pick up rows written while they were gone.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name, type FROM sqlite_master WHERE name LIKE 'tracker_paper_fts%'")
+        present = dict(cursor.fetchall())
+        if present.get('tracker_paper_fts') != 'table':
+            return  # Migrated back past 0013
+        missing = [name for name in FTS_TRIGGERS if name not in present]
+        for name in missing:
+            cursor.execute(FTS_TRIGGERS[name])
+        if missing:
+            cursor.execute("INSERT INTO tracker_paper_fts(tracker_paper_fts) VALUES ('rebuild')")
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+SEARCH_MODES = (
+    ('contains', 'Substring match'),
+    ('similar', 'Typo-tolerant match ranked by similarity'),
+)
+
+
+def text_search(queryset, fields, query, mode='contains', rank_as='similarity'):
+    """
+    Match ``query`` against any of ``fields``.
+
+    ``contains`` is an icontains OR (indexed by pg_trgm on PostgreSQL).
+    ``similar`` keeps rows whose word similarity passes pg_trgm's threshold,
+    annotates the best score as ``rank_as`` and orders by it ahead of the
+    existing ordering. Engines without pg_trgm fall back to ``contains``.
+    """
+    query = (query or '').strip()
+    if not query:
+        return queryset
+
+    if mode == 'similar' and connections[queryset.db].vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramWordSimilarity
+        from django.db.models.functions import Greatest
+
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f'{field}__trigram_word_similar': query})
+        scores = [TrigramWordSimilarity(query, field) for field in fields]
+        similarity = scores[0] if len(scores) == 1 else Greatest(*scores)
+        return queryset.filter(condition).annotate(**{rank_as: similarity}).order_by(
+            f'-{rank_as}', *queryset.query.order_by
+        )
+
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f'{field}__icontains': query})
+    return queryset.filter(condition)
+
+
+def get_search_backend(using='default'):
+    """Search backend for the database engine behind ``using``"""
+    vendor = connections[using].vendor
+    return BACKENDS.get(vendor, LikeSearchBackend)()
@@ -6,14 +6,84 @@ providing clean and consistent data structures for external researchers.
 """
 
 from rest_framework import serializers
-from django.db.models import Count, Avg, Case, When, Value, IntegerField
+from django.db.models import Count
 from .models import Paper, Journal, ResearchField
+from .stats import JOURNAL_STATS, StatsEngine, journal_stats, journal_stats_annotations
+
+
+def model_paths(serializer, prefix=''):
+    """
+    ORM paths (for ``.only()``) of the model columns ``serializer``'s fields
+    read, or None when one of them can't be mapped to columns. Method fields
+    declare theirs in the serializer's ``field_sources``.
+    """
+    model = serializer.Meta.model
+    field_sources = getattr(serializer, 'field_sources', {})
+    paths = {prefix + model._meta.pk.name}
+    for name, field in serializer.fields.items():
+        if isinstance(field, serializers.SerializerMethodField):
+            if name not in field_sources:
+                return None
+            paths.update(prefix + source for source in field_sources[name])
+        elif isinstance(field, serializers.BaseSerializer):
+            if getattr(field, 'many', False) or '.' in field.source:
+                return None
+            nested = model_paths(field, f'{prefix}{field.source}__')
+            if nested is None:
+                return None
+            paths.add(prefix + field.source)
+            paths.update(nested)
+        else:
+            path = field.source.replace('.', '__')
+            try:
+                model._meta.get_field(path.split('__')[0])
+            except Exception:
+                return None  # A property or other non-column source
+            paths.add(prefix + path)
+    return paths
+
+
+def annotated_stats(journal, *names):
+    """
+    JOURNAL_STATS ``names`` of ``journal`` as a dict: its annotations when the
+    queryset added them (see api_views.JournalViewSet), else one query
+    """
+    if all(hasattr(journal, name) for name in names):
+        return {name: getattr(journal, name) for name in names}
+    return Journal.objects.filter(pk=journal.pk).annotate(**journal_stats_annotations(*names)).values(*names).get()
+
+
+class SparseFieldsMixin:
+    """
+    Keeps only the fields named in the ``fields`` context entry (if any) and
+    drops those in ``omit``; see api_views.SparseFieldsetMixin, which fills
+    both from ``?fields=`` / ``?omit=`` and projects the queryset to match.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get('fields')
+        omit = self.context.get('omit')
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in omit or ():
+            self.fields.pop(name, None)
+    
+    def projection(self):
+        """Columns the remaining fields need, or None to load every column"""
+        return model_paths(self)
 
 
 class JournalBasicSerializer(serializers.ModelSerializer):
     """Basic journal information for nested relationships"""
     paper_count = serializers.SerializerMethodField()
     
+    # Model columns read by each method field (see model_paths)
+    field_sources = {'paper_count': []}
+    # Journal statistics annotations read by each method field (see annotated_stats)
+    field_annotations = {'paper_count': ['paper_count']}
+    
     class Meta:
         model = Journal
         fields = [
@@ -30,7 +100,7 @@ class JournalBasicSerializer(serializers.ModelSerializer):
     
     def get_paper_count(self, obj):
         """Get the number of papers in this journal"""
-        return obj.papers.count()
+        return annotated_stats(obj, 'paper_count')['paper_count']
 
 
 class ResearchFieldBasicSerializer(serializers.ModelSerializer):
@@ -46,7 +116,7 @@ class ResearchFieldBasicSerializer(serializers.ModelSerializer):
         ]
 
 
-class PaperSerializer(serializers.ModelSerializer):
+class PaperSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Comprehensive paper serializer with EuropePMC data and transparency indicators
     """
@@ -55,6 +125,14 @@ class PaperSerializer(serializers.ModelSerializer):
     transparency_indicators = serializers.SerializerMethodField()
     identifiers = serializers.SerializerMethodField()
     
+    field_sources = {
+        'transparency_score': ['transparency_score'],
+        'transparency_indicators': [
+            'is_coi_pred', 'is_fund_pred', 'is_register_pred', 'is_open_data', 'is_open_code', 'is_open_access',
+        ],
+        'identifiers': ['pmid', 'pmcid', 'doi', 'epmc_id'],
+    }
+    
     class Meta:
         model = Paper
         fields = [
@@ -135,7 +213,7 @@ class PaperSerializer(serializers.ModelSerializer):
         }
 
 
-class PaperListSerializer(serializers.ModelSerializer):
+class PaperListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Simplified paper serializer for list views (better performance)
     """
@@ -161,7 +239,7 @@ class PaperListSerializer(serializers.ModelSerializer):
         ]
 
 
-class JournalSerializer(serializers.ModelSerializer):
+class JournalSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Comprehensive journal serializer with statistics
     """
@@ -171,6 +249,19 @@ class JournalSerializer(serializers.ModelSerializer):
     recent_papers = serializers.SerializerMethodField()
     subject_areas = serializers.SerializerMethodField()
     
+    field_sources = {
+        'paper_count': [],
+        'avg_transparency_score': [],
+        'transparency_stats': [],
+        'recent_papers': [],
+        'subject_areas': ['broad_subject_terms'],
+    }
+    field_annotations = {
+        'paper_count': ['paper_count'],
+        'avg_transparency_score': ['paper_count', 'transparency_score_sum', 'open_access_count'],
+        'transparency_stats': list(JOURNAL_STATS),
+    }
+    
     class Meta:
         model = Journal
         fields = [
@@ -202,47 +293,32 @@ class JournalSerializer(serializers.ModelSerializer):
     
     def get_paper_count(self, obj):
         """Get total number of papers in this journal"""
-        return obj.papers.count()
+        return annotated_stats(obj, 'paper_count')['paper_count']
     
     def get_avg_transparency_score(self, obj):
-        """Calculate average transparency score for papers in this journal"""
-        papers = obj.papers.all()
-        if not papers:
+        """Average of the five assessed indicators (open access excluded) per paper"""
+        stats = annotated_stats(obj, *self.field_annotations['avg_transparency_score'])
+        if not stats['paper_count']:
             return 0
-        
-        total_score = 0
-        count = 0
-        for paper in papers:
-            score = 0
-            score += 1 if paper.is_open_data else 0
-            score += 1 if paper.is_open_code else 0
-            score += 1 if paper.is_coi_pred else 0
-            score += 1 if paper.is_fund_pred else 0
-            score += 1 if paper.is_register_pred else 0
-            # score += 1 if paper.is_report_pred else 0  # Field doesn't exist
-            # score += 1 if paper.is_share_pred else 0   # Field doesn't exist
-            total_score += score
-            count += 1
-        
-        return round(total_score / count, 2) if count > 0 else 0
+        score = stats['transparency_score_sum'] - stats['open_access_count']
+        return round(score / stats['paper_count'], 2)
     
     def get_transparency_stats(self, obj):
         """Get detailed transparency statistics for this journal"""
-        papers = obj.papers.all()
-        total = papers.count()
+        totals = journal_stats(annotated_stats(obj, *JOURNAL_STATS))
+        total = totals['total_papers']
         
         if total == 0:
             return {}
         
         return {
             'total_papers': total,
-            'open_data_percentage': round((papers.filter(is_open_data=True).count() / total) * 100, 1),
-            'open_code_percentage': round((papers.filter(is_open_code=True).count() / total) * 100, 1),
-            'coi_percentage': round((papers.filter(is_coi_pred=True).count() / total) * 100, 1),
-            'funding_percentage': round((papers.filter(is_fund_pred=True).count() / total) * 100, 1),
-            'registration_percentage': round((papers.filter(is_register_pred=True).count() / total) * 100, 1),
-            # 'reporting_percentage': round((papers.filter(is_report_pred=True).count() / total) * 100, 1),  # Field doesn't exist
-            # 'sharing_percentage': round((papers.filter(is_share_pred=True).count() / total) * 100, 1)      # Field doesn't exist
+            'open_data_percentage': totals['open_data_pct'],
+            'open_code_percentage': totals['open_code_pct'],
+            'coi_percentage': totals['coi_disclosure_pct'],
+            'funding_percentage': totals['funding_pct'],
+            'registration_percentage': totals['registration_pct'],
+            # 'reporting_percentage' and 'sharing_percentage': is_report_pred / is_share_pred don't exist
         }
     
     def get_recent_papers(self, obj):
@@ -257,13 +333,19 @@ class JournalSerializer(serializers.ModelSerializer):
         return []
 
 
-class JournalListSerializer(serializers.ModelSerializer):
+class JournalListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Simplified journal serializer for list views (better performance)
     """
     paper_count = serializers.SerializerMethodField()
     avg_transparency_score = serializers.SerializerMethodField()
     
+    field_sources = {'paper_count': [], 'avg_transparency_score': []}
+    field_annotations = {
+        'paper_count': ['paper_count'],
+        'avg_transparency_score': ['paper_count', 'transparency_score_sum'],
+    }
+    
     class Meta:
         model = Journal
         fields = [
@@ -277,34 +359,25 @@ class JournalListSerializer(serializers.ModelSerializer):
         ]
     
     def get_paper_count(self, obj):
-        return obj.papers.count()
+        return annotated_stats(obj, 'paper_count')['paper_count']
     
     def get_avg_transparency_score(self, obj):
-        """Quick calculation without loading all papers"""
-        papers = obj.papers.all()
-        if not papers.exists():
+        """Average transparency score (0-6) of the journal's papers"""
+        stats = annotated_stats(obj, *self.field_annotations['avg_transparency_score'])
+        if not stats['paper_count']:
             return 0
-        
-        # This is a simplified calculation for list view performance
-        return round(papers.aggregate(
-            score=Avg(
-                Case(When(is_open_data=True, then=Value(1)), default=Value(0), output_field=IntegerField()) +
-                Case(When(is_open_code=True, then=Value(1)), default=Value(0), output_field=IntegerField()) +
-                Case(When(is_coi_pred=True, then=Value(1)), default=Value(0), output_field=IntegerField()) +
-                Case(When(is_fund_pred=True, then=Value(1)), default=Value(0), output_field=IntegerField()) +
-                Case(When(is_register_pred=True, then=Value(1)), default=Value(0), output_field=IntegerField()) +
-                Case(When(is_open_access=True, then=Value(1)), default=Value(0), output_field=IntegerField())
-            )
-        )['score'] or 0, 2)
+        return round(stats['transparency_score_sum'] / stats['paper_count'], 2)
 
 
-class ResearchFieldSerializer(serializers.ModelSerializer):
+class ResearchFieldSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Comprehensive research field serializer with statistics
     """
     transparency_breakdown = serializers.SerializerMethodField()
     top_journals = serializers.SerializerMethodField()
     
+    field_sources = {'transparency_breakdown': ['name'], 'top_journals': ['name']}
+    
     class Meta:
         model = ResearchField
         fields = [
@@ -328,27 +401,15 @@ class ResearchFieldSerializer(serializers.ModelSerializer):
     
     def get_transparency_breakdown(self, obj):
         """Get transparency statistics for this research field"""
-        # Get papers with this broad subject term
-        papers = Paper.objects.filter(broad_subject_term=obj.name)
-        total = papers.count()
-        
-        if total == 0:
-            return {
-                'open_data': 0,
-                'open_code': 0,
-                'conflict_of_interest': 0,
-                'funding_declaration': 0,
-                'registration': 0,
-                'open_access': 0
-            }
+        totals = StatsEngine(broad_subject_term=obj.name).stats()
         
         return {
-            'open_data': papers.filter(is_open_data=True).count(),
-            'open_code': papers.filter(is_open_code=True).count(),
-            'conflict_of_interest': papers.filter(is_coi_pred=True).count(),
-            'funding_declaration': papers.filter(is_fund_pred=True).count(),
-            'registration': papers.filter(is_register_pred=True).count(),
-            'open_access': papers.filter(is_open_access=True).count()
+            'open_data': totals['open_data_count'],
+            'open_code': totals['open_code_count'],
+            'conflict_of_interest': totals['coi_disclosure_count'],
+            'funding_declaration': totals['funding_count'],
+            'registration': totals['registration_count'],
+            'open_access': totals['open_access_count']
         }
     
     def get_top_journals(self, obj):
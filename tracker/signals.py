@@ -0,0 +1,165 @@
+"""
+Model signal handling for Open Science Tracker
+
+Every Paper/Journal/ResearchField write invalidates the cached statistics.
+Bulk writers (importers, admin actions) wrap their loops in ``batched()``:
+inside it the receivers only record what changed, and on exit - after the
+surrounding transaction commits - the caches are invalidated once and the
+rollups are rebuilt for just the touched years, subjects and journals.
+Paper writes outside a batch (admin edits, one-off saves) are collected the
+same way per transaction and flushed when it commits.
+
+bulk_create() and bulk_update() send no model signals; callers report the
+papers they wrote with ``record_papers()``.
+
+``data_changed`` is sent once per batch with those keys, so anything else
+derived from papers can refresh selectively by connecting to it.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .rollups import TouchedKeys
+
+logger = logging.getLogger(__name__)
+
+# Sent once per batch with years, subjects and journals (sets of touched keys)
+data_changed = Signal()
+
+_local = threading.local()
+
+
+class Batch(TouchedKeys):
+    """Keys touched inside a batched() block, plus whether anything else changed"""
+
+    def __init__(self):
+        super().__init__()
+        self.dirty = False
+
+    def changed(self):
+        self.dirty = True
+
+
+class _CommitFlush:
+    """on_commit callback flushing the batch of one transaction's writes outside batched()"""
+
+    def __init__(self):
+        self.batch = Batch()
+        self.flushed = False
+
+    def __call__(self):
+        self.flushed = True
+        flush(self.batch)
+
+
+def current_batch():
+    """The innermost active batch on this thread, or None"""
+    return getattr(_local, 'batch', None)
+
+
+def _transaction_batch(using):
+    """
+    Batch for writes outside batched(): one per transaction, flushed when it
+    commits (and dropped with it on rollback); None in autocommit mode.
+    """
+    connection = connections[using]
+    if not connection.in_atomic_block:
+        return None
+    for callback in connection.run_on_commit:
+        if isinstance(callback[1], _CommitFlush) and not callback[1].flushed:
+            return callback[1].batch
+    callback = _CommitFlush()
+    transaction.on_commit(callback, using=using)
+    return callback.batch
+
+
+def record_papers(papers, using=DEFAULT_DB_ALIAS):
+    """Record written papers for the rollup refresh (for bulk_create()/bulk_update(), which send no signals)"""
+    batch = current_batch()
+    if batch is None:
+        batch = _transaction_batch(using)
+    autocommit = batch is None
+    if autocommit:
+        batch = Batch()
+    for paper in papers:
+        batch.add(paper)
+    if autocommit:
+        flush(batch)
+
+
+@contextmanager
+def batched(refresh_rollups=True):
+    """
+    Collect model-change side effects and fire them once on exit.
+
+    Nested blocks join the outermost batch. With ``refresh_rollups=False``
+    only the caches are invalidated (for writers that refresh rollups
+    themselves).
+    """
+    if current_batch() is not None:
+        yield current_batch()
+        return
+
+    batch = _local.batch = Batch()
+    try:
+        yield batch
+    finally:
+        _local.batch = None
+        # Flush even if the block failed: rows saved before the error are already written
+        transaction.on_commit(lambda: flush(batch, refresh_rollups, recount=True))
+
+
+def flush(batch, refresh_rollups=True, recount=False):
+    """
+    Invalidate caches and refresh rollups for everything ``batch`` touched;
+    ``recount`` also recounts the tables (batched() only - single writes
+    just drop the cached counts).
+    """
+    from .cache_utils import invalidate_stats_cache
+
+    if batch:
+        if refresh_rollups:
+            from .rollups import refresh_rollups as refresh
+            refresh(years=batch.years, subjects=batch.subjects, journals=batch.journals, recount=recount)
+        else:
+            invalidate_stats_cache()
+        logger.info(
+            f"Batch touched {len(batch.years)} years, {len(batch.subjects)} subjects, "
+            f"{len(batch.journals)} journals"
+        )
+        data_changed.send(sender=Batch, years=batch.years, subjects=batch.subjects, journals=batch.journals)
+    elif batch.dirty:
+        invalidate_stats_cache()
+
+
+@receiver([post_save, post_delete], sender='tracker.Paper')
+def invalidate_paper_cache(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs):
+    """Refresh the rollups the paper belongs to and invalidate the caches (once per batch or transaction)"""
+    record_papers([instance], using=using)
+
+
+@receiver([post_save, post_delete], sender='tracker.Journal')
+def invalidate_journal_cache(sender, **kwargs):
+    """Invalidate journal-related caches when journals change"""
+    batch = current_batch()
+    if batch is not None:
+        batch.changed()
+        return
+    from .managers import CacheManager
+    CacheManager.invalidate_journal_caches()
+
+
+@receiver([post_save, post_delete], sender='tracker.ResearchField')
+def invalidate_field_cache(sender, **kwargs):
+    """Invalidate field-related caches when fields change"""
+    batch = current_batch()
+    if batch is not None:
+        batch.changed()
+        return
+    from .cache_utils import invalidate_stats_cache
+    invalidate_stats_cache()
@@ -0,0 +1,204 @@
+"""
+Full-dataset snapshots for Open Science Tracker
+
+Mirroring the dataset through /api/v1/papers/ or the export view means a
+full table scan per consumer. Instead, build_snapshot() writes the whole
+dataset once per import as static files, split per publication year, in
+gzipped CSV and Parquet (see tracker.exporters):
+
+    <OST_SNAPSHOT_ROOT>/
+        latest.json                     manifest of the newest version
+        20250701-020000/
+            manifest.json               files, row counts, sizes, sha256
+            papers_2024.csv.gz
+            papers_2024.parquet
+            papers_unknown.csv.gz       papers without a publication year
+            ...
+
+All files are read in one transaction (REPEATABLE READ on PostgreSQL), so
+every format and year holds the same dataset, and the row counts in the
+manifest are counted as the rows are written. Without pyarrow the Parquet
+files are skipped and the CSV files are still written.
+
+Versions are built in a temporary directory and renamed into place, so a
+download never sees a half-written snapshot; the oldest versions beyond
+OST_SNAPSHOT_KEEP are deleted before latest.json is replaced. The files are
+served under OST_SNAPSHOT_URL by SnapshotFilesMiddleware (WhiteNoise, with
+Range requests, re-indexed when latest.json changes) or directly by nginx -
+either way without touching Django's views or the database.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from .exporters import EXPORTERS, ExportError, gzip_stream
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMATS = ('csv', 'parquet')
+MANIFEST_NAME = 'manifest.json'
+LATEST_NAME = 'latest.json'
+
+
+def snapshot_root():
+    return Path(settings.OST_SNAPSHOT_ROOT)
+
+
+def _write(path, chunks):
+    """Write byte ``chunks`` to ``path``; returns (bytes, sha256 hex digest)"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'wb') as output:
+        for chunk in chunks:
+            output.write(chunk)
+            digest.update(chunk)
+            size += len(chunk)
+    return size, digest.hexdigest()
+
+
+def _write_json(path, data):
+    """Atomically replace ``path`` with ``data`` as JSON"""
+    tmp = path.with_name(f'.{path.name}.tmp')
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, path)
+
+
+class _CountedRows:
+    """Exporter row source that counts the rows it hands out"""
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+        self.rows = 0
+
+    def iterator(self, chunk_size):
+        for row in self.queryset.iterator(chunk_size=chunk_size):
+            self.rows += 1
+            yield row
+
+
+@contextmanager
+def _consistent_read(using=DEFAULT_DB_ALIAS):
+    """One transaction for the whole snapshot; REPEATABLE READ on PostgreSQL"""
+    connection = connections[using]
+    outermost = not connection.in_atomic_block
+    with transaction.atomic(using=using):
+        if outermost and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+        yield
+
+
+def build_snapshot(root=None, formats=SNAPSHOT_FORMATS, keep=None):
+    """
+    Write a new snapshot version and point latest.json at it; returns the
+    manifest dict.
+    """
+    from .cache_utils import get_generation
+    from .models import Paper
+
+    root = Path(root) if root else snapshot_root()
+    keep = keep if keep is not None else getattr(settings, 'OST_SNAPSHOT_KEEP', 3)
+    started = time.monotonic()
+
+    skipped = [extension for extension in formats if not EXPORTERS[extension].available()]
+    if skipped:
+        logger.warning(f"Snapshot skips {', '.join(skipped)}: pyarrow is not installed")
+    formats = [extension for extension in formats if extension not in skipped]
+    if not formats:
+        raise ExportError("None of the requested snapshot formats can be written")
+
+    version = timezone.now().strftime('%Y%m%d-%H%M%S')
+    root.mkdir(parents=True, exist_ok=True)
+    building = root / f'.{version}.building'
+    shutil.rmtree(building, ignore_errors=True)
+    building.mkdir()
+
+    try:
+        files = []
+        with _consistent_read():
+            generation = get_generation()
+            years = Paper.objects.order_by().values_list('pub_year', flat=True).distinct()
+            for year in sorted(years, key=lambda year: (year is None, year)):
+                papers = Paper.objects.filter(pub_year=year) if year is not None else Paper.objects.filter(pub_year__isnull=True)
+                for extension in formats:
+                    exporter = EXPORTERS[extension]()
+                    rows = _CountedRows(papers.order_by().values_list(*exporter.columns))
+                    chunks = exporter.stream(rows)
+                    name = f"papers_{year if year is not None else 'unknown'}.{exporter.extension}"
+                    if exporter.compressible:
+                        chunks = gzip_stream(chunks)
+                        name += '.gz'
+                    size, sha256 = _write(building / name, chunks)
+                    files.append({
+                        'path': f'{version}/{name}',
+                        'format': extension,
+                        'year': year,
+                        'rows': rows.rows,
+                        'bytes': size,
+                        'sha256': sha256,
+                    })
+
+        manifest = {
+            'version': version,
+            'created_at': timezone.now().isoformat(),
+            'dataset_generation': generation,
+            'total_rows': sum(file['rows'] for file in files if file['format'] == formats[0]),
+            'formats': formats,
+            'files': files,
+        }
+        _write_json(building / MANIFEST_NAME, manifest)
+        os.replace(building, root / version)
+    except BaseException:
+        shutil.rmtree(building, ignore_errors=True)
+        raise
+
+    # Prune first: a new latest.json tells the file server the set of versions is final
+    prune_snapshots(root, keep)
+    _write_json(root / LATEST_NAME, {**manifest, 'manifest': f'{version}/{MANIFEST_NAME}'})
+
+    logger.info(
+        f"Snapshot {version}: {manifest['total_rows']} papers in {len(files)} files "
+        f"({time.monotonic() - started:.1f}s)"
+    )
+    return manifest
+
+
+def list_snapshots(root=None):
+    """Published versions, oldest first"""
+    root = Path(root) if root else snapshot_root()
+    if not root.exists():
+        return []
+    return sorted(
+        entry.name for entry in root.iterdir()
+        if entry.is_dir() and not entry.name.startswith('.') and (entry / MANIFEST_NAME).exists()
+    )
+
+
+def prune_snapshots(root=None, keep=3):
+    """Delete all but the newest ``keep`` versions; returns the deleted names"""
+    root = Path(root) if root else snapshot_root()
+    versions = list_snapshots(root)
+    expired = versions[:-keep] if keep > 0 else []
+    for version in expired:
+        shutil.rmtree(root / version, ignore_errors=True)
+    return expired
+
+
+def snapshot_after_import(**options):
+    """build_snapshot() for import commands: logs instead of raising"""
+    try:
+        return build_snapshot(**options)
+    except Exception as e:
+        # A failed snapshot must never fail the import that triggered it
+        logger.error(f"Snapshot build failed: {e}")
+        return None
@@ -0,0 +1,176 @@
+"""
+Paper statistics engine for Open Science Tracker
+
+StatsEngine answers the same question for every page and API: how many
+papers match, how many carry each transparency indicator (and what share),
+the average score, score distribution and publication year range.
+
+Filter specs the StatsCube can answer (year / subject / journal / source)
+are rolled up from the cube; anything else is a single conditional
+aggregate over the paper table. Results are cached under a hash of the
+normalized filters in the current dataset generation, so
+invalidate_stats_cache() drops them all.
+"""
+
+from django.db.models import Count, F, Max, Min, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .cache_utils import get_or_compute, make_cache_key
+from .indicators import INDICATORS
+from .managers import StatsCubeQuerySet
+from .rollups import CUBE_COUNTS, finalize_cube_row
+
+STATS_CACHE_PREFIX = 'paper_stats'
+STATS_CACHE_TIMEOUT = 900  # 15 minutes
+
+# Lookups the StatsCube can answer: cube dimension + optional operator
+CUBE_FIELDS = {'pub_year', 'broad_subject_term', 'journal', 'journal_id', 'source'}
+CUBE_OPERATORS = {'exact', 'in', 'gt', 'gte', 'lt', 'lte', 'isnull'}
+
+MAX_SCORE = len(INDICATORS)
+
+
+def _normalize_value(value):
+    """Model instances become their pk, collections become sorted lists"""
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sorted((_normalize_value(item) for item in value), key=str)
+    return getattr(value, 'pk', value)
+
+
+def is_cube_lookup(lookup):
+    field, _, operator = lookup.partition('__')
+    return field in CUBE_FIELDS and (not operator or operator in CUBE_OPERATORS)
+
+
+class StatsEngine:
+    """
+    Transparency statistics for a Paper queryset and/or filter spec.
+
+    Usage:
+        StatsEngine(pub_year__gte=2000).stats()
+        StatsEngine(filtered_queryset).stats(distribution=True)
+        StatsEngine(broad_subject_term='Medicine').rollup('pub_year')
+    """
+
+    def __init__(self, queryset=None, **filters):
+        self.queryset = queryset
+        self.filters = {lookup: _normalize_value(value) for lookup, value in filters.items()}
+
+    @property
+    def uses_cube(self):
+        """True when the StatsCube alone can answer these filters"""
+        return self.queryset is None and all(is_cube_lookup(lookup) for lookup in self.filters)
+
+    def papers(self):
+        from .models import Paper
+        queryset = Paper.objects.all() if self.queryset is None else self.queryset
+        return queryset.filter(**self.filters).order_by()
+
+    def cells(self):
+        from .models import StatsCube
+        return StatsCube.objects.filter(**self.filters)
+
+    def cache_key(self, *parts):
+        """Key built from the normalized filters (or the compiled SQL of a custom queryset)"""
+        spec = sorted(self.filters.items())
+        if self.queryset is not None:
+            sql, params = self.papers().query.sql_with_params()
+            spec = [sql, [str(param) for param in params]]
+        return f"{STATS_CACHE_PREFIX}_{make_cache_key(spec, *parts)}"
+
+    def _cached(self, key, compute):
+        return get_or_compute(key, compute, STATS_CACHE_TIMEOUT, local=True)
+
+    def stats(self, distribution=False):
+        """
+        Totals, per-indicator ``<key>_count`` / ``<key>_pct``, average score and
+        ``year_range``; with ``distribution=True`` also ``score_distribution``
+        (papers per transparency score, always from the paper table).
+        """
+        use_cube = self.uses_cube and not distribution
+        return self._cached(
+            self.cache_key('stats', distribution),
+            self._cube_stats if use_cube else lambda: self._paper_stats(distribution)
+        )
+
+    def _cube_stats(self):
+        return self.cells().totals()
+
+    def _paper_stats(self, distribution):
+        aggregates = {
+            'total_papers': Count('id'),
+            'transparency_score_sum': Sum('transparency_score'),
+            'transparency_processed_count': Count('id', filter=Q(transparency_processed=True)),
+            'earliest_year': Min('pub_year'),
+            'latest_year': Max('pub_year'),
+        }
+        aggregates.update({column: Count('id', filter=Q(**{field: True})) for column, field in CUBE_COUNTS})
+        if distribution:
+            aggregates.update({
+                f'score_{score}': Count('id', filter=Q(transparency_score=score))
+                for score in range(MAX_SCORE + 1)
+            })
+
+        row = self.papers().aggregate(**aggregates)
+        result = finalize_cube_row(row)
+        result['year_range'] = {'earliest': row['earliest_year'], 'latest': row['latest_year']}
+        if distribution:
+            result['score_distribution'] = {score: row[f'score_{score}'] for score in range(MAX_SCORE + 1)}
+        return result
+
+    def rollup(self, *dimensions):
+        """Per-group statistics for any subset of the cube dimensions"""
+        if self.uses_cube:
+            compute = lambda: self.cells().rollup(*dimensions)
+        else:
+            unknown = set(dimensions) - set(StatsCubeQuerySet.DIMENSIONS)
+            if unknown:
+                raise ValueError(f"Unknown cube dimensions: {', '.join(sorted(unknown))}")
+            compute = lambda: self._paper_rollup(dimensions)
+        return self._cached(self.cache_key('rollup', *dimensions), compute)
+
+    def _paper_rollup(self, dimensions):
+        rows = self.papers().values(*dimensions).annotate(
+            total_papers=Count('id'),
+            transparency_score_sum=Sum('transparency_score'),
+            transparency_processed_count=Count('id', filter=Q(transparency_processed=True)),
+            **{column: Count('id', filter=Q(**{field: True})) for column, field in CUBE_COUNTS}
+        ).order_by(*dimensions)
+        return [
+            {**{dim: row[dim] for dim in dimensions}, **finalize_cube_row(row)}
+            for row in rows
+        ]
+
+
+def paper_stats(queryset=None, distribution=False, **filters):
+    """Shortcut for StatsEngine(queryset, **filters).stats()"""
+    return StatsEngine(queryset, **filters).stats(distribution=distribution)
+
+
+# Per-journal annotations: name -> JournalStats column
+JOURNAL_STATS = {
+    'paper_count': 'total_papers',
+    'transparency_score_sum': 'transparency_score_sum',
+    'transparency_processed_count': 'transparency_processed_count',
+    **{column: column for column, _ in CUBE_COUNTS},
+}
+
+
+def journal_stats_annotations(*names):
+    """
+    Annotations (all of JOURNAL_STATS, or ``names``) for a Journal queryset,
+    read from its JournalStats row through one LEFT JOIN (0 without a row).
+    A list page costs the same whatever its size, and the pagination COUNT
+    drops them.
+    """
+    return {
+        name: Coalesce(F(f'stats__{JOURNAL_STATS[name]}'), Value(0))
+        for name in names or JOURNAL_STATS
+    }
+
+
+def journal_stats(values):
+    """StatsEngine-style totals (counts, percentages, average score) from JOURNAL_STATS ``values``"""
+    row = {name: values.get(name) or 0 for name in JOURNAL_STATS}
+    row['total_papers'] = row.pop('paper_count')
+    return finalize_cube_row(row)
@@ -23,4 +23,16 @@ def truncate_authors(value, length=80):
     
     if len(safe_value) > length:
         return safe_value[:length] + '...'
-    return safe_value 
\ No newline at end of file
+    return safe_value
+
+@register.filter
+def result_count(value):
+    """Format a row count, marking planner estimates as '~N'"""
+    if value is None or value == '':
+        return ''
+    if hasattr(value, 'display'):
+        return value.display()
+    try:
+        return f'{int(value):,}'
+    except (TypeError, ValueError):
+        return value
@@ -1,3 +1,1329 @@
-from django.test import TestCase
+import csv
+import datetime
+import gzip
+import hashlib
+import io
+import json
+import shutil
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, connections
+from django.http import QueryDict
+from django.core.exceptions import ImproperlyConfigured
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.cache import get_cache_key
+from rest_framework.renderers import JSONRenderer
+
+from .cache_utils import (
+    GENERATION_KEY, GenerationCache, LocalCache, bump_generation, dataset_cache, get_generation, get_or_compute,
+    invalidate_stats_cache, local_cache,
+)
+from .counts import (
+    EstimatedCountPaginator, RowCount, estimate_count, exact_count, fast_count, refresh_table_counts, table_count,
+)
+from .exporters import EXPORT_FIELDS, EXPORTERS
+from .fastpath import RowSerializer
+from .indicators import ALL_INDICATORS_MASK, INDICATOR_BITS, compute_indicator_mask, summarize_mask_counts
+from .lookup import resolve_identifiers
+from .models import Journal, JournalStats, Paper, ResearchField, StatsCube, TransparencyTrend
+from .pagination import InvalidCursor, KeysetPaginator, KeysetUnsupported, PaperPagination
+from .renderers import ORJSONRenderer
+from .results import ResultCachePaginator, result_cache_key
+from .rollups import (
+    field_summary, journal_yearly_trends, refresh_journal_stats, refresh_rollups, refresh_trends, yearly_trends,
+)
+from .search import ensure_fts_triggers, text_search
+from .serializers import JournalListSerializer, PaperListSerializer, PaperSerializer
+from .signals import _CommitFlush, batched
+from .snapshots import build_snapshot, list_snapshots
+from .stats import StatsEngine, paper_stats
+from .views import ResearchFieldDetailView
+from .warming import WarmingPlanner, warm_origin
+
+
+class FastPathContractTests(TestCase):
+    """The serializer-free list path must produce exactly the serializer's output"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.journal = Journal.objects.create(
+            title_abbreviation='J Dent Rés', title_full='Journal of Dental Résearch',
+            broad_subject_terms='Dentistry', publisher='Pub', country='US',
+        )
+        for i in range(12):
+            Paper.objects.create(
+                epmc_id=f'PMC{i}', pmid=str(1000 + i) if i % 4 else None, doi=f'10.1000/x{i}',
+                title=f'Étude {i} \u2028 "quoted" \t tab', author_string='Smith J',
+                journal_title='Journal', pub_year=2018 + i % 3 if i % 5 else None,
+                journal=cls.journal if i % 3 else None,
+                broad_subject_term='Dentistry', is_open_data=i % 2 == 0, is_coi_pred=i % 3 == 0,
+                is_open_access=True,
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def serializer_rows(self, queryset, **context):
+        serializer = PaperListSerializer(queryset, many=True, context=context)
+        return JSONRenderer().render(serializer.data)
+
+    def fast_rows(self, queryset, **context):
+        rows = RowSerializer.compile(PaperListSerializer(context=context))
+        return ORJSONRenderer().render(rows.to_representation(rows.values(queryset)))
+
+    def test_list_serializer_compiles(self):
+        self.assertIsNotNone(RowSerializer.compile(PaperListSerializer()))
+
+    def test_method_fields_fall_back(self):
+        self.assertIsNone(RowSerializer.compile(PaperSerializer()))
+        self.assertIsNone(RowSerializer.compile(JournalListSerializer()))
+
+    def test_rows_match_serializer(self):
+        papers = Paper.objects.order_by('id')
+        self.assertEqual(self.fast_rows(papers), self.serializer_rows(papers))
+
+    def test_sparse_rows_match_serializer(self):
+        papers = Paper.objects.order_by('id')
+        for context in ({'fields': ['pmid', 'journal_name']}, {'omit': ['title', 'doi']}):
+            self.assertEqual(self.fast_rows(papers, **context), self.serializer_rows(papers, **context))
+
+    def test_list_endpoint_matches_serializer(self):
+        for query in ('', '?pub_year=2019', '?ordering=pmid', '?fields=epmc_id,journal_name'):
+            response = self.client.get(f'/api/v1/papers/{query}')
+            self.assertEqual(response.status_code, 200)
+            view = response.renderer_context['view']
+            papers = view.filter_queryset(Paper.objects.select_related('journal'))[:50]
+            expected = dict(response.data, results=PaperListSerializer(
+                papers, many=True, context=view.get_serializer_context()
+            ).data)
+            self.assertEqual(response.content, JSONRenderer().render(expected), query)
+
+    def test_cursor_pages_from_rows(self):
+        response = self.client.get('/api/v1/papers/?cursor=&page_size=5')
+        seen = [row['epmc_id'] for row in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            seen += [row['epmc_id'] for row in response.data['results']]
+        self.assertEqual(sorted(seen), sorted(Paper.objects.values_list('epmc_id', flat=True)))
+
+    def test_journal_papers_match_serializer(self):
+        response = self.client.get(f'/api/v1/journals/{self.journal.pk}/papers/')
+        expected = PaperListSerializer(self.journal.papers.all(), many=True).data
+        self.assertEqual(response.content, JSONRenderer().render(dict(response.data, results=expected)))
+
+
+class IndicatorMaskTests(TestCase):
+    """indicator_mask filters and counts agree with the six indicator booleans"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for mask in range(ALL_INDICATORS_MASK + 1):
+            Paper.objects.create(
+                epmc_id=f'PMC{mask}', title='T', journal_title='J',
+                **{field: bool(mask & bit) for field, bit in INDICATOR_BITS.items()},
+            )
+
+    def matching(self, predicate):
+        return {paper.epmc_id for paper in Paper.objects.all() if predicate(paper)}
+
+    def test_mask_follows_booleans(self):
+        for paper in Paper.objects.all():
+            self.assertEqual(paper.indicator_mask, compute_indicator_mask(paper))
+        paper = Paper.objects.get(epmc_id='PMC0')
+        paper.is_open_code = True
+        paper.save()
+        paper.refresh_from_db()
+        self.assertEqual(paper.indicator_mask, INDICATOR_BITS['is_open_code'])
+
+    def test_all_and_any(self):
+        data_and_code = self.matching(lambda paper: paper.is_open_data and paper.is_open_code)
+        data_or_code = self.matching(lambda paper: paper.is_open_data or paper.is_open_code)
+        for names in (['open_data', 'open_code'], ['data_sharing', ' Code_Sharing ', 'bogus']):
+            self.assertEqual(set(Paper.objects.with_indicators(names).values_list('epmc_id', flat=True)), data_and_code)
+            self.assertEqual(
+                set(Paper.objects.with_indicators(names, match='any').values_list('epmc_id', flat=True)), data_or_code
+            )
+        self.assertEqual(Paper.objects.with_indicators(['bogus']).count(), ALL_INDICATORS_MASK + 1)
+
+    def test_api_filters(self):
+        expected = self.matching(lambda paper: paper.is_coi_pred and paper.is_register_pred and paper.is_open_access)
+        response = self.client.get('/api/v1/papers/?indicators_all=coi,registration,open_access&page_size=100')
+        self.assertEqual({row['epmc_id'] for row in response.data['results']}, expected)
+        response = self.client.get('/api/v1/papers/?indicators_any=funding&page_size=100')
+        self.assertEqual(response.data['count'], 32)
+
+    def test_combination_counts(self):
+        Paper.objects.create(epmc_id='PMC-extra', title='T', journal_title='J', is_open_data=True)
+        counts = Paper.objects.indicator_combination_counts()
+        self.assertEqual(counts[INDICATOR_BITS['is_open_data']], 2)
+        summary = summarize_mask_counts(counts)
+        self.assertEqual(summary['total'], 65)
+        self.assertEqual(summary['indicator_counts']['is_open_data'], 33)
+        self.assertEqual(summary['score_distribution'], {0: 1, 1: 7, 2: 15, 3: 20, 4: 15, 5: 6, 6: 1})
+
+
+class GeneratedScoreTests(TestCase):
+    """Transparency scores are generated by the database on every write path"""
+
+    def test_insert_returns_scores(self):
+        paper = Paper.objects.create(epmc_id='PMC1', title='T', journal_title='J', is_open_data=True, is_coi_pred=True)
+        self.assertEqual((paper.transparency_score, paper.transparency_score_pct), (2, 33.3))
+
+    def test_save_reloads_scores(self):
+        paper = Paper.objects.create(epmc_id='PMC1', title='T', journal_title='J', is_open_data=True)
+        paper.is_open_code = paper.is_fund_pred = True
+        paper.save()
+        self.assertEqual((paper.transparency_score, paper.transparency_score_pct), (3, 50.0))
+
+    def test_bulk_writes_keep_scores(self):
+        Paper.objects.bulk_create([
+            Paper(epmc_id=f'PMC{i}', title='T', journal_title='J', is_open_access=True, is_open_data=i % 2 == 0)
+            for i in range(4)
+        ])
+        self.assertEqual(sorted(Paper.objects.values_list('transparency_score', flat=True)), [1, 1, 2, 2])
+        Paper.objects.update(is_register_pred=True)
+        self.assertEqual(sorted(Paper.objects.values_list('transparency_score_pct', flat=True)), [33.3, 33.3, 50.0, 50.0])
+
+    def test_api_score_filters(self):
+        for score in range(7):
+            Paper.objects.create(
+                epmc_id=f'PMC{score}', title='T', journal_title='J',
+                **{field: index < score for index, field in enumerate(INDICATOR_BITS)},
+            )
+        response = self.client.get('/api/v1/papers/?transparency_score__gte=2&transparency_score__lte=4')
+        self.assertEqual(sorted(row['transparency_score'] for row in response.data['results']), [2, 3, 4])
+
+    def test_admin_action_only_refreshes_rollups(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.org', 'pw')
+        self.client.force_login(admin)
+        Paper.objects.bulk_create([Paper(epmc_id=f'PMC{i}', title='T', journal_title='J', pub_year=2022) for i in range(3)])
+        self.assertFalse(StatsCube.objects.filter(pub_year=2022).exists())
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/admin/tracker/paper/', {
+                'action': 'refresh_paper_rollups', '_selected_action': list(Paper.objects.values_list('pk', flat=True)),
+            }, follow=True)
+        self.assertContains(response, 'Refreshed rollups for 3 papers.')
+        self.assertFalse([query for query in queries if query['sql'].startswith('UPDATE "tracker_paper"')])
+        self.assertEqual(sum(StatsCube.objects.filter(pub_year=2022).values_list('total_papers', flat=True)), 3)
+
+
+class TrendRollupTests(TestCase):
+    """TransparencyTrend and JournalTrend rollups answer what aggregating the papers would"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.medicine = ResearchField.objects.create(name='Medicine')
+        cls.journal = Journal.objects.create(title_abbreviation='J', title_full='Journal', broad_subject_terms='Medicine')
+        for i in range(20):
+            Paper.objects.create(
+                epmc_id=f'PMC{i}', title='T', journal_title='J', journal=cls.journal if i % 2 else None,
+                pub_year=2019 + i % 2, first_publication_date=datetime.date(2019 + i % 2, 1 + i % 3, 1),
+                broad_subject_term=['Medicine', 'Unlisted', None][i % 3],
+                is_open_data=i % 4 == 0, is_open_access=i % 5 != 0, is_coi_pred=True,
+            )
+        refresh_rollups()
+
+    def expected(self, papers):
+        papers = list(papers)
+        return (
+            len(papers),
+            round(sum(paper.is_open_data for paper in papers) * 100.0 / len(papers), 1),
+            round(sum(paper.transparency_score for paper in papers) / len(papers), 2),
+        )
+
+    def summary(self, row):
+        return row['total_papers'], row['data_sharing_pct'], row['avg_transparency_score']
+
+    def test_yearly_trends(self):
+        trends = yearly_trends()
+        self.assertEqual([row['year'] for row in trends], [2019, 2020])
+        for row in trends:
+            self.assertEqual(self.summary(row), self.expected(Paper.objects.filter(pub_year=row['year'])))
+        self.assertEqual([row['year'] for row in yearly_trends(start_year=2020)], [2020])
+
+    def test_field_trends(self):
+        Paper.objects.create(epmc_id='PMC-undated', title='T', journal_title='J', broad_subject_term='Medicine', is_open_data=True)
+        refresh_rollups()
+        local_cache.clear()
+        for row in yearly_trends(field=self.medicine):
+            papers = Paper.objects.filter(pub_year=row['year'], broad_subject_term='Medicine')
+            self.assertEqual(self.summary(row), self.expected(papers))
+        papers = Paper.objects.filter(broad_subject_term='Medicine')
+        self.assertEqual(self.summary(field_summary(self.medicine)), self.expected(papers))
+        self.assertEqual(field_summary(self.medicine)['total_papers'], 8)  # Including the undated paper
+        view = ResearchFieldDetailView(object=self.medicine, kwargs={'pk': self.medicine.pk})
+        view.setup(RequestFactory().get(f'/fields/{self.medicine.pk}/'), pk=self.medicine.pk)
+        self.assertEqual(view.get_context_data()['transparency_stats']['total_papers'], 8)
+        self.assertEqual(sum(TransparencyTrend.objects.filter(field=None).values_list('total_papers', flat=True)), 13)
+
+    def test_journal_trends(self):
+        trends = journal_yearly_trends(self.journal)
+        self.assertEqual([row['year'] for row in trends], [2020])
+        self.assertEqual(self.summary(trends[0]), self.expected(self.journal.papers.all()))
+
+    def test_refresh_touches_only_given_keys(self):
+        untouched = set(TransparencyTrend.objects.filter(year=2019).values_list('id', flat=True))
+        Paper.objects.create(
+            epmc_id='PMC-new', title='T', journal_title='J', pub_year=2020, broad_subject_term='Medicine',
+            first_publication_date=datetime.date(2020, 6, 1), is_open_data=True,
+        )
+        refresh_trends(years=[2020], subjects=['Medicine'])
+        self.assertEqual(set(TransparencyTrend.objects.filter(year=2019).values_list('id', flat=True)), untouched)
+        [row] = [row for row in yearly_trends(field=self.medicine) if row['year'] == 2020]
+        papers = Paper.objects.filter(pub_year=2020, broad_subject_term='Medicine')
+        self.assertEqual(self.summary(row), self.expected(papers))
+
+
+class StatsEngineTests(TestCase):
+    """Paper statistics come from one aggregate (or the cube) and agree either way"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(24):
+            Paper.objects.create(
+                epmc_id=f'PMC{i}', title='T', journal_title='J', pub_year=2018 + i % 3,
+                broad_subject_term=['Medicine', 'Dentistry'][i % 2],
+                is_open_data=i % 3 == 0, is_fund_pred=i % 4 == 0, is_open_access=True, transparency_processed=i % 2 == 0,
+            )
+        refresh_rollups()
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+
+    def paper_queries(self, compute):
+        with CaptureQueriesContext(connection) as queries:
+            result = compute()
+        return result, [query['sql'] for query in queries if 'tracker_' in query['sql']]
+
+    def test_cube_and_paper_paths_agree(self):
+        for filters in ({}, {'pub_year': 2019}, {'pub_year__gte': 2019, 'broad_subject_term': 'Medicine'}):
+            engine = StatsEngine(**filters)
+            self.assertTrue(engine.uses_cube)
+            self.assertEqual(engine.stats(), StatsEngine(Paper.objects.filter(**filters)).stats(), filters)
+            self.assertEqual(engine.rollup('pub_year'), StatsEngine(Paper.objects.filter(**filters)).rollup('pub_year'))
+
+    def test_paper_stats_are_one_query(self):
+        stats, queries = self.paper_queries(lambda: StatsEngine(is_fund_pred=True).stats(distribution=True))
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(stats['total_papers'], 6)
+        self.assertEqual((stats['funding_count'], stats['funding_pct'], stats['open_data_pct']), (6, 100.0, 33.3))
+        self.assertEqual(sum(stats['score_distribution'].values()), 6)
+        self.assertEqual(stats['year_range'], {'earliest': 2018, 'latest': 2020})
+
+        _, queries = self.paper_queries(lambda: StatsEngine(pub_year=2018).stats())
+        self.assertFalse(any('tracker_paper' in query for query in queries))
+
+    def test_results_are_cached_per_generation(self):
+        paper_stats(pub_year=2020)
+        stats, queries = self.paper_queries(lambda: paper_stats(pub_year=2020))
+        self.assertEqual((stats['total_papers'], queries), (8, []))
+        bump_generation()
+        _, queries = self.paper_queries(lambda: paper_stats(pub_year=2020))
+        self.assertTrue(queries)
+
+    def test_unknown_dimension(self):
+        with self.assertRaises(ValueError):
+            StatsEngine(is_open_data=True).rollup('title')
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor pages visit every row exactly once, in order, whatever happens before the cursor"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(23):
+            Paper.objects.create(epmc_id=f'PMC{i:02}', title='T', journal_title='J', pub_year=2015 + i % 4 if i % 5 else None)
+
+    def expected(self, descending):
+        papers = list(Paper.objects.all())
+        dated = sorted((paper for paper in papers if paper.pub_year), key=lambda paper: (paper.pub_year, paper.pk), reverse=descending)
+        undated = sorted((paper for paper in papers if not paper.pub_year), key=lambda paper: paper.pk, reverse=descending)
+        return dated + undated
+
+    def walk(self, paginator):
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        return pages
+
+    def test_walks_every_row_once(self):
+        for ordering, descending in ((('-pub_year', '-id'), True), (('pub_year',), False)):
+            pages = self.walk(KeysetPaginator(Paper.objects.order_by(*ordering), 4))
+            self.assertEqual([paper for page in pages for paper in page], self.expected(descending), ordering)
+            self.assertEqual([len(page) for page in pages], [4] * 5 + [3])
+            self.assertFalse(pages[0].has_previous())
+
+    def test_previous_cursors_walk_back(self):
+        paginator = KeysetPaginator(Paper.objects.order_by('-pub_year', '-id'), 4)
+        pages = self.walk(paginator)
+        for index in range(len(pages) - 1, 0, -1):
+            previous = paginator.page(pages[index].previous_cursor)
+            self.assertEqual(list(previous), list(pages[index - 1]))
+
+    def test_inserts_before_the_cursor_do_not_shift_pages(self):
+        paginator = KeysetPaginator(Paper.objects.order_by('-pub_year', '-id'), 4)
+        first = paginator.page()
+        expected = list(paginator.page(first.next_cursor))
+        Paper.objects.create(epmc_id='PMC-new', title='T', journal_title='J', pub_year=2030)
+        self.assertEqual(list(paginator.page(first.next_cursor)), expected)
+
+    def test_rejects_foreign_and_tampered_cursors(self):
+        cursor = KeysetPaginator(Paper.objects.order_by('-pub_year', '-id'), 4).page().next_cursor
+        with self.assertRaises(InvalidCursor):
+            KeysetPaginator(Paper.objects.order_by('pub_year', 'id'), 4).page(cursor)
+        with self.assertRaises(InvalidCursor):
+            KeysetPaginator(Paper.objects.order_by('-pub_year', '-id'), 4).page(cursor[:-2] + 'xx')
+        self.assertEqual(self.client.get('/api/v1/papers/?cursor=bogus').status_code, 404)
+
+    def test_unsupported_orderings(self):
+        for ordering in (('pub_year', 'title'), ('journal',), ('pub_year', 'title', 'id')):
+            with self.assertRaises(KeysetUnsupported, msg=ordering):
+                KeysetPaginator(Paper.objects.order_by(*ordering), 4)
+
+    def test_api_cursor_links_and_count(self):
+        response = self.client.get('/api/v1/papers/?cursor=&page_size=10&count=true')
+        self.assertEqual((response.data['count'], response.data['previous']), (23, None))
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.data['count'], 23)
+        self.assertIn('cursor=', response.data['previous'])
+        self.assertNotIn('count', self.client.get('/api/v1/papers/?cursor=').data)
+
+
+class RowCountTests(TestCase):
+    """Counts are cached exact numbers, or flagged planner estimates where COUNT(*) would scan"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(12):
+            Paper.objects.create(epmc_id=f'PMC{i}', title='T', journal_title='J', pub_year=2020 + i % 2)
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+
+    def count_queries(self, compute):
+        with CaptureQueriesContext(connection) as queries:
+            result = compute()
+        return result, [query['sql'] for query in queries if 'COUNT(*)' in query['sql'] and 'tracker_paper' in query['sql']]
+
+    def planner(self, estimate):
+        """Pretend to be PostgreSQL with the given planner estimate"""
+        result = {'side_effect': estimate} if isinstance(estimate, Exception) else {'return_value': estimate}
+        patches = [
+            mock.patch.object(connections['default'], 'vendor', 'postgresql'),
+            mock.patch('tracker.counts._planner_estimate', **result),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_row_count(self):
+        self.assertEqual((RowCount(1234).display(), RowCount(1234, estimated=True).display()), ('1,234', '~1,234'))
+        self.assertEqual(RowCount(-3), 0)
+
+    def test_exact_counts_are_cached_per_generation(self):
+        papers = Paper.objects.filter(pub_year=2020)
+        count, queries = self.count_queries(lambda: exact_count(papers))
+        self.assertEqual((count, count.estimated, len(queries)), (6, False, 1))
+        Paper.objects.create(epmc_id='PMC-new', title='T', journal_title='J', pub_year=2020)
+        self.assertEqual(self.count_queries(lambda: exact_count(papers)), (6, []))
+        self.assertEqual(exact_count(papers, refresh=True), 7)
+        bump_generation()
+        self.assertEqual(self.count_queries(lambda: exact_count(Paper.objects.all()))[0], 13)
+
+    def test_refresh_table_counts(self):
+        table_count(Paper)
+        Paper.objects.create(epmc_id='PMC-new', title='T', journal_title='J')
+        self.assertEqual(refresh_table_counts()['paper'], 13)
+        self.assertEqual(self.count_queries(lambda: table_count(Paper)), (13, []))
+
+    def test_estimates_without_counting(self):
+        self.assertFalse(estimate_count(Paper.objects.all()).estimated)  # SQLite counts exactly
+        self.planner(250000)
+        count, queries = self.count_queries(lambda: fast_count(Paper.objects.filter(pub_year=2021)))
+        self.assertEqual((count, count.estimated, queries), (250000, True, []))
+
+    def test_small_or_failed_estimates_count_exactly(self):
+        self.planner(40)
+        count = fast_count(Paper.objects.filter(pub_year=2021))
+        self.assertEqual((count, count.estimated), (6, False))
+        cache.clear()
+        local_cache.clear()
+        self.planner(RuntimeError('no stats'))
+        self.assertEqual(estimate_count(Paper.objects.filter(pub_year=2020)), 6)
+
+    def test_paginator_tolerates_overestimates(self):
+        self.planner(250000)
+        paginator = EstimatedCountPaginator(Paper.objects.order_by('id'), 10)
+        self.assertEqual(list(paginator.page(5)), [])
+        self.assertEqual(len(paginator.page(2)), 2)
+        response = self.client.get('/api/v1/papers/?pub_year=2020')
+        self.assertEqual((response.data['count'], response.data['count_is_estimate']), (250000, True))
+
+    def test_paginator_survives_underestimates(self):
+        papers = Paper.objects.order_by('id')
+        with mock.patch('tracker.counts.fast_count', return_value=RowCount(4, estimated=True)):
+            for paginator in (EstimatedCountPaginator(papers, 5), ResultCachePaginator(papers, 5, cache_key='under')):
+                pages = [paginator.page(1)]
+                while pages[-1].has_next():
+                    pages.append(paginator.page(pages[-1].next_page_number()))
+                self.assertEqual([len(page) for page in pages], [5, 5, 2])
+                self.assertEqual([paper for page in pages for paper in page], list(papers.all()))
+
+            seen = []
+            with mock.patch.object(PaperPagination, 'page_size', 5):
+                url = '/api/v1/papers/'
+                while url:
+                    response = self.client.get(url)
+                    seen += [row['epmc_id'] for row in response.data['results']]
+                    url = response.data['next']
+            self.assertEqual((response.data['count'], response.data['count_is_estimate']), (4, True))
+        self.assertEqual(sorted(seen), sorted(papers.values_list('epmc_id', flat=True)))
+
+
+class SparseFieldsetTests(TestCase):
+    """?fields= / ?omit= trim the response and the columns and joins behind it"""
+
+    @classmethod
+    def setUpTestData(cls):
+        journal = Journal.objects.create(title_abbreviation='J', title_full='Journal', broad_subject_terms='Medicine')
+        cls.paper = Paper.objects.create(
+            epmc_id='PMC1', pmid='1', title='T', journal_title='Journal', journal=journal, is_open_data=True,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def paper_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, [query['sql'] for query in queries if 'FROM "tracker_paper"' in query['sql']]
+
+    def test_unknown_names_are_rejected(self):
+        response = self.client.get('/api/v1/papers/?fields=pmid,bogus&omit=nope')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.data['fields'][0].startswith('Unknown field(s): bogus.'))
+        self.assertTrue(response.data['omit'][0].startswith('Unknown field(s): nope.'))
+        # journal_name is a list field only
+        self.assertEqual(self.client.get(f'/api/v1/papers/{self.paper.pk}/?fields=journal_name').status_code, 400)
+
+    def test_list_projection(self):
+        response, queries = self.paper_queries('/api/v1/papers/?fields=pmid,transparency_score')
+        self.assertEqual(response.data['results'], [{'pmid': '1', 'transparency_score': 1}])
+        page = queries[-1]
+        self.assertNotIn('"title"', page)
+        self.assertNotIn('JOIN', page)
+
+    def test_retrieve_only_loads_needed_columns(self):
+        response, [query] = self.paper_queries(f'/api/v1/papers/{self.paper.pk}/?fields=pmid,transparency_score')
+        self.assertEqual(response.data, {'pmid': '1', 'transparency_score': 1})
+        columns = query.split(' FROM ')[0]
+        self.assertEqual(columns.count('"tracker_paper".'), 3)  # id, pmid, transparency_score
+        self.assertNotIn('JOIN', query)
+
+    def test_retrieve_joins_only_requested_relations(self):
+        response, [query] = self.paper_queries(f'/api/v1/papers/{self.paper.pk}/?fields=pmid,journal')
+        self.assertEqual(response.data['journal']['title_abbreviation'], 'J')
+        self.assertIn('JOIN "tracker_journal"', query)
+        self.assertNotIn('"tracker_paper"."title"', query)
+
+        response, [query] = self.paper_queries(f'/api/v1/papers/{self.paper.pk}/?omit=journal')
+        self.assertNotIn('journal', response.data)
+        self.assertNotIn('JOIN', query)
+
+
+class JournalStatsTests(TestCase):
+    """Journal statistics come from JournalStats, not queries per journal"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.journals = [
+            Journal.objects.create(
+                title_abbreviation=f'J{i}', title_full=f'Journal {i}', broad_subject_terms='Medicine', publisher=f'Pub{i % 2}',
+            )
+            for i in range(6)
+        ]
+        for i in range(30):
+            Paper.objects.create(
+                epmc_id=f'PMC{i}', title=f'Paper {i}', journal_title='Journal', journal=cls.journals[i % 4],
+                is_open_data=i % 2 == 0, is_coi_pred=i % 3 == 0, is_open_access=i % 5 != 0,
+            )
+        refresh_journal_stats()
+
+    def setUp(self):
+        cache.clear()
+
+    def tracker_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, [query for query in queries if 'tracker_' in query['sql']]
+
+    def test_list_query_count_is_fixed(self):
+        response, queries = self.tracker_queries('/api/v1/journals/')
+        self.assertEqual(len(queries), 2)  # COUNT + page
+        self.assertEqual(len(response.data['results']), 6)
+
+    def test_list_values(self):
+        response, _ = self.tracker_queries('/api/v1/journals/')
+        for row in response.data['results']:
+            papers = list(Paper.objects.filter(journal_id=row['id']))
+            self.assertEqual(row['paper_count'], len(papers))
+            expected = round(sum(paper.transparency_score for paper in papers) / len(papers), 2) if papers else 0
+            self.assertEqual(row['avg_transparency_score'], expected)
+
+    def test_detail_values(self):
+        journal = self.journals[0]
+        response, _ = self.tracker_queries(f'/api/v1/journals/{journal.pk}/')
+        papers = list(journal.papers.all())
+        five = [p.is_open_data + p.is_open_code + p.is_coi_pred + p.is_fund_pred + p.is_register_pred for p in papers]
+        self.assertEqual(response.data['paper_count'], len(papers))
+        self.assertEqual(response.data['avg_transparency_score'], round(sum(five) / len(papers), 2))
+        self.assertEqual(response.data['transparency_stats']['coi_percentage'], round(
+            sum(p.is_coi_pred for p in papers) * 100.0 / len(papers), 1
+        ))
+
+    def test_min_papers_filter(self):
+        response, _ = self.tracker_queries('/api/v1/journals/?min_papers=8')
+        self.assertEqual([row['title_abbreviation'] for row in response.data['results']], ['J0', 'J1'])
+
+    def test_import_batch_refreshes_touched_journals(self):
+        untouched = JournalStats.objects.get(journal=self.journals[1])
+        with self.captureOnCommitCallbacks(execute=True):
+            with batched():
+                Paper.objects.create(
+                    epmc_id='PMC-new', title='New', journal_title='Journal', journal=self.journals[5],
+                    pub_year=2021, is_open_code=True,
+                )
+        stats = JournalStats.objects.get(journal=self.journals[5])
+        self.assertEqual((stats.total_papers, stats.open_code_count, stats.first_year), (1, 1, 2021))
+        self.assertEqual(JournalStats.objects.get(journal=self.journals[1]).updated_at, untouched.updated_at)
+
+    def test_top_publishers_use_stats(self):
+        response, queries = self.tracker_queries('/api/v1/journals/top_publishers/')
+        self.assertEqual(sum(row['total_papers'] for row in response.data), 30)
+        self.assertFalse(any('tracker_paper' in query['sql'] for query in queries))
+
+
+class RollupSignalTests(TestCase):
+    """Paper writes outside batched() refresh their rollups once per transaction"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.journal = Journal.objects.create(title_abbreviation='J', title_full='Journal', broad_subject_terms='Medicine')
+
+    def cube_total(self, year):
+        return sum(StatsCube.objects.filter(pub_year=year).values_list('total_papers', flat=True))
+
+    def test_save_refreshes_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            for i in range(3):
+                Paper.objects.create(epmc_id=f'PMC{i}', title='T', journal_title='J', journal=self.journal, pub_year=2015)
+        self.assertEqual(sum(isinstance(callback, _CommitFlush) for callback in callbacks), 1)
+        self.assertEqual(self.cube_total(2015), 0)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.cube_total(2015), 3)
+        self.assertEqual(JournalStats.objects.get(journal=self.journal).total_papers, 3)
+
+    def test_moved_paper_refreshes_both_years(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            paper = Paper.objects.create(epmc_id='PMC1', title='T', journal_title='J', pub_year=2015)
+        with self.captureOnCommitCallbacks(execute=True):
+            paper = Paper.objects.get(pk=paper.pk)
+            paper.pub_year = 2016
+            paper.save()
+        self.assertEqual((self.cube_total(2015), self.cube_total(2016)), (0, 1))
+
+    def test_bulk_writes_are_recorded(self):
+        from .signals import record_papers
+
+        papers = [Paper(epmc_id=f'PMC{i}', title='T', journal_title='J', pub_year=2017) for i in range(4)]
+        with self.captureOnCommitCallbacks(execute=True):
+            with batched():
+                Paper.objects.bulk_create(papers)
+                record_papers(papers)
+        self.assertEqual(self.cube_total(2017), 4)
+
+    def test_only_batches_recount_tables(self):
+        with mock.patch('tracker.counts.refresh_table_counts') as recount:
+            with self.captureOnCommitCallbacks(execute=True):
+                Paper.objects.create(epmc_id='PMC1', title='T', journal_title='J', pub_year=2018)
+            self.assertEqual((self.cube_total(2018), recount.called), (1, False))
+            with self.captureOnCommitCallbacks(execute=True):
+                with batched():
+                    Paper.objects.create(epmc_id='PMC2', title='T', journal_title='J', pub_year=2018)
+            self.assertEqual((self.cube_total(2018), recount.call_count), (2, 1))
+
+
+class ImportCommandRollupTests(TestCase):
+    """Bulk import commands refresh the rollups for what they wrote"""
+
+    def test_match_papers_to_journals(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        journal = Journal.objects.create(
+            title_abbreviation='BMJ', title_full='British Medical Journal', broad_subject_terms='Medicine',
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                Paper.objects.create(epmc_id=f'PMC{i}', title='T', journal_title='British Medical Journal', pub_year=2019)
+        self.assertFalse(JournalStats.objects.filter(journal=journal, total_papers__gt=0).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('match_papers_to_journals', stdout=StringIO())
+        self.assertEqual(JournalStats.objects.get(journal=journal).total_papers, 3)
+        self.assertFalse(StatsCube.objects.filter(pub_year=2019, journal=None).exists())
+
+
+class GenerationCacheTests(TestCase):
+    """Cached values belong to a dataset generation; data changes move to a new one"""
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+
+    def test_bump_hides_older_entries(self):
+        dataset_cache.set('stats', 1)
+        self.assertEqual(dataset_cache.get('stats'), 1)
+        bump_generation()
+        self.assertIsNone(dataset_cache.get('stats'))
+
+    def test_lost_counter_never_reuses_a_generation(self):
+        dataset_cache.set('stats', 'old')
+        for _ in range(3):
+            bump_generation()
+        dataset_cache.set('stats', 'older')
+        before = get_generation()
+        cache.delete(GENERATION_KEY)  # Evicted or flushed
+        self.assertGreater(get_generation(), before)
+        with mock.patch.object(local_cache, 'generation_check', 0):  # Next check of the shared generation
+            self.assertIsNone(dataset_cache.get('stats'))
+
+    def test_reads_reuse_the_local_generation(self):
+        dataset_cache.set('stats', 1)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(dataset_cache.get('stats'), 1)
+        self.assertEqual(len(queries), 1)  # The entry only, not the generation counter first
+
+    def test_commit_bumps_once(self):
+        before = get_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(3):
+                invalidate_stats_cache()
+        self.assertEqual(get_generation(), before + 1)
+
+
+class GetOrComputeTests(TestCase):
+    """Only one worker recomputes an entry; the others get a stored (possibly stale) value"""
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.calls = []
+
+    def compute(self, value):
+        def compute():
+            self.calls.append(value)
+            return value
+        return compute
+
+    def test_falsy_values_are_hits(self):
+        for value in (None, 0, []):
+            for _ in range(2):
+                self.assertEqual(get_or_compute(f'key_{value!r}', self.compute(value), 60), value)
+        self.assertEqual(self.calls, [None, 0, []])
+
+    def test_stale_value_served_while_locked(self):
+        dataset_cache.set('key', {'value': 'old', 'fresh_until': 0})
+        dataset_cache.add('key_lock', 1)
+        self.assertEqual(get_or_compute('key', self.compute('new'), 60), 'old')
+        self.assertEqual(self.calls, [])
+
+        dataset_cache.delete('key_lock')
+        self.assertEqual(get_or_compute('key', self.compute('new'), 60), 'new')
+        self.assertIsNone(dataset_cache.get('key_lock'))
+        self.assertEqual(get_or_compute('key', self.compute('newer'), 60), 'new')
+
+    def test_cold_miss_waits_for_lock_holder(self):
+        dataset_cache.add('key_lock', 1)
+
+        def other_worker_finishes(seconds):
+            dataset_cache.set('key', {'value': 'theirs', 'fresh_until': time.time() + 60})
+
+        with mock.patch('tracker.cache_utils.time.sleep', side_effect=other_worker_finishes):
+            self.assertEqual(get_or_compute('key', self.compute('mine'), 60), 'theirs')
+        self.assertEqual(self.calls, [])
+
+    def test_cold_miss_computes_after_waiting(self):
+        dataset_cache.add('key_lock', 1)
+        with mock.patch('tracker.cache_utils.LOCK_WAIT', 0.1):
+            self.assertEqual(get_or_compute('key', self.compute('mine'), 60), 'mine')
+        self.assertEqual(get_or_compute('key', self.compute('again'), 60), 'mine')
+
+    def test_failed_compute_releases_lock(self):
+        def fail():
+            raise RuntimeError('database down')
+        with self.assertRaises(RuntimeError):
+            get_or_compute('key', fail, 60)
+        self.assertEqual(get_or_compute('key', self.compute('ok'), 60), 'ok')
+
+    def test_soft_expiry_is_jittered(self):
+        start = time.time()
+        for i in range(20):
+            get_or_compute(f'key{i}', self.compute(i), 100)
+        lifetimes = {dataset_cache.get(f'key{i}')['fresh_until'] - start for i in range(20)}
+        self.assertGreater(len(lifetimes), 1)
+        self.assertTrue(all(90 <= lifetime <= 111 for lifetime in lifetimes))
+
+
+class LocalCacheTests(TestCase):
+    """The per-process LRU is bounded, short-lived and dropped when the dataset generation moves"""
+
+    def setUp(self):
+        cache.clear()
+        self.local = LocalCache(max_entries=3, timeout=30, generation_check=0)
+        self.local.set_generation(get_generation())
+
+    def test_evicts_least_recently_used(self):
+        for key in 'abc':
+            self.local.set(key, key)
+        self.local.get('a')
+        self.local.set('d', 'd')
+        self.assertEqual([self.local.get(key) for key in 'abcd'], ['a', None, 'c', 'd'])
+        self.assertEqual(self.local.stats()['entries'], 3)
+
+    def test_entries_expire(self):
+        self.local.set('short', 1, timeout=5)
+        self.local.set('long', 2, timeout=300)  # Capped at the cache's own timeout
+        now = time.monotonic()
+        with mock.patch('tracker.cache_utils.time.monotonic', return_value=now + 10):
+            self.assertEqual((self.local.get('short'), self.local.get('long')), (None, 2))
+        with mock.patch('tracker.cache_utils.time.monotonic', return_value=now + 31):
+            self.assertIsNone(self.local.get('long'))
+
+    def test_new_generation_drops_entries(self):
+        self.local.set('stats', 1)
+        self.assertEqual(self.local.get('stats'), 1)
+        bump_generation()
+        self.assertIsNone(self.local.get('stats'))
+        self.assertEqual(self.local.stats()['generation'], get_generation())
+
+    def test_generation_checks_are_throttled(self):
+        local = LocalCache(generation_check=60)
+        local.get('warm-up')
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(5):
+                local.get('stats')
+        self.assertEqual(len(queries), 0)
+
+    def test_get_or_compute_fills_local_tier(self):
+        local_cache.clear()
+        calls = []
+        compute = lambda: calls.append(1) or 'value'
+        get_or_compute('hot', compute, 60, local=True)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(get_or_compute('hot', compute, 60, local=True), 'value')
+        self.assertEqual((len(calls), len(queries)), (1, 0))
+
+
+class ResultCacheTests(TestCase):
+    """Repeated list pages reuse the cached count and id window and only fetch their rows"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(30):
+            Paper.objects.create(epmc_id=f'PMC{i:02}', title=f'Paper {i}', journal_title='J', pub_year=2020 + i % 3)
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+
+    def paginator(self, queryset, key='papers'):
+        return ResultCachePaginator(queryset, 5, cache_key=key)
+
+    def test_cache_key_is_normalized(self):
+        names = ('q', 'year', 'indicators')
+        key = result_cache_key(QueryDict('year=2020&indicators=data&indicators=code&q=&page=2'), names)
+        self.assertEqual(key, result_cache_key(QueryDict('indicators=code&indicators=data&year=2020'), names))
+        self.assertNotEqual(key, result_cache_key(QueryDict('indicators=code&year=2020'), names))
+
+    def test_pages_are_cached(self):
+        papers = Paper.objects.filter(pub_year=2021).order_by('-epmc_id')
+        first = self.paginator(papers).page(2)
+        expected = list(papers.values_list('epmc_id', flat=True))[5:10]
+        self.assertEqual([paper.epmc_id for paper in first], expected)
+        Paper.objects.filter(epmc_id=expected[0]).update(title='Renamed')
+        with CaptureQueriesContext(connection) as queries:
+            paginator = self.paginator(papers)
+            page = paginator.page(2)
+            self.assertEqual([paper.epmc_id for paper in page], expected)
+        self.assertEqual((paginator.count, page.object_list[0].title), (10, 'Renamed'))
+        paper_queries = [query['sql'] for query in queries if 'tracker_paper' in query['sql']]
+        self.assertEqual(len(paper_queries), 1)  # Rows by primary key, no filter or COUNT(*)
+        self.assertIn(' IN (', paper_queries[0])
+
+    def test_new_generation_recomputes(self):
+        papers = Paper.objects.filter(pub_year=2020).order_by('epmc_id')
+        self.assertEqual(self.paginator(papers).count, 10)
+        Paper.objects.create(epmc_id='PMC00a', title='T', journal_title='J', pub_year=2020)
+        self.assertEqual(self.paginator(papers).count, 10)
+        bump_generation()
+        self.assertEqual([paper.epmc_id for paper in self.paginator(papers).page(1)][:2], ['PMC00', 'PMC00a'])
+
+    def test_uncached_without_key(self):
+        papers = Paper.objects.order_by('epmc_id')
+        self.assertEqual(len(self.paginator(papers, key=None).page(6)), 5)
+        self.assertIsNone(cache.get(f"{result_cache_key(QueryDict(''), ())}_count"))
+
+    def test_list_view(self):
+        response = self.client.get('/papers/?order_by=title&page=2')
+        self.assertEqual(response.status_code, 200)
+        expected = list(Paper.objects.order_by('title', '-epmc_id')[25:])
+        self.assertEqual(list(response.context['papers']), expected)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/papers/?page=2&transparency=&order_by=title')
+        self.assertEqual(list(response.context['papers']), expected)
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql'] and 'tracker_paper' in query['sql']])
+
+
+class CSVExportTests(TestCase):
+    """The CSV export streams the filtered papers in batches, optionally gzipped"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('reader', password='pw')
+        for i in range(7):
+            Paper.objects.create(
+                epmc_id=f'PMC{i}', pmid=str(100 + i), title=f'Paper, "{i}"', journal_title='J',
+                pub_year=2020 + i % 2, is_open_data=i % 2 == 0,
+            )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def export(self, query=''):
+        response = self.client.get(f'/export/papers.csv{query}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response
+
+    def rows(self, response, content=None):
+        content = b''.join(response.streaming_content) if content is None else content
+        return list(csv.reader(io.StringIO(content.decode('utf-8'))))
+
+    def test_login_required(self):
+        self.client.logout()
+        self.assertEqual(self.client.get('/export/papers.csv').status_code, 302)
+
+    def test_rows(self):
+        response = self.export()
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="ost_papers.csv"')
+        header, *rows = self.rows(response)
+        self.assertEqual(header[:3], ['PMID', 'Title', 'Authors'])
+        self.assertEqual(sorted(row[0] for row in rows), [str(100 + i) for i in range(7)])
+        self.assertIn(['100', 'Paper, "0"', '', 'J', '2020', '', 'True'], [row[:7] for row in rows])
+
+    def test_list_and_api_filters(self):
+        self.assertEqual(len(self.rows(self.export('?year=2020'))), 5)
+        self.assertEqual(len(self.rows(self.export('?pub_year__gte=2021&has_open_data=false'))), 4)
+        response = self.client.get('/export/papers.csv?pub_year__gte=soon')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('pub_year__gte', response.json()['errors'])
+
+    def test_streams_in_batches(self):
+        with mock.patch.object(EXPORTERS['csv'], 'batch_size', 3):
+            chunks = list(self.export().streaming_content)
+        self.assertEqual([len(self.rows(None, chunk)) for chunk in chunks], [4, 3, 1, 0])
+
+    def test_gzip(self):
+        response = self.export('?compress=gzip')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="ost_papers.csv.gz"')
+        content = gzip.decompress(b''.join(response.streaming_content))
+        self.assertEqual(len(self.rows(None, content)), 8)
+
+    def test_unknown_format(self):
+        self.assertEqual(self.client.get('/export/papers.xlsx').status_code, 404)
+
+
+@skipUnless(EXPORTERS['parquet'].available(), 'columnar exports need pyarrow')
+class ColumnarExportTests(TestCase):
+    """Parquet, Arrow and JSON Lines exports carry the same rows and typed columns"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.journal = Journal.objects.create(title_abbreviation='J', title_full='Journal', broad_subject_terms='Dentistry')
+        for i in range(5):
+            Paper.objects.create(
+                epmc_id=f'PMC{i}', pmid=str(100 + i) if i else None, title=f'Étude {i}', journal_title='J',
+                journal=cls.journal if i % 2 else None, pub_year=2020 + i % 2, broad_subject_term='Dentistry',
+                is_open_data=i % 2 == 0,
+            )
+
+    def export(self, extension, query=''):
+        response = self.client.get(f'/api/v1/papers/export/{extension}/{query}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="ost_papers.{extension}"')
+        return b''.join(response.streaming_content)
+
+    def test_parquet(self):
+        import pyarrow.parquet as pq
+
+        with mock.patch.object(EXPORTERS['parquet'], 'batch_size', 2):
+            content = self.export('parquet')
+        parquet = pq.ParquetFile(io.BytesIO(content))
+        self.assertEqual(parquet.metadata.num_row_groups, 3)
+        table = parquet.read()
+        self.assertEqual(str(table.schema.field('journal_title').type), 'dictionary<values=string, indices=int32, ordered=0>')
+        self.assertEqual(str(table.schema.field('pub_year').type), 'int32')
+        rows = sorted(table.to_pylist(), key=lambda row: row['epmc_id'])
+        self.assertEqual([row['epmc_id'] for row in rows], [f'PMC{i}' for i in range(5)])
+        self.assertEqual((rows[0]['pmid'], rows[0]['title'], rows[1]['journal_id']), (None, 'Étude 0', self.journal.pk))
+
+    def test_arrow_stream(self):
+        import pyarrow as pa
+
+        with mock.patch.object(EXPORTERS['arrows'], 'batch_size', 2):
+            content = self.export('arrows', '?pub_year=2020')
+        table = pa.ipc.open_stream(content).read_all()
+        self.assertEqual(sorted(table.column('epmc_id').to_pylist()), ['PMC0', 'PMC2', 'PMC4'])
+        self.assertEqual(table.column('is_open_data').to_pylist(), [True, True, True])
+
+    def test_ndjson(self):
+        lines = self.export('ndjson').decode('utf-8').splitlines()
+        rows = sorted((json.loads(line) for line in lines), key=lambda row: row['epmc_id'])
+        self.assertEqual(list(rows[1]), [field for field, _ in EXPORT_FIELDS])
+        self.assertEqual((rows[0]['title'], rows[1]['journal_id'], len(rows)), ('Étude 0', self.journal.pk, 5))
+        response = self.client.get('/api/v1/papers/export/ndjson/?compress=gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)).decode('utf-8').splitlines(), lines)
+
+    def test_columnar_formats_ignore_compress(self):
+        response = self.client.get('/api/v1/papers/export/parquet/?compress=gzip')
+        self.assertEqual(response['Content-Type'], 'application/vnd.apache.parquet')
+
+    def test_missing_pyarrow(self):
+        with mock.patch.object(EXPORTERS['parquet'], 'available', return_value=False):
+            self.assertEqual(self.client.get('/api/v1/papers/export/parquet/').status_code, 501)
+        self.assertEqual(self.client.get('/api/v1/papers/export/xlsx/').status_code, 404)
+
+
+class StreamTests(TestCase):
+    """The NDJSON harvest streams papers in id order and resumes after any id"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(9):
+            Paper.objects.create(epmc_id=f'PMC{i}', title='T', journal_title='J', pub_year=2020 + i % 3)
+        cls.ids = list(Paper.objects.order_by('id').values_list('id', flat=True))
+
+    def stream(self, query=''):
+        response = self.client.get(f'/api/v1/papers/stream/{query}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        return [json.loads(line) for line in b''.join(response.streaming_content).decode('utf-8').splitlines()]
+
+    def test_streams_in_id_order(self):
+        rows = self.stream()
+        self.assertEqual([row['id'] for row in rows], self.ids)
+        self.assertEqual(list(rows[0]), [field for field, _ in EXPORT_FIELDS])
+
+    def test_resume_after_last_id(self):
+        first = self.stream('?limit=4')
+        rest = self.stream(f"?after={first[-1]['id']}")
+        self.assertEqual([row['id'] for row in first + rest], self.ids)
+        self.assertEqual(self.stream(f'?after={self.ids[-1]}'), [])
+
+    def test_resume_with_filters(self):
+        expected = list(Paper.objects.filter(pub_year=2021).order_by('id').values_list('id', flat=True))
+        first = self.stream('?pub_year=2021&limit=2')
+        rest = self.stream(f"?pub_year=2021&after={first[-1]['id']}")
+        self.assertEqual([row['id'] for row in first + rest], expected)
+
+    def test_invalid_parameters(self):
+        for query in ('?after=PMC3', '?limit=ten'):
+            self.assertEqual(self.client.get(f'/api/v1/papers/stream/{query}').status_code, 400, query)
+        self.assertEqual(self.stream('?limit=-1'), [])
+
+
+class WarmingOriginTests(TransactionTestCase):
+    """The cache warmer fills the page-cache entries production requests read (its workers need committed data)"""
+
+    PROXY_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+
+    @override_settings(OST_WARM_HOST=None, ALLOWED_HOSTS=['localhost', '.example.org', 'ost.example.org'])
+    def test_origin_from_allowed_hosts(self):
+        self.assertEqual(warm_origin(), ('ost.example.org', False))
+        with override_settings(SECURE_PROXY_SSL_HEADER=self.PROXY_HEADER):
+            self.assertEqual(warm_origin(), ('ost.example.org', True))
+        self.assertEqual(warm_origin('other.example.org'), ('other.example.org', False))
+
+    @override_settings(OST_WARM_HOST=None, ALLOWED_HOSTS=['a.example.org', 'b.example.org'])
+    def test_ambiguous_origin_fails(self):
+        with self.assertRaises(ImproperlyConfigured):
+            warm_origin()
+        with self.assertRaises(ImproperlyConfigured):
+            WarmingPlanner().warm(plan=[('/about/', 1)])
+
+    @override_settings(OST_WARM_HOST='ost.example.org', ALLOWED_HOSTS=['ost.example.org'], SECURE_PROXY_SSL_HEADER=PROXY_HEADER)
+    def test_warmed_page_matches_production_request(self):
+        cache.clear()
+        with mock.patch('django.test.Client', side_effect=AssertionError('test instrumentation in production code')):
+            report = WarmingPlanner(concurrency=2).warm(plan=[('/about/', 1), ('/no-such-page/?q=%C3%A9', 1)])
+        self.assertEqual([page['status'] for page in report['pages']], [200, 404])
+
+        request = RequestFactory().get('/about/', HTTP_HOST='ost.example.org', HTTP_X_FORWARDED_PROTO='https')
+        self.assertIsNotNone(get_cache_key(request, cache=GenerationCache()))
+        request = RequestFactory().get('/about/', HTTP_HOST='ost.example.org')
+        self.assertIsNone(get_cache_key(request, cache=GenerationCache()))
+
+
+class SnapshotTests(TestCase):
+    """Snapshot manifests describe exactly the files written, and are served as soon as they are published"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(7):
+            Paper.objects.create(epmc_id=f'PMC{i}', title=f'Paper {i}', journal_title='J', pub_year=2020 + i % 2 if i else None)
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def build(self, second=0, **options):
+        with mock.patch('tracker.snapshots.timezone.now', return_value=datetime.datetime(2025, 7, 1, 2, 0, second, tzinfo=datetime.timezone.utc)):
+            return build_snapshot(root=self.root, **options)
+
+    def test_manifest_matches_files(self):
+        manifest = self.build()
+        self.assertEqual(manifest['total_rows'], 7)
+        self.assertEqual(manifest['formats'], ['csv', 'parquet'])
+        self.assertEqual(json.loads((self.root / 'latest.json').read_text())['version'], manifest['version'])
+        for entry in manifest['files']:
+            data = (self.root / entry['path']).read_bytes()
+            self.assertEqual((len(data), hashlib.sha256(data).hexdigest()), (entry['bytes'], entry['sha256']))
+            if entry['format'] == 'csv':
+                self.assertEqual(len(gzip.decompress(data).decode().splitlines()) - 1, entry['rows'])
+        self.assertEqual(
+            {(entry['year'], entry['rows']) for entry in manifest['files']}, {(None, 1), (2020, 3), (2021, 3)}
+        )
+
+    def test_missing_pyarrow_skips_columnar_formats(self):
+        with mock.patch.object(EXPORTERS['parquet'], 'available', return_value=False):
+            manifest = self.build()
+        self.assertEqual(manifest['formats'], ['csv'])
+        self.assertEqual({entry['format'] for entry in manifest['files']}, {'csv'})
+
+    def test_keep_prunes_old_versions(self):
+        for second in range(3):
+            self.build(second, keep=2)
+        self.assertEqual(list_snapshots(self.root), ['20250701-020001', '20250701-020002'])
+
+    def test_published_versions_are_served(self):
+        with override_settings(OST_SNAPSHOT_ROOT=self.root):
+            self.assertEqual(self.client.get('/snapshots/latest.json').status_code, 404)
+            manifest = self.build()
+            path = manifest['files'][0]['path']
+            self.assertEqual(self.client.get('/snapshots/latest.json').status_code, 200)
+            response = self.client.get(f'/snapshots/{path}', HTTP_RANGE='bytes=0-9')
+            self.assertEqual((response.status_code, len(b''.join(response.streaming_content))), (206, 10))
+
+
+class PaperSearchTests(TestCase):
+    """Identifier-shaped queries are exact lookups only when they can't be ordinary text"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.trends = Paper.objects.create(epmc_id='PMC1', pmid='555', title='Open data trends since 2020', journal_title='J')
+        cls.numbered = Paper.objects.create(epmc_id='PMC2', pmid='2020', title='Unrelated', journal_title='J')
+        cls.doi = Paper.objects.create(epmc_id='PMC3', pmid='777', doi='10.1000/ABC.def', title='Other', journal_title='J')
+
+    def search(self, query):
+        return list(Paper.objects.search(query))
+
+    def test_bare_number_searches_text_first(self):
+        self.assertEqual(self.search('2020'), [self.trends])
+
+    def test_bare_number_falls_back_to_pmid(self):
+        self.assertEqual(self.search('777'), [self.doi])
+
+    def test_prefixed_pmid_is_exact(self):
+        self.assertEqual(self.search('pmid:2020'), [self.numbered])
+        self.assertEqual(self.search('PMID: 555'), [self.trends])
+
+    def test_doi_uses_lower_expression(self):
+        for query in ('10.1000/abc.DEF', 'https://doi.org/10.1000/ABC.def', 'doi:10.1000/abc.def'):
+            self.assertEqual(self.search(query), [self.doi], query)
+        self.assertIn('LOWER("tracker_paper"."doi") =', str(Paper.objects.search('10.1000/abc.def').query))
+
+    def test_search_vector_is_never_loaded_or_saved(self):
+        paper = Paper.objects.get(pk=self.trends.pk)
+        self.assertIn('search_vector', paper.get_deferred_fields())
+        paper.is_open_data = True
+        with CaptureQueriesContext(connection) as queries:
+            paper.save()
+        self.assertFalse([query for query in queries if 'search_vector' in query['sql']])
+
+
+class TextSearchTests(TestCase):
+    """text_search() matches any of its fields; "similar" ranks typo-tolerant matches where pg_trgm exists"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for abbreviation, publisher, country in [
+            ('BMJ Open', 'BMJ Publishing', 'United Kingdom'),
+            ('PLoS One', 'Public Library of Science', 'United States'),
+            ('Lancet', 'Elsevier', 'United Kingdom'),
+        ]:
+            Journal.objects.create(
+                title_abbreviation=abbreviation, title_full=abbreviation, publisher=publisher, country=country,
+                broad_subject_terms='Medicine',
+            )
+
+    def abbreviations(self, queryset):
+        return sorted(queryset.values_list('title_abbreviation', flat=True))
+
+    def test_contains_any_field(self):
+        journals = text_search(Journal.objects.all(), ['title_abbreviation', 'publisher'], 'bmj')
+        self.assertEqual(self.abbreviations(journals), ['BMJ Open'])
+        journals = text_search(Journal.objects.all(), ['title_abbreviation', 'publisher'], 'public')
+        self.assertEqual(self.abbreviations(journals), ['PLoS One'])
+        self.assertEqual(text_search(Journal.objects.all(), ['publisher'], '  ').count(), 3)
+
+    def test_filters_accept_search_mode(self):
+        for mode in ('contains', 'similar'):
+            response = self.client.get(f'/api/v1/journals/?country=kingdom&search_mode={mode}')
+            self.assertEqual(response.status_code, 200)
+            if connection.vendor != 'postgresql':
+                self.assertEqual(sorted(row['title_abbreviation'] for row in response.data['results']), ['BMJ Open', 'Lancet'])
+        self.assertEqual(self.client.get('/api/v1/journals/?country=x&search_mode=fuzzy').status_code, 400)
+
+    @skipUnless(connection.vendor == 'postgresql', 'pg_trgm similarity needs PostgreSQL')
+    def test_similar_ranks_typos(self):
+        journals = text_search(Journal.objects.order_by('id'), ['publisher'], 'Elsevir', mode='similar')
+        self.assertEqual(journals[0].title_abbreviation, 'Lancet')
+        self.assertGreater(journals[0].similarity, 0)
+
+
+class SQLiteFTSTests(TestCase):
+    """The FTS5 index ranks matches and survives migrations that drop its triggers"""
+
+    def test_ranked_by_column_weight(self):
+        journal_hit = Paper.objects.create(epmc_id='PMC1', title='Other', journal_title='Reproducibility Letters')
+        title_hit = Paper.objects.create(epmc_id='PMC2', title='Reproducibility in practice', journal_title='J')
+        Paper.objects.create(epmc_id='PMC3', title='Unrelated', journal_title='J')
+        self.assertEqual(list(Paper.objects.search('reproducibility')), [title_hit, journal_hit])
+
+    def test_post_migrate_restores_dropped_triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER tracker_paper_fts_insert')
+        missed = Paper.objects.create(epmc_id='PMC1', title='Preregistration matters', journal_title='J')
+        self.assertFalse(Paper.objects.search('preregistration').exists())
+
+        ensure_fts_triggers()
+        added = Paper.objects.create(epmc_id='PMC2', title='Preregistration again', journal_title='J')
+        self.assertEqual(set(Paper.objects.search('preregistration')), {missed, added})
+
+
+class LookupTests(TestCase):
+    """Batch identifier lookup answers every identifier sent, in order"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.paper = Paper.objects.create(
+            epmc_id='777', pmid='12345', pmcid='PMC777', doi='10.1000/Abc', title='T', journal_title='J',
+        )
+
+        cls.other = Paper.objects.create(
+            epmc_id='PMC888', pmid='999', pmcid='PMC888', doi='10.1000/xyz', title='T', journal_title='J',
+        )
+
+    def summary(self, results):
+        return [(result['query'], result.get('type'), result['matched'], result.get('pmid')) for result in results]
+
+    def test_query_survives_paper_id(self):
+        [result] = resolve_identifiers(['12345'])
+        self.assertEqual((result['query'], result['id'], result['matched']), ('12345', self.paper.pk, True))
+
+    def test_mixed_identifiers_in_input_order(self):
+        ids = ['PMC888', '12345', 'https://doi.org/10.1000/ABC', 'pmc777', ' 999 ', 'doi:10.1000/XYZ']
+        self.assertEqual(self.summary(resolve_identifiers(ids)), [
+            ('PMC888', 'pmcid', True, '999'),
+            ('12345', 'pmid', True, '12345'),
+            ('https://doi.org/10.1000/ABC', 'doi', True, '12345'),
+            ('pmc777', 'pmcid', True, '12345'),
+            (' 999 ', 'pmid', True, '999'),
+            ('doi:10.1000/XYZ', 'doi', True, '999'),
+        ])
+
+    def test_unmatched_and_invalid(self):
+        results = list(resolve_identifiers(['424242', 'not an id', '10.9999/none', 'PMC1']))
+        self.assertEqual(self.summary(results), [
+            ('424242', 'pmid', False, None),
+            ('not an id', None, False, None),
+            ('10.9999/none', 'doi', False, None),
+            ('PMC1', 'pmcid', False, None),
+        ])
+        self.assertEqual(results[1]['error'], 'not a PMID, PMCID or DOI')
+
+    def test_chunk_boundaries(self):
+        ids = ['999', 'bogus', 'PMC777', '424242', '10.1000/abc']
+        whole = list(resolve_identifiers(ids))
+        for chunk_size in (1, 2, 4, 5):
+            self.assertEqual(list(resolve_identifiers(ids, chunk_size=chunk_size)), whole, chunk_size)
+        with CaptureQueriesContext(connection) as queries:
+            list(resolve_identifiers(ids, chunk_size=2))
+        self.assertEqual(len(queries), 4)  # One IN query per identifier kind in each chunk
+
+    def test_endpoint_streams_ndjson(self):
+        for body in ({'ids': ['PMC888', 'bogus']}, ['PMC888', 'bogus']):
+            response = self.client.post('/api/v1/papers/lookup/', body, content_type='application/json')
+            self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+            lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+            self.assertEqual([(line['query'], line['matched']) for line in lines], [('PMC888', True), ('bogus', False)])
+
+    @override_settings(OST_LOOKUP_MAX_IDS=2)
+    def test_max_identifiers(self):
+        for body in ({'ids': ['1', '2', '3']}, {'ids': []}, {'ids': 'PMC888'}):
+            response = self.client.post('/api/v1/papers/lookup/', body, content_type='application/json')
+            self.assertEqual(response.status_code, 400, body)
+        response = self.client.post('/api/v1/papers/lookup/', {'ids': ['1', '2']}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+
+class ORJSONRendererTests(TestCase):
+    """ORJSONRenderer output is byte-identical to JSONRenderer's"""
+
+    def assertSameBytes(self, data, media_type='application/json'):
+        self.assertEqual(
+            ORJSONRenderer().render(data, media_type, {}),
+            JSONRenderer().render(data, media_type, {}),
+        )
+
+    def test_values(self):
+        self.assertSameBytes({
+            'text': 'Ünïcode \u2028 \u2029 "quotes" \\ / \n\t\x01 \U0001F600',
+            'numbers': [0, -1, 2 ** 62, 1.5, 0.1, 12.345],
+            'flags': [True, False, None],
+            'nested': {'list': [{'a': 1}], 'empty': {}},
+            'tuple': (1, 'two'),
+            'datetime': datetime.datetime(2024, 5, 6, 7, 8, 9, 123456, tzinfo=datetime.timezone.utc),
+            'date': datetime.date(2024, 5, 6),
+            'decimal': Decimal('1.25'),
+            1999: 'int key',
+        })
+
+    def test_fallbacks(self):
+        self.assertSameBytes({'big': 2 ** 70})
+        self.assertSameBytes({'a': [1, 2]}, 'application/json; indent=4')
+        self.assertEqual(ORJSONRenderer().render(None), b'')
@@ -15,6 +15,13 @@ urlpatterns = [
     path('statistics/', views.StatisticsView.as_view(), name='statistics'),
     path('about/', views.AboutView.as_view(), name='about'),
     
+    # Trend data (served from the precomputed rollup tables)
+    path('trends/by-year/', views.TransparencyByYearAPI.as_view(), name='transparency_by_year'),
+    path('trends/update/', views.UpdateTrendsView.as_view(), name='update_trends'),
+    
+    # Data export (streamed; csv, ndjson, parquet or arrows)
+    path('export/papers.<str:extension>', views.ExportDataView.as_view(), name='export_data'),
+    
     # Ajax endpoints for partial content loading
     path('ajax/', views.HomeView.as_view(template_name='tracker/partials/home_content.html'), name='ajax_home'),
     path('ajax/papers/', views.PaperListView.as_view(template_name='tracker/partials/paper_list_content.html'), name='ajax_paper_list'),
@@ -4,21 +4,29 @@ from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import login
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse, Http404
-from django.db.models import Q, Count, Avg, Sum, Max
+from django.http import JsonResponse, Http404
+from django.db.models import Q, Count, Avg, Sum, Max, F
+from django.db.models.functions import Coalesce
 from django.core.paginator import Paginator
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
 from django.conf import settings
 import json
-import csv
 import pandas as pd
 from datetime import datetime, date, timedelta
-from django.core.cache import cache
 
 from .models import Paper, Journal, ResearchField, UserProfile, TransparencyTrend
 from .forms import UserProfileForm, PaperSearchForm, JournalSearchForm
-from .cache_utils import get_home_page_statistics, get_field_statistics, get_search_filter_counts
+from .cache_utils import generation_cache_page, get_home_page_statistics, get_field_statistics, get_search_filter_counts
+from .counts import fast_count, table_count
+from .exporters import EXPORTERS, ExportError, export_response
+from .indicators import indicator_filter
+from .pagination import InvalidCursor, KeysetPaginator, KeysetUnsupported
+from .results import ResultCachePaginator, result_cache_key
+from .search import text_search
+from .stats import StatsEngine
+from .rollups import (
+    field_summary, journal_summary, journal_yearly_trends, refresh_rollups, yearly_trends,
+)
 
 class HomeView(TemplateView):
     """Home page with overview statistics - optimized with caching"""
@@ -61,24 +69,22 @@ class HomeView(TemplateView):
             recent_papers_queryset = recent_papers_queryset.filter(pub_year__gte=2000)
         recent_papers = recent_papers_queryset[:10]
         
-        # Get top journals by paper count and transparency score
-        top_journals = Journal.objects.annotate(
-            paper_count=Count('papers'),
-            avg_transparency_score=Avg('papers__transparency_score')
-        ).filter(
-            paper_count__gt=0,
-            avg_transparency_score__isnull=False
-        ).order_by('-avg_transparency_score', '-paper_count')[:8]
+        # Get top journals by transparency score and paper count (indexed JournalStats columns)
+        top_journals = Journal.objects.filter(stats__total_papers__gt=0).annotate(
+            paper_count=F('stats__total_papers'),
+            avg_transparency_score=F('stats__avg_transparency_score')
+        ).order_by('-stats__avg_transparency_score', '-stats__total_papers')[:8]
         
         # Calculate transparency coverage
-        total_papers = Paper.objects.count()
-        transparency_processed = Paper.objects.filter(transparency_processed=True).count()
+        totals = StatsEngine().stats()
+        total_papers = totals['total_papers']
+        transparency_processed = totals['transparency_processed_count']
         transparency_coverage = (transparency_processed / max(total_papers, 1)) * 100
         
         # Database health metrics
         current_year = date.today().year
         recent_years = [current_year - i for i in range(5)]  # Last 5 years
-        papers_in_recent_years = Paper.objects.filter(pub_year__in=recent_years).count()
+        papers_in_recent_years = StatsEngine(pub_year__in=recent_years).stats()['total_papers']
         year_coverage_pct = (papers_in_recent_years / max(total_papers, 1)) * 100
         
         # Data completeness (papers with complete metadata)
@@ -130,106 +136,103 @@ class DashboardView(LoginRequiredMixin, TemplateView):
                 papers = Paper.objects.filter(
                     journal__broad_subject_terms__icontains=preferred_fields.first().name
                 )
-                context['user_field_papers'] = papers.count()
-                context['user_field_avg_transparency'] = papers.aggregate(
-                    avg_score=Avg('transparency_score')
-                )['avg_score'] or 0
+                field_stats = StatsEngine(papers).stats()
+                context['user_field_papers'] = field_stats['total_papers']
+                context['user_field_avg_transparency'] = field_stats['avg_transparency_score']
         except UserProfile.DoesNotExist:
             context['user_field_papers'] = 0
             context['user_field_avg_transparency'] = 0
         
         # General statistics
-        context['total_papers'] = Paper.objects.count()
-        context['total_journals'] = Journal.objects.count()
+        context['total_papers'] = StatsEngine().stats()['total_papers']
+        context['total_journals'] = table_count(Journal)
         
         return context
 
+def filter_papers(queryset, params):
+    """
+    Apply the paper list's search and filter parameters (``q``, ``journal``,
+    ``year``, ``transparency``, ``indicators``, ...) from ``params``
+    """
+    # Search - ranked by the database's search backend (lazy: callers fetch what they need)
+    q = params.get('q')
+    if q:
+        queryset = queryset.search(q)
+    
+    # Build filters efficiently
+    filters = Q()
+    
+    # Journal filter
+    journal = params.get('journal')
+    if journal:
+        filters &= Q(journal_id=journal)
+    
+    # Subject/category filters (combine since they're the same field)
+    category = params.get('category') or params.get('broad_subject_term')
+    if category:
+        filters &= Q(broad_subject_term=category)
+    
+    # Publication type
+    pub_type = params.get('pub_type')
+    if pub_type:
+        filters &= Q(pub_type=pub_type)
+    
+    # Year filter
+    year = params.get('year')
+    if year:
+        filters &= Q(pub_year=year)
+    
+    # Year range filters
+    year_from = params.get('year_from')
+    year_to = params.get('year_to')
+    if year_from:
+        filters &= Q(pub_year__gte=year_from)
+    if year_to:
+        filters &= Q(pub_year__lte=year_to)
+    
+    # Transparency score range
+    transparency = params.get('transparency')
+    if transparency == 'high':
+        filters &= Q(transparency_score__gte=5)
+    elif transparency == 'medium':
+        filters &= Q(transparency_score__range=(3, 4))
+    elif transparency == 'low':
+        filters &= Q(transparency_score__lt=3)
+    
+    # Transparency indicators - one IN lookup on the indexed indicator bitmask
+    indicators = params.getlist('indicators')
+    if indicators:
+        match = 'any' if params.get('indicator_match') == 'any' else 'all'
+        filters &= indicator_filter(indicators, match=match)
+    
+    # Apply all filters at once
+    if filters:
+        queryset = queryset.filter(filters)
+    
+    return queryset
+
 class PaperListView(ListView):
     """List view for papers with pagination and filtering - heavily optimized"""
     model = Paper
     template_name = 'tracker/paper_list.html'
     context_object_name = 'papers'
     paginate_by = 25  # Optimized pagination size
+    paginator_class = ResultCachePaginator  # Cached count ("~N papers" when large) and page ids
+    
+    # GET parameters that change the result list (and so the result cache key)
+    result_params = (
+        'q', 'journal', 'category', 'broad_subject_term', 'pub_type', 'year', 'year_from', 'year_to',
+        'transparency', 'indicators', 'indicator_match', 'order_by',
+    )
     
     def get_queryset(self):
-        # Start with optimized manager for list view
-        queryset = Paper.objects.for_list_view()
-        
-        # Search optimization - use single query with combined search
+        # Optimized manager for list view, then the shared search and filters
+        queryset = filter_papers(Paper.objects.for_list_view(), self.request.GET)
         q = self.request.GET.get('q')
-        if q:
-            # Cache search results for common queries
-            cache_key = f"search_results_{hash(q.lower())}_{self.request.GET.urlencode()}"
-            cached_queryset = cache.get(cache_key)
-            
-            if cached_queryset is not None:
-                return cached_queryset
-            
-            queryset = queryset.search(q)  # Use optimized search from manager
-        
-        # Build filters efficiently
-        filters = Q()
-        
-        # Journal filter
-        journal = self.request.GET.get('journal')
-        if journal:
-            filters &= Q(journal_id=journal)
-        
-        # Subject/category filters (combine since they're the same field)
-        category = self.request.GET.get('category') or self.request.GET.get('broad_subject_term')
-        if category:
-            filters &= Q(broad_subject_term=category)
-        
-        # Publication type
-        pub_type = self.request.GET.get('pub_type')
-        if pub_type:
-            filters &= Q(pub_type=pub_type)
-        
-        # Year filter
-        year = self.request.GET.get('year')
-        if year:
-            filters &= Q(pub_year=year)
-        
-        # Year range filters
-        year_from = self.request.GET.get('year_from')
-        year_to = self.request.GET.get('year_to')
-        if year_from:
-            filters &= Q(pub_year__gte=year_from)
-        if year_to:
-            filters &= Q(pub_year__lte=year_to)
-        
-        # Transparency score range
-        transparency = self.request.GET.get('transparency')
-        if transparency == 'high':
-            filters &= Q(transparency_score__gte=5)
-        elif transparency == 'medium':
-            filters &= Q(transparency_score__range=(3, 4))
-        elif transparency == 'low':
-            filters &= Q(transparency_score__lt=3)
-        
-        # Transparency indicators - build single query
-        indicators = self.request.GET.getlist('indicators')
-        indicator_filters = {}
-        for indicator in indicators:
-            if indicator == 'open_data':
-                indicator_filters['is_open_data'] = True
-            elif indicator == 'open_code':
-                indicator_filters['is_open_code'] = True
-            elif indicator == 'coi_disclosure':
-                indicator_filters['is_coi_pred'] = True
-            elif indicator == 'funding':
-                indicator_filters['is_fund_pred'] = True
-            elif indicator == 'registration':
-                indicator_filters['is_register_pred'] = True
-            elif indicator == 'open_access':
-                indicator_filters['is_open_access'] = True
-        
-        if indicator_filters:
-            filters &= Q(**indicator_filters)
-        
-        # Apply all filters at once
-        if filters:
-            queryset = queryset.filter(filters)
+        
+        # Searches keep relevance order unless a sort was chosen explicitly
+        if q and 'order_by' not in self.request.GET:
+            return queryset
         
         # Optimized ordering with database indexes
         order_by = self.request.GET.get('order_by', '-pub_year')
@@ -245,15 +248,41 @@ class PaperListView(ListView):
         else:
             queryset = queryset.order_by('-pub_year', '-epmc_id')
         
-        # Cache the filtered queryset for complex searches
-        if q and len(self.request.GET) > 1:  # Multiple filters + search
-            cache.set(cache_key, queryset, 300)  # 5 minutes
-        
         return queryset
     
+    def paginate_queryset(self, queryset, page_size):
+        # ?cursor= (empty for the first page) pages by keyset: same cost at any depth, no COUNT(*)
+        if 'cursor' in self.request.GET:
+            try:
+                page = KeysetPaginator(queryset, page_size).page(self.request.GET.get('cursor') or None)
+            except KeysetUnsupported:
+                pass  # Relevance-ranked searches keep page numbers
+            except InvalidCursor:
+                raise Http404("Invalid cursor")
+            else:
+                return (None, page, page.object_list, page.has_other_pages())
+        return super().paginate_queryset(queryset, page_size)
+    
+    def get_paginator(self, queryset, per_page, **kwargs):
+        # Page numbers reuse the cached count and id window; rows are fetched by primary key
+        return super().get_paginator(
+            queryset, per_page,
+            cache_key=result_cache_key(self.request.GET, self.result_params),
+            rows=Paper.objects.for_list_view(),
+            **kwargs
+        )
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
+        # Keyset pages link by cursor; keep every other parameter
+        if context['paginator'] is None:
+            params = self.request.GET.copy()
+            params.pop('cursor', None)
+            params.pop('page', None)
+            context['cursor_page'] = context['page_obj']
+            context['cursor_params'] = params.urlencode()
+        
         # Add search form and filter options
         context['search_form'] = PaperSearchForm(self.request.GET)
         
@@ -272,7 +301,14 @@ class PaperListView(ListView):
             active_filters['category'] = self.request.GET.get('category')
         
         context['active_filters'] = active_filters
-        context['total_results'] = self.get_queryset().count() if len(active_filters) > 0 else None
+        context['selected_indicators'] = self.request.GET.getlist('indicators')
+        context['indicator_match'] = self.request.GET.get('indicator_match', 'all')
+        # The paginator's count (a planner estimate for large results) instead of a second COUNT(*)
+        if active_filters:
+            paginator = context['paginator']
+            context['total_results'] = paginator.count if paginator else fast_count(self.object_list)
+        else:
+            context['total_results'] = None
         
         return context
 
@@ -335,19 +371,24 @@ class JournalListView(ListView):
     context_object_name = 'journals'
     paginate_by = settings.OST_PAGINATION_SIZE
     
+    # Sorts answered by the indexed JournalStats columns
+    STATS_ORDERING = {
+        'paper_count': 'stats__total_papers',
+        'avg_transparency': 'stats__avg_transparency_score',
+    }
+    
     def get_queryset(self):
         queryset = Journal.objects.annotate(
-            paper_count=Count('papers'),
-            avg_transparency=Avg('papers__transparency_score')
+            paper_count=Coalesce('stats__total_papers', 0),
+            avg_transparency=F('stats__avg_transparency_score')
         ).all()
         
-        # Filter by search
+        # Filter by search (pg_trgm-indexed; search_mode=similar ranks typo-tolerant matches)
         search_query = self.request.GET.get('search')
+        search_mode = self.request.GET.get('search_mode', 'contains')
         if search_query:
-            queryset = queryset.filter(
-                Q(title_abbreviation__icontains=search_query) |
-                Q(title_full__icontains=search_query) |
-                Q(publisher__icontains=search_query)
+            queryset = text_search(
+                queryset, ['title_abbreviation', 'title_full', 'publisher'], search_query, mode=search_mode
             )
         
         # Filter by subject
@@ -360,8 +401,15 @@ class JournalListView(ListView):
         if country:
             queryset = queryset.filter(country=country)
         
-        # Ordering
+        # Ordering (similarity-ranked searches keep their ranking unless a sort was chosen)
+        if search_query and search_mode == 'similar' and queryset.ordered and 'order_by' not in self.request.GET:
+            return queryset
         order_by = self.request.GET.get('order_by', 'title_abbreviation')
+        column = self.STATS_ORDERING.get(order_by.lstrip('-'))
+        if column:
+            # Journals imported without papers may have no statistics row yet: sort them as empty
+            column = F(column).desc(nulls_last=True) if order_by.startswith('-') else F(column).asc(nulls_first=True)
+            return queryset.order_by(column, 'title_abbreviation')
         queryset = queryset.order_by(order_by)
         
         return queryset
@@ -386,30 +434,32 @@ class JournalDetailView(DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Journal statistics
-        papers = self.object.papers.all()
-        context['total_papers'] = papers.count()
-        context['avg_transparency_score'] = papers.aggregate(
-            avg_score=Avg('transparency_score')
-        )['avg_score'] or 0
+        # Journal statistics (from the JournalStats row)
+        summary = journal_summary(self.object)
+        context['total_papers'] = summary['total_papers']
+        context['avg_transparency_score'] = summary['avg_transparency_score']
         
         # Transparency breakdown
         context['transparency_stats'] = {
-            'data_sharing': papers.filter(is_open_data=True).count(),
-            'code_sharing': papers.filter(is_open_code=True).count(),
-            'coi_disclosure': papers.filter(is_coi_pred=True).count(),
-            'funding_disclosure': papers.filter(is_fund_pred=True).count(),
-            'protocol_registration': papers.filter(is_register_pred=True).count(),
+            'data_sharing': summary['open_data_count'],
+            'code_sharing': summary['open_code_count'],
+            'coi_disclosure': summary['coi_disclosure_count'],
+            'funding_disclosure': summary['funding_count'],
+            'protocol_registration': summary['registration_count'],
         }
         
         # Recent papers
-        context['recent_papers'] = papers.order_by('-pub_year')[:10]
+        context['recent_papers'] = self.object.papers.order_by('-pub_year')[:10]
         
         # Yearly trends
-        context['yearly_stats'] = papers.values('pub_year').annotate(
-            count=Count('id'),
-            avg_transparency=Avg('transparency_score')
-        ).order_by('pub_year')
+        context['yearly_stats'] = [
+            {
+                'pub_year': trend['year'],
+                'count': trend['total_papers'],
+                'avg_transparency': trend['avg_transparency_score'],
+            }
+            for trend in journal_yearly_trends(self.object)
+        ]
         
         return context
 
@@ -417,7 +467,7 @@ class StatisticsView(TemplateView):
     """Main statistics page"""
     template_name = 'tracker/statistics.html'
     
-    @method_decorator(cache_page(60 * 15))  # Cache for 15 minutes
+    @method_decorator(generation_cache_page(60 * 15))  # Cache for 15 minutes
     def dispatch(self, *args, **kwargs):
         return super().dispatch(*args, **kwargs)
     
@@ -425,26 +475,27 @@ class StatisticsView(TemplateView):
         context = super().get_context_data(**kwargs)
         
         # Overall statistics
-        papers = Paper.objects.all()
+        engine = StatsEngine()
         journals = Journal.objects.all()
+        totals = engine.stats()
         
-        context['total_papers'] = papers.count()
+        context['total_papers'] = totals['total_papers']
         context['total_journals'] = journals.count()
         
         # Transparency indicators statistics
         indicators_stats = {}
         indicators = [
-            ('data_sharing', 'is_open_data', 'Data Sharing'),
-            ('code_sharing', 'is_open_code', 'Code Sharing'),
-            ('coi_disclosure', 'is_coi_pred', 'COI Disclosure'),
-            ('funding_disclosure', 'is_fund_pred', 'Funding Disclosure'),
-            ('protocol_registration', 'is_register_pred', 'Protocol Registration'),
-            ('open_access', 'is_open_access', 'Open Access'),
+            ('data_sharing', 'open_data_count', 'Data Sharing'),
+            ('code_sharing', 'open_code_count', 'Code Sharing'),
+            ('coi_disclosure', 'coi_disclosure_count', 'COI Disclosure'),
+            ('funding_disclosure', 'funding_count', 'Funding Disclosure'),
+            ('protocol_registration', 'registration_count', 'Protocol Registration'),
+            ('open_access', 'open_access_count', 'Open Access'),
         ]
         
-        for key, field, label in indicators:
-            count = papers.filter(**{field: True}).count()
-            percentage = (count / max(papers.count(), 1)) * 100
+        for key, column, label in indicators:
+            count = totals[column]
+            percentage = (count / max(totals['total_papers'], 1)) * 100
             indicators_stats[key] = {
                 'count': count,
                 'percentage': percentage,
@@ -459,24 +510,34 @@ class StatisticsView(TemplateView):
         ).order_by('-count')[:10]
         
         # Papers by year
-        context['yearly_distribution'] = papers.values('pub_year').annotate(
-            count=Count('id'),
-            avg_transparency=Avg('transparency_score')
-        ).order_by('pub_year')
+        context['yearly_distribution'] = [
+            {
+                'pub_year': row['pub_year'],
+                'count': row['total_papers'],
+                'avg_transparency': row['avg_transparency_score'],
+            }
+            for row in engine.rollup('pub_year')
+        ]
         
         # Category-based statistics
-        context['category_distribution'] = papers.exclude(
-            broad_subject_term__isnull=True
-        ).values('broad_subject_term').annotate(
-            count=Count('id'),
-            avg_transparency=Avg('transparency_score'),
-            data_sharing_pct=Count('id', filter=Q(is_open_data=True)) * 100.0 / Count('id'),
-            code_sharing_pct=Count('id', filter=Q(is_open_code=True)) * 100.0 / Count('id'),
-            coi_disclosure_pct=Count('id', filter=Q(is_coi_pred=True)) * 100.0 / Count('id'),
-            funding_disclosure_pct=Count('id', filter=Q(is_fund_pred=True)) * 100.0 / Count('id'),
-            protocol_registration_pct=Count('id', filter=Q(is_register_pred=True)) * 100.0 / Count('id'),
-            open_access_pct=Count('id', filter=Q(is_open_access=True)) * 100.0 / Count('id'),
-        ).order_by('-count')[:10]  # Top 10 categories
+        categories = sorted(
+            StatsEngine(broad_subject_term__isnull=False).rollup('broad_subject_term'),
+            key=lambda row: -row['total_papers']
+        )[:10]  # Top 10 categories
+        context['category_distribution'] = [
+            {
+                'broad_subject_term': row['broad_subject_term'],
+                'count': row['total_papers'],
+                'avg_transparency': row['avg_transparency_score'],
+                'data_sharing_pct': row['open_data_pct'],
+                'code_sharing_pct': row['open_code_pct'],
+                'coi_disclosure_pct': row['coi_disclosure_pct'],
+                'funding_disclosure_pct': row['funding_pct'],
+                'protocol_registration_pct': row['registration_pct'],
+                'open_access_pct': row['open_access_pct'],
+            }
+            for row in categories
+        ]
         
         return context
 
@@ -494,19 +555,16 @@ class FieldStatisticsView(DetailView):
             journal__broad_subject_terms__icontains=self.object.name
         )
         
-        context['total_papers'] = papers.count()
-        context['avg_transparency_score'] = papers.aggregate(
-            avg_score=Avg('transparency_score')
-        )['avg_score'] or 0
+        stats = StatsEngine(papers).stats(distribution=True)
+        context['total_papers'] = stats['total_papers']
+        context['avg_transparency_score'] = stats['avg_transparency_score']
+        context['score_distribution'] = stats['score_distribution']
         
         # Field-specific statistics
         context['field_stats'] = {
-            'data_sharing': (papers.filter(is_open_data=True).count() / 
-                           max(papers.count(), 1)) * 100,
-            'code_sharing': (papers.filter(is_open_code=True).count() / 
-                           max(papers.count(), 1)) * 100,
-            'coi_disclosure': (papers.filter(is_coi_pred=True).count() / 
-                             max(papers.count(), 1)) * 100,
+            'data_sharing': stats['open_data_pct'],
+            'code_sharing': stats['open_code_pct'],
+            'coi_disclosure': stats['coi_disclosure_pct'],
         }
         
         return context
@@ -516,15 +574,17 @@ class TransparencyByYearAPI(View):
     """API endpoint for transparency trends by year"""
     
     def get(self, request):
-        yearly_data = Paper.objects.values('pub_year').annotate(
-            total=Count('id'),
-            data_sharing=Count('id', filter=Q(is_open_data=True)),
-            code_sharing=Count('id', filter=Q(is_open_code=True)),
-            coi_disclosure=Count('id', filter=Q(is_coi_pred=True)),
-            avg_transparency=Avg('transparency_score')
-        ).order_by('pub_year')
-        
-        data = list(yearly_data)
+        data = [
+            {
+                'pub_year': trend['year'],
+                'total': trend['total_papers'],
+                'data_sharing': trend['data_sharing_count'],
+                'code_sharing': trend['code_sharing_count'],
+                'coi_disclosure': trend['coi_disclosure_count'],
+                'avg_transparency': trend['avg_transparency_score'],
+            }
+            for trend in yearly_trends()
+        ]
         return JsonResponse({'data': data})
 
 class TransparencyByFieldAPI(View):
@@ -536,19 +596,14 @@ class TransparencyByFieldAPI(View):
         major_fields = ['Dentistry', 'Medicine', 'Surgery', 'Orthodontics']
         
         for field in major_fields:
-            papers = Paper.objects.filter(
-                journal__broad_subject_terms__icontains=field
-            )
+            stats = StatsEngine(journal__broad_subject_terms__icontains=field).stats()
             
-            if papers.exists():
+            if stats['total_papers']:
                 field_data.append({
                     'field': field,
-                    'total_papers': papers.count(),
-                    'avg_transparency': papers.aggregate(
-                        avg=Avg('transparency_score')
-                    )['avg'] or 0,
-                    'data_sharing_pct': (papers.filter(is_open_data=True).count() / 
-                                       papers.count()) * 100
+                    'total_papers': stats['total_papers'],
+                    'avg_transparency': stats['avg_transparency_score'],
+                    'data_sharing_pct': stats['open_data_pct']
                 })
         
         return JsonResponse({'data': field_data})
@@ -673,50 +728,34 @@ class ResearchFieldDetailView(DetailView):
         
         context['top_journals'] = journals_in_field
         
-        # Transparency trends and statistics
-        if field_papers.exists():
-            total_papers = field_papers.count()
-            
-            context['transparency_stats'] = {
-                'total_papers': total_papers,
-                'data_sharing_pct': round((field_papers.filter(is_open_data=True).count() / total_papers) * 100, 1),
-                'code_sharing_pct': round((field_papers.filter(is_open_code=True).count() / total_papers) * 100, 1),
-                'coi_disclosure_pct': round((field_papers.filter(is_coi_pred=True).count() / total_papers) * 100, 1),
-                'funding_disclosure_pct': round((field_papers.filter(is_fund_pred=True).count() / total_papers) * 100, 1),
-                'protocol_registration_pct': round((field_papers.filter(is_register_pred=True).count() / total_papers) * 100, 1),
-                'open_access_pct': round((field_papers.filter(is_open_access=True).count() / total_papers) * 100, 1),
-                'avg_transparency_score': field_papers.aggregate(avg=Avg('transparency_score'))['avg'] or 0,
-            }
-            
-            # Year-wise transparency trends (last 5 years)
-            from django.utils import timezone
-            current_year = timezone.now().year
-            
-            yearly_trends = []
-            for year in range(current_year - 4, current_year + 1):
-                year_papers = field_papers.filter(pub_year=year)
-                if year_papers.exists():
-                    yearly_trends.append({
-                        'year': year,
-                        'papers_count': year_papers.count(),
-                        'avg_transparency': year_papers.aggregate(avg=Avg('transparency_score'))['avg'] or 0,
-                        'data_sharing_pct': round((year_papers.filter(is_open_data=True).count() / year_papers.count()) * 100, 1),
-                        'open_access_pct': round((year_papers.filter(is_open_access=True).count() / year_papers.count()) * 100, 1),
-                    })
-            
-            context['yearly_trends'] = yearly_trends
-        else:
-            context['transparency_stats'] = {
-                'total_papers': 0,
-                'data_sharing_pct': 0,
-                'code_sharing_pct': 0,
-                'coi_disclosure_pct': 0,
-                'funding_disclosure_pct': 0,
-                'protocol_registration_pct': 0,
-                'open_access_pct': 0,
-                'avg_transparency_score': 0,
+        # Transparency trends and statistics (from the TransparencyTrend rollup)
+        summary = field_summary(field)
+        context['transparency_stats'] = {
+            'total_papers': summary['total_papers'],
+            'data_sharing_pct': summary['data_sharing_pct'],
+            'code_sharing_pct': summary['code_sharing_pct'],
+            'coi_disclosure_pct': summary['coi_disclosure_pct'],
+            'funding_disclosure_pct': summary['funding_disclosure_pct'],
+            'protocol_registration_pct': summary['protocol_registration_pct'],
+            'open_access_pct': summary['open_access_pct'],
+            'avg_transparency_score': summary['avg_transparency_score'],
+        }
+        
+        # Year-wise transparency trends (last 5 years)
+        from django.utils import timezone
+        current_year = timezone.now().year
+        
+        context['yearly_trends'] = [
+            {
+                'year': trend['year'],
+                'papers_count': trend['total_papers'],
+                'avg_transparency': trend['avg_transparency_score'],
+                'data_sharing_pct': trend['data_sharing_pct'],
+                'open_access_pct': trend['open_access_pct'],
             }
-            context['yearly_trends'] = []
+            for trend in yearly_trends(start_year=current_year - 4, end_year=current_year, field=field)
+            if trend['total_papers']
+        ]
         
         return context
 
@@ -725,35 +764,34 @@ class TrendsView(TemplateView):
     template_name = 'tracker/trends.html'
 
 class ExportDataView(LoginRequiredMixin, View):
-    """Export data as CSV"""
+    """
+    Export papers as CSV, JSON Lines, Parquet or Arrow (see tracker.exporters),
+    streamed from a server-side cursor so memory stays flat and the download
+    starts at once. Accepts the paper list filters (``q``, ``journal``,
+    ``year``, ...) and the API's PaperFilter parameters (``pub_year__gte``,
+    ``has_open_data``, ...); ``?compress=gzip`` gzips CSV and JSON Lines.
+    """
     
-    def get(self, request):
-        # Create CSV response
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="ost_papers.csv"'
-        
-        writer = csv.writer(response)
-        
-        # Write header
-        writer.writerow([
-            'PMID', 'Title', 'Authors', 'Journal', 'Year', 'DOI',
-            'Data Sharing', 'Code Sharing', 'COI Disclosure', 
-            'Funding Disclosure', 'Protocol Registration',
-            'Transparency Score'
-        ])
-        
-        # Write data
-        papers = Paper.objects.select_related('journal').all()
-        for paper in papers:
-            writer.writerow([
-                paper.pmid, paper.title, paper.author_string,
-                paper.journal_title, paper.pub_year, paper.doi,
-                paper.is_open_data, paper.is_open_code, paper.is_coi_pred,
-                paper.is_fund_pred, paper.is_register_pred,
-                paper.transparency_score
-            ])
-        
-        return response
+    def get(self, request, extension='csv'):
+        from .api_views import PaperFilter
+        
+        if extension not in EXPORTERS:
+            raise Http404("Unknown export format")
+        
+        queryset = filter_papers(Paper.objects.all(), request.GET)
+        
+        # API filter parameters (pub_year__gte, has_open_data, ...) on top of the list filters
+        api_params = request.GET.copy()
+        for name in PaperListView.result_params:
+            api_params.pop(name, None)
+        filterset = PaperFilter(api_params, queryset=queryset)
+        if not filterset.is_valid():
+            return JsonResponse({'errors': filterset.errors}, status=400)
+        
+        try:
+            return export_response(filterset.qs, extension, compress=request.GET.get('compress') == 'gzip')
+        except ExportError as e:
+            return JsonResponse({'error': str(e)}, status=501)
 
 # Admin Views
 class ImportDataView(UserPassesTestMixin, TemplateView):
@@ -775,8 +813,12 @@ class UpdateTrendsView(UserPassesTestMixin, View):
         return self.request.user.is_superuser
     
     def post(self, request):
-        # Implementation for updating trends would go here
-        messages.info(request, 'Trends update functionality would be implemented here.')
+        trend_rows, journal_rows, cube_rows, stats_rows = refresh_rollups()
+        messages.success(
+            request,
+            f'Transparency trends updated ({trend_rows} field rows, {journal_rows} journal rows, '
+            f'{cube_rows} statistics cells, {stats_rows} journal statistics).'
+        )
         return redirect('tracker:statistics')
 
 class JournalSearchView(TemplateView):
@@ -795,8 +837,8 @@ class JournalSearchView(TemplateView):
 def health_check(request):
     """Health check endpoint for Railway deployment monitoring"""
     try:
-        # Simple database connectivity test
-        paper_count = Paper.objects.count()
+        # Simple database connectivity test (planner estimate: no full scan per probe)
+        paper_count = table_count(Paper, exact=False)
         return JsonResponse({
             'status': 'healthy',
             'papers': paper_count,
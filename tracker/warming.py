@@ -0,0 +1,186 @@
+"""
+Post-import cache warming for Open Science Tracker
+
+After an import bumps the dataset generation every cached page and
+statistic is cold. WarmingPlanner reads the request analytics log written
+by RequestLoggingMiddleware, picks the most requested GET URLs (path plus
+query string) and renders them through the full middleware stack, so the
+page cache and the statistics caches behind them are filled before users
+arrive. The fixed statistics keys from cache_utils.warm_cache() are always
+warmed first.
+"""
+
+import io
+import json
+import logging
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+WARMER_USER_AGENT = 'OST-CacheWarmer'
+
+# Never worth warming: admin/auth pages, static files, maintenance endpoints
+SKIP_PREFIXES = ('/admin/', '/static/', '/media/', '/accounts/', '/api/auth/', '/trends/update/', '/export/', '/api/v1/papers/export/')
+
+
+def read_request_log(path, max_lines=200000):
+    """Count successful anonymous GET URLs in the last ``max_lines`` lines of the analytics log"""
+    counts = Counter()
+    try:
+        with open(path, encoding='utf-8', errors='replace') as log:
+            lines = deque(log, maxlen=max_lines)
+    except OSError as e:
+        logger.warning(f"Can't read request log {path}: {e}")
+        return counts
+
+    for line in lines:
+        start = line.find('{')
+        if start < 0:
+            continue
+        try:
+            entry = json.loads(line[start:])
+        except ValueError:
+            continue
+        if entry.get('method') != 'GET' or entry.get('status_code') != 200:
+            continue
+        if entry.get('user_agent') == WARMER_USER_AGENT:
+            continue
+        path_ = entry.get('path', '')
+        if not path_.startswith('/') or path_.startswith(SKIP_PREFIXES):
+            continue
+        query = entry.get('query_string', '')
+        counts[f'{path_}?{query}' if query else path_] += 1
+    return counts
+
+
+def warm_origin(host=None):
+    """
+    (host, secure) for the warmer's requests. Page-cache keys include the
+    scheme and host, so warmed pages must be requested the way production
+    sees its traffic: at OST_WARM_HOST (or the only public host in
+    ALLOWED_HOSTS), over HTTPS when SECURE_PROXY_SSL_HEADER is set.
+    """
+    host = host or getattr(settings, 'OST_WARM_HOST', None)
+    if not host:
+        public = [
+            name for name in settings.ALLOWED_HOSTS
+            if not name.startswith(('.', '*')) and name not in ('localhost', '127.0.0.1', '[::1]')
+        ]
+        if len(public) != 1:
+            raise ImproperlyConfigured(
+                "Set OST_WARM_HOST to the host production serves pages at "
+                f"(ALLOWED_HOSTS has {len(public)} candidates)"
+            )
+        host = public[0]
+    return host, bool(getattr(settings, 'SECURE_PROXY_SSL_HEADER', None))
+
+
+class WarmingPlanner:
+    """
+    Plan and run cache warming from real traffic.
+
+    ``top`` most frequent URLs are warmed with at most ``concurrency``
+    requests in flight (each on its own database connection).
+    """
+
+    def __init__(self, log_path=None, top=50, concurrency=4, host=None, max_lines=200000):
+        self.log_path = log_path or getattr(settings, 'OST_ANALYTICS_LOG', None)
+        self.top = top
+        self.concurrency = max(1, concurrency)
+        self.host = host
+        self.max_lines = max_lines
+
+    def plan(self):
+        """[(url, hits)] most requested first"""
+        if not self.log_path:
+            return []
+        return read_request_log(self.log_path, self.max_lines).most_common(self.top)
+
+    def _environ(self, url, origin):
+        """WSGI environ for a GET of ``url`` as production's proxy forwards it"""
+        host, secure = origin
+        path, _, query = url.partition('?')
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'SCRIPT_NAME': '',
+            # WSGI strings: the UTF-8 bytes as latin-1 (logged paths are decoded)
+            'PATH_INFO': path.encode('utf-8').decode('iso-8859-1'),
+            'QUERY_STRING': query.encode('utf-8').decode('iso-8859-1'),
+            'SERVER_NAME': host.split(':')[0],
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': host,
+            'HTTP_USER_AGENT': WARMER_USER_AGENT,
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        if secure:
+            # What the TLS-terminating proxy sends, so request.is_secure() holds as it does in production
+            header, value = settings.SECURE_PROXY_SSL_HEADER
+            environ[header] = value
+        return environ
+
+    def _fetch(self, handler, url, origin):
+        started = time.monotonic()
+        status = None
+        try:
+            def start_response(status_line, headers, exc_info=None):
+                nonlocal status
+                status = int(status_line.split(' ', 1)[0])
+
+            # Through the WSGI handler like a server request (signals, middleware, page cache)
+            handler(self._environ(url, origin), start_response).close()
+        except Exception as e:
+            logger.warning(f"Warming {url} failed: {e}")
+            status = None
+        finally:
+            connections.close_all()  # Worker threads must not leak connections
+        return {'url': url, 'status': status, 'seconds': round(time.monotonic() - started, 3)}
+
+    def warm(self, plan=None):
+        """Warm the statistics keys and the planned URLs; returns a report dict"""
+        from django.core.handlers.wsgi import WSGIHandler
+        from .cache_utils import warm_cache
+
+        started = time.monotonic()
+        plan = self.plan() if plan is None else plan
+        origin = warm_origin(self.host) if plan else None  # Fail before warming anything
+        stats = warm_cache()
+        handler = WSGIHandler()  # Loads the middleware once; safe to share between threads like a server's
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            pages = list(pool.map(lambda url: self._fetch(handler, url, origin), [url for url, _ in plan]))
+
+        report = {
+            'stats': stats,
+            'pages': pages,
+            'warmed': sum(1 for page in pages if page['status'] == 200),
+            'failed': sum(1 for page in pages if page['status'] != 200),
+            'seconds': round(time.monotonic() - started, 2),
+        }
+        logger.info(
+            f"Cache warmed: {len(stats)} statistics keys, {report['warmed']} pages "
+            f"({report['failed']} failed) in {report['seconds']}s"
+        )
+        return report
+
+
+def warm_after_import(**options):
+    """Run the planner with default settings (called at the end of import commands)"""
+    try:
+        return WarmingPlanner(**options).warm()
+    except Exception as e:
+        # A failed warm-up must never fail the import that triggered it
+        logger.error(f"Cache warming failed: {e}")
+        return None